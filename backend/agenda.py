@@ -0,0 +1,142 @@
+"""Agenda of dated farm events derived from medical and reproduction records."""
+from datetime import timedelta
+from pymongo import ReplaceOne
+from typing import List, Optional
+import asyncio
+
+from dates import parse_date
+from indexes import rebuild_collection
+
+AGENDA_COLLECTION = "agenda"
+AGENDA_TYPES = ["rappel", "mise_bas_prevue", "sevrage_prevu"]
+# Gestation periods in days: ~3 months, 3 weeks, 3 days for sows, 21 days incubation for chicks
+GESTATION_DAYS = {"porc": 114, "poulet": 21}
+WEANING_DAYS = {"porc": 28}
+
+
+def medical_entry(record: dict) -> Optional[dict]:
+    if not record.get("date_rappel"):
+        return None
+    return {
+        "id": f"{record['id']}:rappel",
+        "type": "rappel",
+        "date": parse_date(record["date_rappel"]),
+        "animal_id": record["animal_id"],
+        "source": "medical_records",
+        "source_id": record["id"],
+        "libelle": " - ".join(part for part in (record.get("type_intervention"), record.get("medicament")) if part),
+    }
+
+
+def reproduction_entries(events: List[dict], animal_type: Optional[str]) -> List[dict]:
+    """Expected farrowings and planned weanings of one animal's reproduction history"""
+    entries = []
+    weanings = [parse_date(event["date_event"]) for event in events if event["type_event"] == "sevrage"]
+    for event in events:
+        if event["type_event"] in ("saillie", "insemination") and event.get("date_prevue_mise_bas"):
+            entries.append({
+                "id": f"{event['id']}:mise_bas_prevue",
+                "type": "mise_bas_prevue",
+                "date": parse_date(event["date_prevue_mise_bas"]),
+                "animal_id": event["animal_id"],
+                "source": "reproduction_events",
+                "source_id": event["id"],
+                "libelle": event["type_event"],
+            })
+        elif event["type_event"] == "mise_bas" and animal_type in WEANING_DAYS:
+            farrowing = parse_date(event["date_event"])
+            if any(weaning >= farrowing for weaning in weanings):
+                continue
+            entries.append({
+                "id": f"{event['id']}:sevrage_prevu",
+                "type": "sevrage_prevu",
+                "date": farrowing + timedelta(days=WEANING_DAYS[animal_type]),
+                "animal_id": event["animal_id"],
+                "source": "reproduction_events",
+                "source_id": event["id"],
+                "libelle": f"{event.get('nombre_petits_vivants') or event.get('nombre_petits_nes') or ''} petits".strip(),
+            })
+    return entries
+
+
+async def sync_medical_record(db, record: dict):
+    """Create, move or drop the reminder of one medical record"""
+    entry = medical_entry(record)
+    if entry:
+        await db[AGENDA_COLLECTION].replace_one({"id": entry["id"]}, entry, upsert=True)
+    else:
+        await db[AGENDA_COLLECTION].delete_many({"source_id": record["id"]})
+
+
+async def add_medical_records(db, records: List[dict]):
+    entries = [entry for entry in map(medical_entry, records) if entry]
+    if entries:
+        await db[AGENDA_COLLECTION].bulk_write(
+            [ReplaceOne({"id": entry["id"]}, entry, upsert=True) for entry in entries], ordered=False
+        )
+
+
+async def remove_sources(db, source_ids: List[str]):
+    await db[AGENDA_COLLECTION].delete_many({"source_id": {"$in": source_ids}})
+
+
+async def sync_animal_reproduction(db, animal_id: str):
+    """Recompute the reproduction entries of one animal from its events"""
+    events = await db.reproduction_events.find({"animal_id": animal_id}, {"_id": 0}).to_list(length=None)
+    animal = await db.animals.find_one({"id": animal_id}, {"_id": 0, "type": 1})
+    entries = reproduction_entries(events, animal["type"] if animal else None)
+    # Upserts, so concurrent writes for the same animal never collide on the unique entry ids
+    if entries:
+        await db[AGENDA_COLLECTION].bulk_write(
+            [ReplaceOne({"id": entry["id"]}, entry, upsert=True) for entry in entries], ordered=False
+        )
+    await db[AGENDA_COLLECTION].delete_many({
+        "animal_id": animal_id, "source": "reproduction_events", "id": {"$nin": [entry["id"] for entry in entries]}
+    })
+
+
+async def remove_animals(db, animal_ids: List[str], session=None):
+    """Drop the entries of animals whose records were cascade-deleted"""
+    await db[AGENDA_COLLECTION].delete_many({"animal_id": {"$in": animal_ids}}, session=session)
+
+
+async def agenda_entries(db):
+    async for record in db.medical_records.find({"date_rappel": {"$ne": None}}, {"_id": 0}):
+        entry = medical_entry(record)
+        if entry:
+            yield entry
+
+    animal_types = {
+        animal["id"]: animal.get("type")
+        async for animal in db.animals.find({}, {"_id": 0, "id": 1, "type": 1})
+    }
+    events = []
+    async for event in db.reproduction_events.find({}, {"_id": 0}).sort("animal_id", 1):
+        if events and events[0]["animal_id"] != event["animal_id"]:
+            for entry in reproduction_entries(events, animal_types.get(events[0]["animal_id"])):
+                yield entry
+            events = []
+        events.append(event)
+    if events:
+        for entry in reproduction_entries(events, animal_types.get(events[0]["animal_id"])):
+            yield entry
+
+
+async def rebuild(db):
+    """Recompute every entry (backfill or repair: python agenda.py)"""
+    await rebuild_collection(db, AGENDA_COLLECTION, agenda_entries(db))
+
+
+async def ensure_agenda(db):
+    """Backfill the agenda on first start against an existing history"""
+    if not await db[AGENDA_COLLECTION].find_one({}) and (
+        await db.medical_records.find_one({"date_rappel": {"$ne": None}}) or await db.reproduction_events.find_one({})
+    ):
+        await rebuild(db)
+
+
+if __name__ == "__main__":
+    from database import db
+
+    asyncio.run(rebuild(db))
+    print("Agenda reconstruit")
@@ -0,0 +1,89 @@
+"""In-process LRU cache of compact animal summaries; the TTL bounds staleness across workers."""
+from collections import OrderedDict
+from typing import Iterable, Optional
+import os
+import time
+
+from database import animals_repo
+
+ANIMAL_CACHE_MAX_SIZE = int(os.environ.get('ANIMAL_CACHE_MAX_SIZE', '10000'))
+ANIMAL_CACHE_TTL_SECONDS = float(os.environ.get('ANIMAL_CACHE_TTL_SECONDS', '60'))
+
+ANIMAL_SUMMARY_PROJECTION = {"_id": 0, "id": 1, "nom": 1, "type": 1, "race": 1, "sexe": 1, "statut": 1}
+
+
+class AnimalSummaryCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # id -> (expires_at, summary)
+        self.version = 0  # Bumped on every invalidation so in-flight reads do not store stale data
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, animal_id: str) -> Optional[dict]:
+        entry = self._entries.get(animal_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[animal_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(animal_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, summary: dict, version: int):
+        if version != self.version:
+            return
+        self._entries[summary["id"]] = (time.monotonic() + self.ttl, summary)
+        self._entries.move_to_end(summary["id"])
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *animal_ids: str):
+        self.version += 1
+        self.invalidations += 1
+        for animal_id in animal_ids:
+            self._entries.pop(animal_id, None)
+
+    def clear(self):
+        self.version += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "taille": len(self._entries),
+            "taille_max": self.max_size,
+            "ttl_secondes": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+
+animal_cache = AnimalSummaryCache(ANIMAL_CACHE_MAX_SIZE, ANIMAL_CACHE_TTL_SECONDS)
+
+
+async def get_animal_summaries(animal_ids: Iterable[str]) -> dict:
+    """Summaries keyed by id; cache misses are fetched together in a single $in query"""
+    summaries = {}
+    missing = []
+    for animal_id in {animal_id for animal_id in animal_ids if animal_id}:
+        summary = animal_cache.get(animal_id)
+        if summary is None:
+            missing.append(animal_id)
+        else:
+            summaries[animal_id] = summary
+    if missing:
+        version = animal_cache.version
+        for summary in await animals_repo.find({"id": {"$in": missing}}, ANIMAL_SUMMARY_PROJECTION):
+            animal_cache.put(summary, version)
+            summaries[summary["id"]] = summary
+    return summaries
+
+
+async def get_animal_summary(animal_id: str) -> Optional[dict]:
+    return (await get_animal_summaries([animal_id])).get(animal_id)
@@ -0,0 +1,120 @@
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from typing import List, Tuple
+import csv
+import io
+import json
+
+IMPORT_BATCH_SIZE = 10000
+
+
+def parse_rows(text: str, fmt: str) -> list:
+    """Split a JSON array, NDJSON or CSV payload into rows.
+
+    Unparseable NDJSON lines are kept as ValueError placeholders so they are reported
+    with their line number instead of failing the whole import.
+    """
+    if fmt == "csv":
+        # Empty cells mean "not provided" so Optional fields keep their defaults
+        return [
+            {key: value for key, value in row.items() if key and value not in ("", None)}
+            for row in csv.DictReader(io.StringIO(text))
+        ]
+    if fmt == "ndjson":
+        rows = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(e)
+        return rows
+    try:
+        rows = json.loads(text)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="JSON invalide")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Un tableau JSON est attendu")
+    return rows
+
+
+async def read_rows(request: Request) -> list:
+    """Rows from a JSON/NDJSON/CSV body or from a multipart upload in the `file` field"""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Fichier manquant (champ 'file')")
+        raw = await upload.read()
+        filename = (upload.filename or "").lower()
+        content_type = upload.content_type or ""
+        if filename.endswith(".csv"):
+            content_type = "text/csv"
+        elif filename.endswith((".ndjson", ".jsonl")):
+            content_type = "application/x-ndjson"
+    else:
+        raw = await request.body()
+
+    if "csv" in content_type:
+        fmt = "csv"
+    elif "ndjson" in content_type or "jsonl" in content_type:
+        fmt = "ndjson"
+    else:
+        fmt = "json"
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Encodage invalide (UTF-8 attendu)")
+    return parse_rows(text, fmt)
+
+
+def row_error(line: int, message: str) -> dict:
+    return {"ligne": line, "erreur": message}
+
+
+def validate_rows(rows: list, model) -> Tuple[List[Tuple[int, dict]], List[dict]]:
+    """Validate every row with the endpoint's Pydantic model; lines are 1-based"""
+    valid, errors = [], []
+    for line, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append(row_error(line, "Ligne invalide"))
+            continue
+        try:
+            valid.append((line, model(**row).dict()))
+        except ValidationError as e:
+            errors.append(row_error(line, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )))
+    return valid, errors
+
+
+async def insert_rows(repo, documents: List[Tuple[int, dict]]) -> Tuple[List[dict], List[dict]]:
+    """Unordered insert_many in batches; returns the inserted documents and per-row write errors"""
+    inserted, errors = [], []
+    for start in range(0, len(documents), IMPORT_BATCH_SIZE):
+        batch = documents[start:start + IMPORT_BATCH_SIZE]
+        failed = {}
+        try:
+            await repo.insert_many([document for _, document in batch], ordered=False)
+        except BulkWriteError as e:
+            failed = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+        for index, (line, document) in enumerate(batch):
+            if index in failed:
+                errors.append(row_error(line, failed[index]))
+            else:
+                document.pop("_id", None)
+                inserted.append(document)
+    return inserted, errors
+
+
+def import_summary(message: str, total: int, inserted: list, errors: list) -> dict:
+    return {
+        "message": message,
+        "total": total,
+        "importes": len(inserted),
+        "erreurs": sorted(errors, key=lambda error: error["ligne"]),
+        "ids": [document["id"] for document in inserted]
+    }
@@ -0,0 +1,103 @@
+"""Cascade deletes of animals and orphan cleanup."""
+from pymongo.errors import OperationFailure
+from typing import List
+import asyncio
+import sys
+
+import agenda
+import financial_rollups
+import growth
+import profitability
+import search
+
+CHILD_COLLECTIONS = ["medical_records", "reproduction_events", "financial_records", "weigh_ins"]
+ARCHIVE_SUFFIX = "_archive"
+
+# "Transaction numbers are only allowed on a replica set member or mongos"
+ILLEGAL_OPERATION = 20
+
+
+async def run_in_transaction(db, operation):
+    """Run `operation(session)` in a transaction, or with session=None on a standalone server"""
+    try:
+        async with await db.client.start_session() as session:
+            return await session.with_transaction(operation)
+    except OperationFailure as e:
+        if e.code != ILLEGAL_OPERATION:
+            raise
+    return await operation(None)
+
+
+async def delete_animals(db, animal_ids: List[str], archive: bool = False) -> dict:
+    """Delete animals and every record linked to them; returns deleted counts per collection"""
+    async def operation(session):
+        counts = {}
+        query = {"animal_id": {"$in": animal_ids}}
+        for name in CHILD_COLLECTIONS:
+            if archive:
+                documents = await db[name].find(query, {"_id": 0}, session=session).to_list(length=None)
+                if documents:
+                    await db[name + ARCHIVE_SUFFIX].insert_many(documents, session=session)
+            counts[name] = (await db[name].delete_many(query, session=session)).deleted_count
+        await financial_rollups.remove_animals(db, animal_ids, session=session)
+        await agenda.remove_animals(db, animal_ids, session=session)
+        await profitability.remove_animals(db, animal_ids, session=session)
+        await growth.invalidate_animals(db, animal_ids, session=session)
+        await search.remove_animals(db, animal_ids, session=session)
+
+        animals_query = {"id": {"$in": animal_ids}}
+        if archive:
+            animals = await db.animals.find(animals_query, {"_id": 0}, session=session).to_list(length=None)
+            if animals:
+                await db["animals" + ARCHIVE_SUFFIX].insert_many(animals, session=session)
+        counts["animals"] = (await db.animals.delete_many(animals_query, session=session)).deleted_count
+        return counts
+
+    return await run_in_transaction(db, operation)
+
+
+async def find_orphans(db) -> dict:
+    """animal_id values referenced by records but missing from animals, per collection"""
+    orphans = {}
+    for name in CHILD_COLLECTIONS:
+        groups = await db[name].aggregate([
+            {"$match": {"animal_id": {"$type": "string"}}},
+            {"$group": {"_id": "$animal_id", "nombre": {"$sum": 1}}},
+            {"$lookup": {"from": "animals", "localField": "_id", "foreignField": "id", "as": "animal"}},
+            {"$match": {"animal": {"$size": 0}}},
+            {"$project": {"animal": 0}}
+        ]).to_list(length=None)
+        orphans[name] = {group["_id"]: group["nombre"] for group in groups}
+    return orphans
+
+
+async def clean_orphans(db) -> dict:
+    """Delete orphaned records; returns deleted counts per collection"""
+    deleted = {}
+    for name, animal_ids in (await find_orphans(db)).items():
+        ids = list(animal_ids)
+        deleted[name] = (await db[name].delete_many({"animal_id": {"$in": ids}})).deleted_count if ids else 0
+        if not ids:
+            continue
+        if name == "financial_records":
+            await financial_rollups.remove_animals(db, ids)
+        elif name == "weigh_ins":
+            # Their animals are gone, and with them the waves and races the summaries were cached under
+            await growth.invalidate_all(db)
+        else:
+            await agenda.remove_animals(db, ids)
+        if name in ("financial_records", "medical_records"):
+            # Both feed the ledger: drop the orphans' animal rows and re-sum their waves
+            await profitability.remove_animals(db, ids)
+        await search.remove_animals(db, ids)
+    return deleted
+
+
+if __name__ == "__main__":
+    from database import db
+
+    if "--clean" in sys.argv:
+        print(asyncio.run(clean_orphans(db)))
+    else:
+        for collection, animal_ids in asyncio.run(find_orphans(db)).items():
+            print(f"{collection}: {sum(animal_ids.values())} enregistrements orphelins ({len(animal_ids)} animaux)")
@@ -0,0 +1,57 @@
+from pymongo import ReturnDocument
+from typing import Optional, List
+
+COUNTERS_COLLECTION = "counters"
+WAVE_COUNTER_ID = "numero_vague"
+WAVE_PREFIX = "Vague "
+
+
+def parse_wave_number(numero_vague: Optional[str]) -> Optional[int]:
+    if numero_vague and numero_vague.startswith(WAVE_PREFIX):
+        try:
+            return int(numero_vague[len(WAVE_PREFIX):])
+        except ValueError:
+            return None
+    return None
+
+
+async def observe_wave_number(db, numero_vague: Optional[str]):
+    """Make sure the counter never hands out a wave number that is already taken"""
+    number = parse_wave_number(numero_vague)
+    if number is not None:
+        await db[COUNTERS_COLLECTION].update_one(
+            {"_id": WAVE_COUNTER_ID}, {"$max": {"seq": number}}, upsert=True
+        )
+
+
+async def seed_wave_counter(db):
+    """Raise the counter to the highest existing "Vague N" (idempotent, safe to run concurrently)"""
+    existing_waves = await db.animals.distinct("numero_vague", {"type": "poulet"})
+    numbers = [parse_wave_number(wave) for wave in existing_waves]
+    await db[COUNTERS_COLLECTION].update_one(
+        {"_id": WAVE_COUNTER_ID},
+        {"$max": {"seq": max((n for n in numbers if n is not None), default=0)}},
+        upsert=True
+    )
+
+
+async def allocate_wave_numbers(db, count: int) -> List[str]:
+    """Reserve `count` consecutive wave numbers with a single atomic $inc"""
+    if count <= 0:
+        return []
+    counters = db[COUNTERS_COLLECTION]
+    counter = await counters.find_one_and_update(
+        {"_id": WAVE_COUNTER_ID}, {"$inc": {"seq": count}}, return_document=ReturnDocument.AFTER
+    )
+    if counter is None:
+        # Counter missing (startup seed skipped): seed from existing data, then allocate
+        await seed_wave_counter(db)
+        counter = await counters.find_one_and_update(
+            {"_id": WAVE_COUNTER_ID}, {"$inc": {"seq": count}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    last = counter["seq"]
+    return [f"{WAVE_PREFIX}{number}" for number in range(last - count + 1, last + 1)]
+
+
+async def next_wave_number(db) -> str:
+    return (await allocate_wave_numbers(db, 1))[0]
@@ -0,0 +1,120 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+from typing import AsyncIterator, Optional, List
+import os
+
+from dates import convert_filter, convert_update, to_api, to_storage
+from metrics import mongo_listener
+from profiler import PROFILING, profile_listener
+
+load_dotenv(Path(__file__).parent / '.env')
+
+# Environment variables
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
+MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'livestock_management')
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '0')) or None
+
+
+class Repository:
+    """Thin async wrapper around a Motor collection.
+
+    Every read excludes ``_id`` by default so handlers can return documents as-is.
+    Dates are stored as BSON dates but handlers and clients see strings: documents,
+    filters and $set updates are converted on the way in, results on the way out.
+    The raw collection stays reachable through ``collection`` for index management
+    and anything the helpers below do not cover.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    @property
+    def name(self) -> str:
+        return self.collection.name
+
+    async def find_one(self, query: dict, projection: Optional[dict] = None, **kwargs):
+        document = await self.collection.find_one(convert_filter(self.name, query), projection or {"_id": 0}, **kwargs)
+        return to_api(self.name, document)
+
+    async def get(self, document_id: str, projection: Optional[dict] = None):
+        return await self.find_one({"id": document_id}, projection)
+
+    def cursor(self, query: dict, projection: Optional[dict] = None, sort: Optional[list] = None,
+               limit: int = 0, **kwargs):
+        """Raw Motor cursor: documents keep their BSON dates"""
+        cursor = self.collection.find(convert_filter(self.name, query), projection or {"_id": 0}, **kwargs)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    async def find(self, query: dict, projection: Optional[dict] = None, sort: Optional[list] = None,
+                   limit: int = 0, **kwargs) -> List[dict]:
+        documents = await self.cursor(query, projection, sort, limit, **kwargs).to_list(length=None)
+        return [to_api(self.name, document) for document in documents]
+
+    async def stream(self, query: dict, projection: Optional[dict] = None, sort: Optional[list] = None,
+                     batch_size: int = 0) -> AsyncIterator[dict]:
+        cursor = self.cursor(query, projection, sort)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+        async for document in cursor:
+            yield to_api(self.name, document)
+
+    async def count(self, query: dict, **kwargs) -> int:
+        return await self.collection.count_documents(convert_filter(self.name, query), **kwargs)
+
+    async def distinct(self, key: str, query: Optional[dict] = None, **kwargs) -> list:
+        return await self.collection.distinct(key, query or {}, **kwargs)
+
+    async def aggregate(self, pipeline: list, **kwargs) -> List[dict]:
+        return await self.collection.aggregate(pipeline, **kwargs).to_list(length=None)
+
+    async def insert_one(self, document: dict, **kwargs):
+        return await self.collection.insert_one(to_storage(self.name, document), **kwargs)
+
+    async def insert_many(self, documents: List[dict], **kwargs):
+        return await self.collection.insert_many([to_storage(self.name, document) for document in documents], **kwargs)
+
+    async def update_one(self, query: dict, update: dict, **kwargs):
+        return await self.collection.update_one(
+            convert_filter(self.name, query), convert_update(self.name, update), **kwargs
+        )
+
+    async def delete_one(self, query: dict, **kwargs):
+        return await self.collection.delete_one(convert_filter(self.name, query), **kwargs)
+
+    async def find_one_and_delete(self, query: dict, projection: Optional[dict] = None, **kwargs):
+        document = await self.collection.find_one_and_delete(
+            convert_filter(self.name, query), projection=projection or {"_id": 0}, **kwargs
+        )
+        return to_api(self.name, document)
+
+    async def delete_many(self, query: dict, **kwargs):
+        return await self.collection.delete_many(convert_filter(self.name, query), **kwargs)
+
+
+# MongoDB setup
+client = AsyncIOMotorClient(
+    MONGO_URL,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    event_listeners=[mongo_listener, profile_listener] if PROFILING else [mongo_listener],
+)
+db = client[MONGO_DB_NAME]
+animals_repo = Repository(db.animals)
+medical_records_repo = Repository(db.medical_records)
+reproduction_events_repo = Repository(db.reproduction_events)
+financial_records_repo = Repository(db.financial_records)
+agenda_repo = Repository(db.agenda)
+ledger_repo = Repository(db.profitability_ledger)
+search_repo = Repository(db.search_index)
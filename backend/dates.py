@@ -0,0 +1,148 @@
+"""Native BSON date storage behind the string-based API."""
+from datetime import date, datetime, time
+from pydantic import BeforeValidator
+from typing import Annotated, Optional
+import asyncio
+
+DATE_FIELDS = {
+    "animals": ("date_naissance", "date_vente", "date_derniere_pesee"),
+    "medical_records": ("date_intervention", "date_rappel"),
+    "reproduction_events": ("date_event", "date_prevue_mise_bas"),
+    "financial_records": ("date_transaction",),
+    "agenda": ("date",),
+}
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+MIGRATION_MARKER_ID = "dates_migration"
+
+
+def parse_date(value) -> datetime:
+    """A "YYYY-MM-DD" date, an ISO timestamp or a date object as the datetime stored in BSON"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return datetime.fromisoformat(value)
+
+
+def format_date(value: datetime) -> str:
+    return value.date().isoformat()
+
+
+def validate_date_string(value):
+    """Model-layer check of API dates: normalise to "YYYY-MM-DD", empty means not provided"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    try:
+        return datetime.fromisoformat(str(value)).date().isoformat()
+    except ValueError:
+        raise ValueError("Date invalide, format attendu AAAA-MM-JJ")
+
+
+DateStr = Annotated[str, BeforeValidator(validate_date_string)]
+OptionalDateStr = Annotated[Optional[str], BeforeValidator(validate_date_string)]
+
+
+def _fields(collection: str):
+    return DATE_FIELDS.get(collection, ()) + TIMESTAMP_FIELDS
+
+
+def _to_bson(value):
+    if isinstance(value, str):
+        try:
+            return parse_date(value)
+        except ValueError:
+            return value
+    if isinstance(value, date):
+        return parse_date(value)
+    if isinstance(value, list):
+        return [_to_bson(item) for item in value]
+    if isinstance(value, dict):
+        return {operator: _to_bson(operand) for operator, operand in value.items()}
+    return value
+
+
+def to_storage(collection: str, document: dict) -> dict:
+    """Copy of an API document with its dates converted to BSON dates"""
+    converted = dict(document)
+    for field in _fields(collection):
+        value = converted.get(field)
+        if value == "":
+            converted[field] = None
+        elif value is not None:
+            converted[field] = _to_bson(value)
+    return converted
+
+
+def to_api(collection: str, document: Optional[dict]) -> Optional[dict]:
+    """Dates back to "YYYY-MM-DD" strings and timestamps to ISO strings, in place"""
+    if document is None:
+        return None
+    for field in DATE_FIELDS.get(collection, ()):
+        value = document.get(field)
+        if isinstance(value, datetime):
+            document[field] = format_date(value)
+    for field in TIMESTAMP_FIELDS:
+        value = document.get(field)
+        if isinstance(value, datetime):
+            document[field] = value.isoformat()
+    return document
+
+
+def convert_filter(collection: str, query: dict) -> dict:
+    """Convert string dates in a filter (including $or/$and branches and operators) to BSON dates"""
+    fields = _fields(collection)
+    converted = {}
+    for key, value in query.items():
+        if key in ("$or", "$and", "$nor"):
+            converted[key] = [convert_filter(collection, branch) for branch in value]
+        elif key in fields:
+            converted[key] = _to_bson(value)
+        else:
+            converted[key] = value
+    return converted
+
+
+def convert_update(collection: str, update: dict) -> dict:
+    return {
+        operator: to_storage(collection, fields) if operator in ("$set", "$setOnInsert") else fields
+        for operator, fields in update.items()
+    }
+
+
+def day_string(field: str) -> dict:
+    """Aggregation expression giving "YYYY-MM-DD" for a BSON date (or a not yet migrated string)"""
+    return {"$cond": [
+        {"$eq": [{"$type": f"${field}"}, "date"]},
+        {"$dateToString": {"format": "%Y-%m-%d", "date": f"${field}"}},
+        {"$substrCP": [f"${field}", 0, 10]}
+    ]}
+
+
+async def migrate_dates(db, force: bool = False) -> dict:
+    """Rewrite string dates as BSON dates; unparseable values are left untouched"""
+    if not force and await db.counters.find_one({"_id": MIGRATION_MARKER_ID}):
+        return {}
+    migrated = {}
+    for collection in DATE_FIELDS:
+        migrated[collection] = 0
+        for field in _fields(collection):
+            result = await db[collection].update_many({field: {"$type": "string"}}, [{"$set": {field: {"$cond": [
+                {"$eq": [f"${field}", ""]},
+                None,
+                # BSON dates keep milliseconds, isoformat() timestamps carry microseconds
+                {"$dateFromString": {"dateString": {"$substrCP": [f"${field}", 0, 23]}, "onError": f"${field}"}}
+            ]}}}])
+            migrated[collection] += result.modified_count
+    await db.counters.update_one(
+        {"_id": MIGRATION_MARKER_ID}, {"$set": {"date": datetime.now()}}, upsert=True
+    )
+    return migrated
+
+
+if __name__ == "__main__":
+    from database import db
+
+    print(asyncio.run(migrate_dates(db, force=True)))
@@ -0,0 +1,22 @@
+from typing import List
+
+from animal_cache import get_animal_summaries
+
+
+def animal_info(animal: dict, fields=("nom", "type", "race")) -> dict:
+    info = {"nom": animal.get("nom", f"{animal['type']} #{animal['id'][-4:]}")}
+    for field in fields:
+        if field != "nom":
+            info[field] = animal[field]
+    return info
+
+
+async def enrich_with_animal_info(records: List[dict], id_field: str = "animal_id",
+                                  info_field: str = "animal_info", fields=("nom", "type", "race")) -> List[dict]:
+    """Attach animal_info-style summaries to records with at most one round-trip for the whole list"""
+    animals = await get_animal_summaries(record.get(id_field) for record in records)
+    for record in records:
+        animal = animals.get(record.get(id_field))
+        if animal:
+            record[info_field] = animal_info(animal, fields)
+    return records
@@ -0,0 +1,46 @@
+from typing import AsyncIterator, List
+import csv
+import io
+import json
+import zlib
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def stream_rows(documents: AsyncIterator[dict], fmt: str, fields: List[str]) -> AsyncIterator[bytes]:
+    """Encode streamed documents as NDJSON or CSV, EXPORT_BATCH_SIZE rows per chunk"""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+
+    rows = 0
+    async for document in documents:
+        if writer:
+            writer.writerow(document)
+        else:
+            buffer.write(json.dumps(document, ensure_ascii=False, default=str))
+            buffer.write("\n")
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream on the fly into a single gzip member"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,153 @@
+"""Daily financial rollups of financial_records, read by get_financial_stats."""
+from datetime import datetime
+from pymongo import UpdateOne
+from typing import Optional, List
+import asyncio
+
+from dates import day_string, format_date, parse_date
+
+ROLLUP_COLLECTION = "financial_rollups"
+TRANSACTION_TYPES = ["depense", "recette"]
+
+
+def series_bucket(day, granularite: str):
+    """Bucket key of a "YYYY-MM-DD" day expression for each granularity of the financial time series"""
+    return {
+        "jour": day,
+        "semaine": {"$dateToString": {
+            "format": "%G-W%V",
+            "date": {"$dateFromString": {"dateString": day, "format": "%Y-%m-%d", "onError": None}}
+        }},
+        "mois": {"$substrCP": [day, 0, 7]},
+    }[granularite]
+
+
+def rollup_key(record: dict) -> dict:
+    day = record["date_transaction"]
+    return {
+        "date": format_date(day) if isinstance(day, datetime) else day[:10],
+        "type_transaction": record["type_transaction"],
+        "categorie": record["categorie"],
+        "animal_id": record.get("animal_id"),
+    }
+
+
+def is_day_aligned(start_date: Optional[str], end_date: Optional[str]) -> bool:
+    for bound in (start_date, end_date):
+        if bound is None:
+            continue
+        try:
+            datetime.strptime(bound, "%Y-%m-%d")
+        except ValueError:
+            return False
+    return True
+
+
+async def apply_record(db, record: dict, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) one financial record from its daily rollup"""
+    key = rollup_key(record)
+    rollups = db[ROLLUP_COLLECTION]
+    await rollups.update_one(
+        key,
+        {"$inc": {"montant": sign * record["montant"], "nombre": sign}},
+        upsert=True
+    )
+    if sign < 0:
+        await rollups.delete_one({**key, "nombre": {"$lte": 0}})
+
+
+async def add_records(db, records: List[dict]):
+    """Fold many new records into their rollups with one unordered bulk write"""
+    deltas = {}
+    for record in records:
+        key = tuple(rollup_key(record).items())
+        montant, nombre = deltas.get(key, (0, 0))
+        deltas[key] = (montant + record["montant"], nombre + 1)
+    if deltas:
+        await db[ROLLUP_COLLECTION].bulk_write([
+            UpdateOne(dict(key), {"$inc": {"montant": montant, "nombre": nombre}}, upsert=True)
+            for key, (montant, nombre) in deltas.items()
+        ], ordered=False)
+
+
+async def remove_animals(db, animal_ids: List[str], session=None):
+    """Drop the rollups of animals whose financial records were cascade-deleted"""
+    await db[ROLLUP_COLLECTION].delete_many({"animal_id": {"$in": animal_ids}}, session=session)
+
+
+async def rebuild(db):
+    """Recompute every rollup from financial_records and atomically replace the collection"""
+    await db.financial_records.aggregate([
+        {"$group": {
+            "_id": {
+                "date": day_string("date_transaction"),
+                "type_transaction": "$type_transaction",
+                "categorie": "$categorie",
+                "animal_id": {"$ifNull": ["$animal_id", None]}
+            },
+            "montant": {"$sum": "$montant"},
+            "nombre": {"$sum": 1}
+        }},
+        {"$project": {
+            "_id": 0,
+            "date": "$_id.date",
+            "type_transaction": "$_id.type_transaction",
+            "categorie": "$_id.categorie",
+            "animal_id": "$_id.animal_id",
+            "montant": 1,
+            "nombre": 1
+        }},
+        {"$out": ROLLUP_COLLECTION}
+    ]).to_list(length=None)
+
+
+async def ensure_rollups(db):
+    """Backfill the rollups on first start against an existing financial history"""
+    if not await db[ROLLUP_COLLECTION].find_one({}) and await db.financial_records.find_one({}):
+        await rebuild(db)
+
+
+async def aggregate_financial_totals(db, start_date: Optional[str], end_date: Optional[str],
+                                     granularite: Optional[str] = None, use_rollups: bool = True) -> dict:
+    """Sums per (type, categorie) and the optional time series, from rollups or from the raw records.
+
+    Returns {"par_categorie": [{"_id": {"type", "categorie"}, "montant", "nombre"}],
+             "serie": [{"_id": {"periode", "type"}, "montant"}]}
+    """
+    query = {"type_transaction": {"$in": TRANSACTION_TYPES}}
+    if use_rollups:
+        # Rollup days are "YYYY-MM-DD" strings, which sort chronologically
+        collection, day, count = db[ROLLUP_COLLECTION], "$date", {"$sum": "$nombre"}
+        if start_date and end_date:
+            query["date"] = {"$gte": start_date, "$lte": end_date}
+    else:
+        collection, day, count = db.financial_records, day_string("date_transaction"), {"$sum": 1}
+        if start_date and end_date:
+            query["date_transaction"] = {"$gte": parse_date(start_date), "$lte": parse_date(end_date)}
+
+    facets = {
+        "par_categorie": [
+            {"$group": {
+                "_id": {"type": "$type_transaction", "categorie": "$categorie"},
+                "montant": {"$sum": "$montant"},
+                "nombre": count
+            }}
+        ]
+    }
+    if granularite:
+        facets["serie"] = [
+            {"$group": {
+                "_id": {"periode": series_bucket(day, granularite), "type": "$type_transaction"},
+                "montant": {"$sum": "$montant"}
+            }},
+            {"$sort": {"_id.periode": 1}}
+        ]
+    result = await collection.aggregate([{"$match": query}, {"$facet": facets}]).to_list(length=None)
+    return result[0]
+
+
+if __name__ == "__main__":
+    from database import db
+
+    asyncio.run(rebuild(db))
+    print("Rollups financiers reconstruits")
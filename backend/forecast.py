@@ -0,0 +1,234 @@
+"""Herd and farrowing forecast simulated from the reproduction history."""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+import numpy as np
+
+from agenda import GESTATION_DAYS, WEANING_DAYS
+from dates import format_date, parse_date
+
+SIMULATIONS = 500
+SEED = 0  # Fixed so a cached forecast and its recomputation agree
+MATINGS = ("saillie", "insemination")
+# A mating is settled once its due date is this far behind: a mise_bas by then counts
+# as its farrowing, none means it failed
+LATE_FARROWING_DAYS = 21
+RETURN_TO_SERVICE_DAYS = 7  # Weaning to next mating
+DEFAULT_LITTER_SIZE = {"porc": 11, "poulet": 1}
+DEFAULT_FARROWING_RATE = 0.85
+DEFAULT_WEANING_RATE = 0.9
+
+
+def event_day(event: dict, field: str = "date_event") -> datetime:
+    return parse_date(event[field])
+
+
+def litter_size(event: dict) -> Optional[int]:
+    size = event.get("nombre_petits_vivants")
+    return size if size is not None else event.get("nombre_petits_nes")
+
+
+def herd_statistics(histories: List[List[dict]], animal_type: str, today: datetime) -> dict:
+    """Litter sizes, farrowing rate, farrowing interval and weaning rate of the herd.
+
+    histories holds one list of reproduction events per sow, oldest first. The farrowing
+    rate is the share of settled matings followed by a mise_bas, the weaning rate the
+    sevrage count over its litter; without history the DEFAULT_* values apply.
+    """
+    gestation = GESTATION_DAYS.get(animal_type, GESTATION_DAYS["porc"])
+    litters, intervals, weaning_ratios = [], [], []
+    settled, farrowed = 0, 0
+    for events in histories:
+        farrowings = [event for event in events if event["type_event"] == "mise_bas"]
+        litters += [size for size in map(litter_size, farrowings) if size is not None]
+        days = [event_day(event) for event in farrowings]
+        # Farrowings closer than one gestation are duplicate records
+        intervals += [(later - earlier).days for earlier, later in zip(days, days[1:])
+                      if (later - earlier).days >= gestation]
+
+        for event in events:
+            if event["type_event"] in MATINGS and event.get("date_prevue_mise_bas"):
+                deadline = event_day(event, "date_prevue_mise_bas") + timedelta(days=LATE_FARROWING_DAYS)
+                if deadline < today:
+                    settled += 1
+                    farrowed += any(event_day(event) < day <= deadline for day in days)
+            elif event["type_event"] == "sevrage" and event.get("nombre_petits_vivants") is not None:
+                # Weaned count over the litter of the last farrowing before it
+                previous = [litter_size(farrowing) for farrowing in farrowings
+                            if event_day(farrowing) <= event_day(event)]
+                if previous and previous[-1]:
+                    weaning_ratios.append(min(event["nombre_petits_vivants"] / previous[-1], 1.0))
+
+    return {
+        "portees_historiques": len(litters),
+        "tailles_portees": litters or [DEFAULT_LITTER_SIZE.get(animal_type, 1)],
+        "taux_mise_bas": farrowed / settled if settled else DEFAULT_FARROWING_RATE,
+        "intervalle_mise_bas_jours": float(np.mean(intervals)) if intervals else float(
+            gestation + WEANING_DAYS.get(animal_type, 0) + RETURN_TO_SERVICE_DAYS
+        ),
+        "taux_sevrage": float(np.mean(weaning_ratios)) if weaning_ratios else DEFAULT_WEANING_RATE,
+    }
+
+
+def breeding_schedule(histories: List[List[dict]], animal_type: str, today: datetime, interval: float) -> dict:
+    """Day (from today) of each sow's next expected farrowing, and the unweaned litters.
+
+    A sow with a pending saillie/insemination farrows at its date_prevue_mise_bas, an
+    open sow at her last farrowing + the interval, no sooner than one gestation from today.
+    """
+    gestation = GESTATION_DAYS.get(animal_type, GESTATION_DAYS["porc"])
+    weaning = WEANING_DAYS.get(animal_type)
+    next_farrowing, nursing_days, nursing_sizes = [], [], []
+    for events in histories:
+        farrowings = [event for event in events if event["type_event"] == "mise_bas"]
+        last_farrowing = event_day(farrowings[-1]) if farrowings else None
+        pending = [
+            event for event in events
+            if event["type_event"] in MATINGS and event.get("date_prevue_mise_bas")
+            and (last_farrowing is None or event_day(event) > last_farrowing)
+            and event_day(event, "date_prevue_mise_bas") + timedelta(days=LATE_FARROWING_DAYS) >= today
+        ]
+        if pending:
+            due = (event_day(pending[-1], "date_prevue_mise_bas") - today).days
+            next_farrowing.append(max(due, 0))
+        elif last_farrowing is not None:
+            next_farrowing.append(max((last_farrowing - today).days + interval, gestation))
+        else:
+            next_farrowing.append(gestation)
+
+        if weaning and last_farrowing is not None and litter_size(farrowings[-1]):
+            weaned = any(event["type_event"] == "sevrage" and event_day(event) >= last_farrowing for event in events)
+            weaning_day = (last_farrowing - today).days + weaning
+            if not weaned and weaning_day >= 0:
+                nursing_days.append(weaning_day)
+                nursing_sizes.append(litter_size(farrowings[-1]))
+    return {
+        "prochaine_mise_bas": np.array(next_farrowing, dtype=float),
+        "sevrages_jours": np.array(nursing_days, dtype=np.int64),
+        "sevrages_portees": np.array(nursing_sizes, dtype=np.int64),
+    }
+
+
+def simulate(next_farrowing: np.ndarray, interval: float, litters: np.ndarray, farrowing_rate: float,
+             weaning_rate: float, weaning_days: Optional[int], weeks: int, nursing_days: np.ndarray,
+             nursing_sizes: np.ndarray, simulations: int = SIMULATIONS, seed: int = SEED) -> dict:
+    """Per-run weekly farrowings, births, weanings and pre-weaning losses, shape (simulations, weeks).
+
+    Each sow farrows every interval from next_farrowing, each farrowing happens with
+    farrowing_rate, draws its litter from litters and weans it with weaning_rate. Litters
+    already nursing are weaned on schedule but left out of pertes: they were born before
+    the window, so they are not in the births the losses are taken from.
+    """
+    horizon = weeks * 7
+    rng = np.random.default_rng(seed)
+    runs = np.arange(simulations)[:, None] * weeks
+
+    def per_week(values, days):
+        # Sum each run's values into its week: one bincount over run * weeks + week
+        index = (runs + days[None, :] // 7).ravel()
+        return np.bincount(index, weights=np.broadcast_to(values, (simulations, len(days))).ravel(),
+                           minlength=simulations * weeks).reshape(simulations, weeks)
+
+    # Every sow's farrowings within the horizon: first one, then every interval
+    cycles = int(np.ceil(horizon / interval)) + 1
+    due = next_farrowing[:, None] + interval * np.arange(cycles)[None, :]
+    days = np.floor(due[due < horizon]).astype(np.int64)
+
+    happens = rng.random((simulations, len(days))) < farrowing_rate
+    born = np.where(happens, rng.choice(litters, size=(simulations, len(days))), 0)
+    weaned = rng.binomial(born, weaning_rate)
+    result = {
+        "mises_bas": per_week(happens, days),
+        "naissances": per_week(born, days),
+        "sevrages": np.zeros((simulations, weeks)),
+        "pertes": np.zeros((simulations, weeks)),
+    }
+    if weaning_days is not None:
+        weaning = days + weaning_days
+        kept = weaning < horizon
+        result["sevrages"] += per_week(weaned[:, kept], weaning[kept])
+        result["pertes"] += per_week((born - weaned)[:, kept], weaning[kept])
+        kept = nursing_days < horizon
+        result["sevrages"] += per_week(
+            rng.binomial(nursing_sizes[kept], weaning_rate, size=(simulations, int(kept.sum()))), nursing_days[kept]
+        )
+    return result
+
+
+def summarize(runs: dict, head_count: int, start: datetime) -> List[dict]:
+    """Weekly mean and 10th-90th percentile range over the runs.
+
+    effectif is today's head count plus the births in the window, less pre-weaning
+    losses; sales and deaths of registered animals are not projected.
+    """
+    herd = head_count + np.cumsum(runs["naissances"] - runs["pertes"], axis=1)
+    births_low, births_high = np.percentile(runs["naissances"], [10, 90], axis=0)
+    herd_low, herd_high = np.percentile(herd, [10, 90], axis=0)
+    means = {name: values.mean(axis=0) for name, values in runs.items()}
+    herd_mean = herd.mean(axis=0)
+    return [
+        {
+            "semaine": week,
+            "debut": format_date(start + timedelta(weeks=week)),
+            "mises_bas": round(float(means["mises_bas"][week]), 2),
+            "naissances": round(float(means["naissances"][week]), 1),
+            "naissances_min": round(float(births_low[week]), 1),
+            "naissances_max": round(float(births_high[week]), 1),
+            "sevrages": round(float(means["sevrages"][week]), 1),
+            "effectif": round(float(herd_mean[week]), 1),
+            "effectif_min": round(float(herd_low[week]), 1),
+            "effectif_max": round(float(herd_high[week]), 1),
+        }
+        for week in range(len(herd_mean))
+    ]
+
+
+async def herd_forecast(db, animal_type: str, weeks: int, today: Optional[date] = None) -> dict:
+    """Forecast of one animal type from three queries: its breeding females, their events, its head count"""
+    start = datetime.combine(today or date.today(), time())
+    sows = await db.animals.find(
+        {"type": animal_type, "sexe": "F", "statut": "actif"}, {"_id": 0, "id": 1}
+    ).to_list(length=None)
+    events = defaultdict(list)
+    async for event in db.reproduction_events.find(
+        {"animal_id": {"$in": [sow["id"] for sow in sows]}},
+        {"_id": 0, "animal_id": 1, "type_event": 1, "date_event": 1, "date_prevue_mise_bas": 1,
+         "nombre_petits_nes": 1, "nombre_petits_vivants": 1}
+    ):
+        events[event["animal_id"]].append(event)
+    # Breeding herd: females with at least one reproduction event
+    histories = [sorted(history, key=event_day) for history in events.values()]
+    heads = await db.animals.aggregate([
+        {"$match": {"type": animal_type, "statut": "actif"}},
+        {"$group": {"_id": None, "total": {"$sum": {"$ifNull": ["$nombre_animaux", 1]}}}},
+    ]).to_list(length=None)
+    head_count = int(heads[0]["total"]) if heads else 0
+
+    statistics = herd_statistics(histories, animal_type, start)
+    interval = statistics["intervalle_mise_bas_jours"]
+    schedule = breeding_schedule(histories, animal_type, start, interval)
+    litters = np.array(statistics.pop("tailles_portees"), dtype=np.int64)
+    runs = simulate(
+        schedule["prochaine_mise_bas"], interval, litters, statistics["taux_mise_bas"],
+        statistics["taux_sevrage"], WEANING_DAYS.get(animal_type), weeks,
+        schedule["sevrages_jours"], schedule["sevrages_portees"]
+    )
+    statistics.update({
+        "taille_portee_moyenne": round(float(litters.mean()), 2),
+        "taux_mise_bas": round(statistics["taux_mise_bas"], 3),
+        "intervalle_mise_bas_jours": round(interval, 1),
+        "taux_sevrage": round(statistics["taux_sevrage"], 3),
+    })
+    semaines = summarize(runs, head_count, start)
+    return {
+        "type": animal_type,
+        "date_debut": format_date(start),
+        "horizon_semaines": weeks,
+        "simulations": SIMULATIONS,
+        "truies": len(histories),
+        "effectif_actuel": head_count,
+        "statistiques": statistics,
+        "total_naissances": round(float(runs["naissances"].sum(axis=1).mean()), 1),
+        "total_sevrages": round(float(runs["sevrages"].sum(axis=1).mean()), 1),
+        "semaines": semaines,
+    }
@@ -0,0 +1,243 @@
+"""Weigh-in history in monthly buckets per animal, and cached growth summaries per wave and race."""
+from collections import defaultdict
+from datetime import datetime
+from pymongo import UpdateOne
+from typing import Iterable, List, Optional
+import numpy as np
+
+from dates import format_date, parse_date
+
+WEIGH_INS_COLLECTION = "weigh_ins"
+SUMMARIES_COLLECTION = "growth_summaries"
+WAVE = "vague"
+RACE = "race"
+GROUP_FIELDS = {WAVE: "numero_vague", RACE: "race"}
+
+
+def bucket_updates(weigh_ins: List[dict]) -> List[UpdateOne]:
+    """One upsert per (animal, month) bucket for a batch of {id, animal_id, date, poids}"""
+    buckets = defaultdict(list)
+    for weigh_in in weigh_ins:
+        day = parse_date(weigh_in["date"])
+        buckets[(weigh_in["animal_id"], day.strftime("%Y-%m"))].append(
+            {"id": weigh_in["id"], "date": day, "poids": weigh_in["poids"]}
+        )
+    return [
+        UpdateOne({"animal_id": animal_id, "mois": mois}, {
+            "$push": {"mesures": {"$each": mesures}},
+            "$inc": {"nombre": len(mesures)},
+            "$min": {"premiere_date": min(mesure["date"] for mesure in mesures)},
+            "$max": {"derniere_date": max(mesure["date"] for mesure in mesures)},
+        }, upsert=True)
+        for (animal_id, mois), mesures in buckets.items()
+    ]
+
+
+def latest_weights(weigh_ins: List[dict]) -> dict:
+    """animal_id -> (date, poids) of its most recent weigh-in in the batch"""
+    latest = {}
+    for weigh_in in weigh_ins:
+        day = parse_date(weigh_in["date"])
+        if weigh_in["animal_id"] not in latest or day >= latest[weigh_in["animal_id"]][0]:
+            latest[weigh_in["animal_id"]] = (day, weigh_in["poids"])
+    return latest
+
+
+async def add_weigh_ins(db, weigh_ins: List[dict]):
+    """Store weigh-ins and move Animal.poids to the newest one of each animal"""
+    if not weigh_ins:
+        return
+    await db[WEIGH_INS_COLLECTION].bulk_write(bucket_updates(weigh_ins), ordered=False)
+    # Back-dated weigh-ins only fill the history
+    await db.animals.bulk_write([
+        UpdateOne(
+            {"id": animal_id, "$or": [{"date_derniere_pesee": None}, {"date_derniere_pesee": {"$lte": day}}]},
+            {"$set": {"poids": poids, "date_derniere_pesee": day}}
+        )
+        for animal_id, (day, poids) in latest_weights(weigh_ins).items()
+    ], ordered=False)
+
+
+async def invalidate(db, waves: Iterable[Optional[str]] = (), races: Iterable[Optional[str]] = (), session=None):
+    """Drop the cached summaries of these groups"""
+    keys = [{"niveau": WAVE, "cle": wave} for wave in set(waves) if wave]
+    keys += [{"niveau": RACE, "cle": race} for race in set(races) if race]
+    if keys:
+        await db[SUMMARIES_COLLECTION].delete_many({"$or": keys}, session=session)
+
+
+async def invalidate_animals(db, animal_ids: List[str], session=None):
+    """Drop the summaries of the waves and races these animals currently belong to"""
+    animals = await db.animals.find(
+        {"id": {"$in": animal_ids}}, {"_id": 0, "numero_vague": 1, "race": 1}, session=session
+    ).to_list(length=None)
+    await invalidate(db, [animal.get("numero_vague") for animal in animals],
+                     [animal.get("race") for animal in animals], session=session)
+
+
+async def invalidate_all(db):
+    """Drop every cached summary, for removed weigh-ins whose waves and races are unknown (orphans)"""
+    await db[SUMMARIES_COLLECTION].delete_many({})
+
+
+async def animal_history(db, animal_id: str, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> List[dict]:
+    """Weigh-ins of one animal, oldest first"""
+    query = {"animal_id": animal_id}
+    if start:
+        query["derniere_date"] = {"$gte": start}
+    if end:
+        query["premiere_date"] = {"$lte": end}
+    mesures = []
+    async for bucket in db[WEIGH_INS_COLLECTION].find(query, {"_id": 0, "mesures": 1}).sort("mois", 1):
+        mesures.extend(
+            mesure for mesure in bucket["mesures"]
+            if (start is None or mesure["date"] >= start) and (end is None or mesure["date"] <= end)
+        )
+    mesures.sort(key=lambda mesure: mesure["date"])
+    return mesures
+
+
+def growth_summary(animal_index: np.ndarray, age_days: np.ndarray, weights: np.ndarray,
+                   head_counts: np.ndarray) -> dict:
+    """Average daily gain and weekly growth curve of a group, from aligned per-weigh-in arrays.
+
+    animal_index[i] is the position in head_counts of the animal weighed at age_days[i].
+    """
+    animals = len(head_counts)
+    if not len(weights):
+        return {"nombre_pesees": 0, "gmq": None, "poids_moyen_dernier": None, "courbe": []}
+    age_days = age_days.astype(float)
+    count = np.bincount(animal_index, minlength=animals)
+    sum_x = np.bincount(animal_index, age_days, animals)
+    sum_y = np.bincount(animal_index, weights, animals)
+    sum_xx = np.bincount(animal_index, age_days * age_days, animals)
+    sum_xy = np.bincount(animal_index, age_days * weights, animals)
+
+    # Per-animal least-squares slope, for animals weighed on at least two different days
+    denominator = count * sum_xx - sum_x * sum_x
+    fitted = (count >= 2) & (denominator > 0)
+    slopes = (count * sum_xy - sum_x * sum_y)[fitted] / denominator[fitted]
+    gmq = float(np.average(slopes, weights=head_counts[fitted])) if fitted.any() else None
+
+    # Latest weigh-in of each animal: last position per animal once sorted by (animal, age)
+    order = np.lexsort((age_days, animal_index))
+    last = order[np.r_[animal_index[order][1:] != animal_index[order][:-1], True]]
+    poids_moyen_dernier = float(np.average(weights[last], weights=head_counts[animal_index[last]]))
+
+    week = np.maximum(age_days, 0).astype(int) // 7
+    heads = head_counts[animal_index]
+    weighted = np.bincount(week, weights * heads)
+    total_heads = np.bincount(week, heads)
+    samples = np.bincount(week)
+    weeks = np.nonzero(samples)[0]
+    return {
+        "nombre_pesees": int(len(weights)),
+        "gmq": round(gmq, 4) if gmq is not None else None,
+        "poids_moyen_dernier": round(poids_moyen_dernier, 3),
+        "courbe": [
+            {"semaine": int(w), "age_jours": int(w) * 7, "poids_moyen": round(float(weighted[w] / total_heads[w]), 3),
+             "pesees": int(samples[w])}
+            for w in weeks
+        ],
+    }
+
+
+def animal_gain(mesures: List[dict]) -> Optional[float]:
+    """Average daily gain of one animal's weigh-ins, same least-squares fit as the group summaries"""
+    if not mesures:
+        return None
+    days = np.array([(mesure["date"] - mesures[0]["date"]).days for mesure in mesures])
+    weights = np.array([mesure["poids"] for mesure in mesures], dtype=float)
+    return growth_summary(np.zeros(len(mesures), dtype=np.int64), days, weights, np.ones(1))["gmq"]
+
+
+async def compute_summaries(db, niveau: str, keys: List[str]) -> List[dict]:
+    """Summaries of several groups from two queries: their animals, then those animals' buckets"""
+    field = GROUP_FIELDS[niveau]
+    animals = await db.animals.find(
+        {field: {"$in": keys}},
+        {"_id": 0, "id": 1, "type": 1, "date_naissance": 1, "nombre_animaux": 1, field: 1}
+    ).to_list(length=None)
+    positions = {animal["id"]: position for position, animal in enumerate(animals)}
+    animal_index, age_days, weights = [], [], []
+    async for bucket in db[WEIGH_INS_COLLECTION].find(
+        {"animal_id": {"$in": list(positions)}}, {"_id": 0, "animal_id": 1, "mesures": 1}
+    ):
+        position = positions[bucket["animal_id"]]
+        born = parse_date(animals[position]["date_naissance"])
+        for mesure in bucket["mesures"]:
+            animal_index.append(position)
+            age_days.append((mesure["date"] - born).days)
+            weights.append(mesure["poids"])
+
+    animal_index = np.array(animal_index, dtype=np.int64)
+    age_days = np.array(age_days, dtype=np.int64)
+    weights = np.array(weights, dtype=float)
+    groups = np.array([animal[field] for animal in animals], dtype=object)
+    heads = np.array([animal.get("nombre_animaux") or 1 for animal in animals], dtype=float)
+    summaries = []
+    for key in keys:
+        members = np.nonzero(groups == key)[0]
+        if not len(members):
+            continue
+        # Renumber the group's animals 0..n-1 and keep their weigh-ins
+        local = np.full(len(animals), -1)
+        local[members] = np.arange(len(members))
+        selected = local[animal_index] >= 0
+        summary = growth_summary(local[animal_index[selected]], age_days[selected], weights[selected], heads[members])
+        summaries.append({
+            "niveau": niveau,
+            "cle": key,
+            "type": animals[members[0]].get("type"),
+            "nombre_lots": int(len(members)),
+            "nombre_animaux": int(heads[members].sum()),
+            **summary,
+            "updated_at": datetime.now(),
+        })
+    return summaries
+
+
+async def get_summaries(db, niveau: str, keys: List[str]) -> List[dict]:
+    """Cached summaries of these groups, computing and storing the missing ones"""
+    cached = {
+        summary["cle"]: summary
+        async for summary in db[SUMMARIES_COLLECTION].find({"niveau": niveau, "cle": {"$in": keys}}, {"_id": 0})
+    }
+    missing = [key for key in keys if key not in cached]
+    if missing:
+        computed = await compute_summaries(db, niveau, missing)
+        if computed:
+            await db[SUMMARIES_COLLECTION].bulk_write([
+                UpdateOne({"niveau": niveau, "cle": summary["cle"]}, {"$set": summary}, upsert=True)
+                for summary in computed
+            ], ordered=False)
+        for summary in computed:
+            cached[summary["cle"]] = summary
+    return [to_api(cached[key]) for key in keys if key in cached]
+
+
+def to_api(summary: dict) -> dict:
+    summary = dict(summary)
+    if isinstance(summary.get("updated_at"), datetime):
+        summary["updated_at"] = summary["updated_at"].isoformat()
+    return summary
+
+
+async def ensure_history(db, batch_size: int = 1000):
+    """Open the history of animals registered before weigh-ins existed with their current poids"""
+    if await db[WEIGH_INS_COLLECTION].find_one({}) or not await db.animals.find_one({}):
+        return
+    batch = []
+    async for animal in db.animals.find({"poids": {"$ne": None}}, {"_id": 0, "id": 1, "poids": 1, "updated_at": 1}):
+        day = parse_date(animal.get("updated_at") or datetime.now())
+        batch.append({"id": f"{animal['id']}:initial", "animal_id": animal["id"], "date": day, "poids": animal["poids"]})
+        if len(batch) >= batch_size:
+            await db[WEIGH_INS_COLLECTION].bulk_write(bucket_updates(batch), ordered=False)
+            batch.clear()
+    if batch:
+        await db[WEIGH_INS_COLLECTION].bulk_write(bucket_updates(batch), ordered=False)
+
+
+def history_to_api(mesures: List[dict]) -> List[dict]:
+    return [{"id": mesure["id"], "date": format_date(mesure["date"]), "poids": mesure["poids"]} for mesure in mesures]
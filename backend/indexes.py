@@ -0,0 +1,211 @@
+from pymongo import ASCENDING, DESCENDING
+from typing import AsyncIterator, List
+
+# Index declarations per collection: (keys, options).
+# Compound indexes follow the equality -> sort -> range order of the queries in routers/.
+INDEXES = {
+    "animals": [
+        ([("id", ASCENDING)], {"unique": True}),
+        # get_animals: {statut} / {type, statut} paged on created_at, id; get_stats
+        ([("statut", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], {}),
+        ([("statut", ASCENDING), ("type", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], {}),
+        # seed_wave_counter: distinct numero_vague over {type: "poulet"}
+        ([("type", ASCENDING), ("numero_vague", ASCENDING)], {}),
+        # get_breeding_males: {type, sexe, statut} sorted by nom
+        ([("type", ASCENDING), ("sexe", ASCENDING), ("statut", ASCENDING), ("nom", ASCENDING)], {}),
+        # Growth summaries: members of the requested waves / races, and their lists
+        ([("numero_vague", ASCENDING)], {}),
+        ([("race", ASCENDING)], {}),
+    ],
+    "medical_records": [
+        ([("id", ASCENDING)], {"unique": True}),
+        # get_medical_records and cascade deletes
+        ([("animal_id", ASCENDING), ("date_intervention", DESCENDING), ("id", DESCENDING)], {}),
+        # get_upcoming_reminders: range + sort on date_rappel
+        ([("date_rappel", ASCENDING)], {}),
+    ],
+    "reproduction_events": [
+        ([("id", ASCENDING)], {"unique": True}),
+        # get_reproduction_events and cascade deletes
+        ([("animal_id", ASCENDING), ("date_event", DESCENDING), ("id", DESCENDING)], {}),
+        # get_upcoming_births: type_event $in + range/sort on date_prevue_mise_bas
+        ([("type_event", ASCENDING), ("date_prevue_mise_bas", ASCENDING)], {}),
+    ],
+    "financial_records": [
+        ([("id", ASCENDING)], {"unique": True}),
+        # get_financial_records without filters, sorted by date
+        ([("date_transaction", DESCENDING), ("id", DESCENDING)], {}),
+        # get_financial_records?type_transaction=, get_financial_stats
+        ([("type_transaction", ASCENDING), ("date_transaction", DESCENDING), ("id", DESCENDING)], {}),
+        # get_financial_records?categorie=
+        ([("categorie", ASCENDING), ("date_transaction", DESCENDING), ("id", DESCENDING)], {}),
+        # cascade deletes
+        ([("animal_id", ASCENDING)], {}),
+    ],
+    "financial_rollups": [
+        # One rollup per day x type x categorie x animal, also serves get_financial_stats date ranges
+        ([("date", ASCENDING), ("type_transaction", ASCENDING), ("categorie", ASCENDING), ("animal_id", ASCENDING)],
+         {"unique": True}),
+        ([("animal_id", ASCENDING)], {}),
+    ],
+    "agenda": [
+        ([("id", ASCENDING)], {"unique": True}),
+        # get_agenda: date window, with or without type $in, paged on date, id
+        ([("date", ASCENDING), ("id", ASCENDING)], {}),
+        ([("type", ASCENDING), ("date", ASCENDING), ("id", ASCENDING)], {}),
+        # Maintenance from medical/reproduction writes and cascade deletes
+        ([("source_id", ASCENDING)], {}),
+        ([("animal_id", ASCENDING), ("source", ASCENDING)], {}),
+    ],
+    "weigh_ins": [
+        # One bucket per animal and month; get_weigh_ins and growth summaries read by animal_id
+        ([("animal_id", ASCENDING), ("mois", ASCENDING)], {"unique": True}),
+    ],
+    "search_index": [
+        ([("id", ASCENDING)], {"unique": True}),
+        # get_search: every query word is an equality on one prefix; short queries take
+        # their candidates in id order
+        ([("prefixes", ASCENDING), ("id", ASCENDING)], {}),
+        # Cascade deletes
+        ([("animal_id", ASCENDING)], {}),
+    ],
+    "photos": [
+        # Upload deduplication by content hash
+        ([("hash", ASCENDING)], {"unique": True}),
+    ],
+    "growth_summaries": [
+        ([("niveau", ASCENDING), ("cle", ASCENDING)], {"unique": True}),
+    ],
+    "profitability_ledger": [
+        ([("niveau", ASCENDING), ("cle", ASCENDING)], {"unique": True}),
+        # get_profitability_animals / get_profitability_waves: ranked by marge, with or without type
+        ([("niveau", ASCENDING), ("marge", DESCENDING), ("cle", ASCENDING)], {}),
+        ([("niveau", ASCENDING), ("type", ASCENDING), ("marge", DESCENDING), ("cle", ASCENDING)], {}),
+        # sync_waves: animal rows of a wave
+        ([("niveau", ASCENDING), ("numero_vague", ASCENDING)], {}),
+    ],
+}
+
+# Representative query shape of every endpoint that reads from Mongo: (endpoint, collection, filter, sort)
+QUERY_SHAPES = [
+    ("GET /api/animals", "animals", {"statut": "actif"}, [("created_at", 1), ("id", 1)]),
+    ("GET /api/animals?type=", "animals", {"type": "porc", "statut": "actif"}, [("created_at", 1), ("id", 1)]),
+    ("GET /api/animals/{animal_id}", "animals", {"id": "x"}, None),
+    ("GET /api/animals/breeding-males/{animal_type}", "animals",
+     {"type": "porc", "sexe": "M", "statut": "actif"}, [("nom", 1)]),
+    ("startup (seed_wave_counter)", "animals", {"type": "poulet"}, None),
+    ("GET /api/stats", "animals", {"type": "poulet", "statut": "actif"}, None),
+    ("GET /api/medical-records/{animal_id}", "medical_records", {"animal_id": "x"}, [("date_intervention", -1), ("id", -1)]),
+    ("GET /api/medical-records/record/{record_id}", "medical_records", {"id": "x"}, None),
+    ("GET /api/medical-records/reminders/upcoming", "medical_records",
+     {"date_rappel": {"$gte": "2024-01-01", "$lte": "2024-01-31"}}, [("date_rappel", 1)]),
+    ("GET /api/reproduction-events/{animal_id}", "reproduction_events", {"animal_id": "x"}, [("date_event", -1), ("id", -1)]),
+    ("GET /api/reproduction-events/upcoming-births", "reproduction_events",
+     {"type_event": {"$in": ["saillie", "insemination"]},
+      "date_prevue_mise_bas": {"$gte": "2024-01-01", "$lte": "2024-01-31"}}, [("date_prevue_mise_bas", 1)]),
+    ("GET /api/financial-records", "financial_records", {}, [("date_transaction", -1), ("id", -1)]),
+    ("GET /api/financial-records?start_date=&end_date=", "financial_records",
+     {"date_transaction": {"$gte": "2024-01-01", "$lte": "2024-12-31"}}, [("date_transaction", -1), ("id", -1)]),
+    ("GET /api/financial-records?type_transaction=", "financial_records",
+     {"type_transaction": "depense"}, [("date_transaction", -1), ("id", -1)]),
+    ("GET /api/financial-records?categorie=", "financial_records",
+     {"categorie": "alimentation"}, [("date_transaction", -1), ("id", -1)]),
+    ("GET /api/financial-records/{record_id}", "financial_records", {"id": "x"}, None),
+    ("GET /api/financial-stats", "financial_rollups",
+     {"type_transaction": {"$in": ["depense", "recette"]}, "date": {"$gte": "2024-01-01", "$lte": "2024-01-31"}}, None),
+    ("GET /api/financial-stats (non day-aligned range)", "financial_records",
+     {"type_transaction": {"$in": ["depense", "recette"]},
+      "date_transaction": {"$gte": "2024-01-01", "$lte": "2024-01-31T12:00"}}, None),
+    ("GET /api/agenda", "agenda", {"date": {"$gte": "2024-01-01", "$lte": "2024-01-31"}}, [("date", 1), ("id", 1)]),
+    ("GET /api/agenda?type=", "agenda",
+     {"type": {"$in": ["rappel"]}, "date": {"$gte": "2024-01-01", "$lte": "2024-01-31"}}, [("date", 1), ("id", 1)]),
+    ("GET /api/forecast/herd (sows)", "animals", {"type": "porc", "sexe": "F", "statut": "actif"}, None),
+    ("GET /api/forecast/herd (events)", "reproduction_events", {"animal_id": {"$in": ["x", "y"]}}, None),
+    ("GET /api/forecast/herd (head count)", "animals", {"type": "porc", "statut": "actif"}, None),
+    ("GET /api/search", "search_index", {"prefixes": {"$all": ["co", "la"]}}, None),
+    ("GET /api/search (short query)", "search_index", {"prefixes": {"$all": ["co", "la"]}}, [("id", 1)]),
+    ("GET /api/weigh-ins/{animal_id}", "weigh_ins", {"animal_id": "x"}, [("mois", 1)]),
+    ("GET /api/growth/waves", "growth_summaries", {"niveau": "vague", "cle": {"$in": ["Vague 1", "Vague 2"]}}, None),
+    ("GET /api/growth/waves (recompute)", "animals", {"numero_vague": {"$in": ["Vague 1", "Vague 2"]}}, None),
+    ("GET /api/growth/races (recompute)", "animals", {"race": {"$in": ["Large White"]}}, None),
+    ("GET /api/profitability/animals", "profitability_ledger", {"niveau": "animal"}, [("marge", -1), ("cle", 1)]),
+    ("GET /api/profitability/waves?type=", "profitability_ledger",
+     {"niveau": "vague", "type": "poulet"}, [("marge", -1), ("cle", 1)]),
+    ("GET /api/profitability/animals/{animal_id}", "profitability_ledger", {"niveau": "animal", "cle": "x"}, None),
+]
+
+
+def index_name(keys) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+async def rebuild_collection(db, collection_name: str, documents: AsyncIterator[dict], batch_size: int = 1000):
+    """Write `documents` into an indexed scratch collection, then swap it in for `collection_name`"""
+    scratch = db[collection_name + "_rebuild"]
+    await scratch.drop()
+    for keys, options in INDEXES[collection_name]:
+        await scratch.create_index(keys, name=index_name(keys), **options)
+    batch = []
+    async for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            await scratch.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await scratch.insert_many(batch, ordered=False)
+
+    if await scratch.find_one({}):
+        await scratch.rename(collection_name, dropTarget=True)
+    else:
+        await scratch.drop()
+        await db[collection_name].delete_many({})
+
+
+async def ensure_indexes(db):
+    """Create every declared index. create_index is a no-op when the index already exists."""
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        collection = db[collection_name]
+        created[collection_name] = [
+            await collection.create_index(keys, name=index_name(keys), **options)
+            for keys, options in indexes
+        ]
+    return created
+
+
+def _plan_stages(plan: dict) -> List[str]:
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages += _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return [stage for stage in stages if stage]
+
+
+async def explain_query(db, collection_name: str, query: dict, sort=None) -> dict:
+    command = {"find": collection_name, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    explanation = await db.command({"explain": command, "verbosity": "queryPlanner"})
+    winning_plan = explanation["queryPlanner"]["winningPlan"]
+    # Slot-based engine nests the classic plan under "queryPlan"
+    stages = _plan_stages(winning_plan.get("queryPlan", winning_plan))
+    return {
+        "stages": stages,
+        "collection_scan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+    }
+
+
+async def index_coverage_report(db) -> List[dict]:
+    """Explain every endpoint query shape and flag collection scans and in-memory sorts."""
+    report = []
+    for endpoint, collection_name, query, sort in QUERY_SHAPES:
+        plan = await explain_query(db, collection_name, query, sort)
+        report.append({
+            "endpoint": endpoint,
+            "collection": collection_name,
+            "covered": not plan["collection_scan"] and not plan["in_memory_sort"],
+            **plan,
+        })
+    return report
@@ -0,0 +1,195 @@
+"""Request and Mongo metrics in the Prometheus text format, served on /api/metrics."""
+from bisect import bisect_left
+from contextvars import ContextVar
+from pymongo import monitoring
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+UNMATCHED_ROUTE = "unmatched"
+# Set by middlewares that answer before routing (the response cache) to name the route
+ROUTE_TEMPLATE_KEY = "route_template"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str):
+        """Cumulative bucket, sum and count lines"""
+        prefix = labels + "," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.sum}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+class RequestMongoStats:
+    """Mongo commands issued while serving one request"""
+    __slots__ = ("commands", "duration")
+
+    def __init__(self):
+        self.commands = 0
+        self.duration = 0.0
+
+
+# Motor runs the driver in executor threads with a copy of the request's context, so the
+# command listener finds the request's counters here
+current_request_stats: ContextVar = ContextVar("current_request_stats", default=None)
+
+
+def label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self):
+        # Command events arrive from the driver's executor threads
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency = {}  # (method, route) -> Histogram
+        self.statuses = {}  # (method, route, status) -> count
+        self.request_commands = {}  # (method, route) -> Histogram of commands per request
+        self.request_mongo_duration = {}  # (method, route) -> Histogram of Mongo seconds per request
+        self.commands = {}  # command name -> Histogram
+        self.command_failures = {}  # command name -> count
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestMongoStats):
+        key = (method, route)
+        with self._lock:
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.request_commands[key] = Histogram(ROUND_TRIP_BUCKETS)
+                self.request_mongo_duration[key] = Histogram(LATENCY_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.request_commands[key].observe(stats.commands)
+            self.request_mongo_duration[key].observe(stats.duration)
+            status_key = (method, route, status)
+            self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+
+    def observe_command(self, command: str, seconds: float, failed: bool = False):
+        stats = current_request_stats.get()
+        with self._lock:
+            if stats is not None:
+                stats.commands += 1
+                stats.duration += seconds
+            histogram = self.commands.get(command)
+            if histogram is None:
+                histogram = self.commands[command] = Histogram(COMMAND_BUCKETS)
+            histogram.observe(seconds)
+            if failed:
+                self.command_failures[command] = self.command_failures.get(command, 0) + 1
+
+    def render(self) -> str:
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def route_labels(method, route):
+            return f'method="{label(method)}",route="{label(route)}"'
+
+        with self._lock:
+            family("http_requests_in_flight", "gauge", "Requests currently being served")
+            lines.append(f"http_requests_in_flight {self.in_flight}")
+
+            family("http_request_duration_seconds", "histogram", "Request latency")
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines.extend(histogram.samples("http_request_duration_seconds", route_labels(method, route)))
+
+            family("http_requests_total", "counter", "Responses by status code")
+            for (method, route, status), count in sorted(self.statuses.items()):
+                lines.append(f'http_requests_total{{{route_labels(method, route)},status="{status}"}} {count}')
+
+            family("http_request_mongo_commands", "histogram", "Mongo round-trips per request")
+            for (method, route), histogram in sorted(self.request_commands.items()):
+                lines.extend(histogram.samples("http_request_mongo_commands", route_labels(method, route)))
+
+            family("http_request_mongo_duration_seconds", "histogram", "Time spent in Mongo commands per request")
+            for (method, route), histogram in sorted(self.request_mongo_duration.items()):
+                lines.extend(histogram.samples("http_request_mongo_duration_seconds", route_labels(method, route)))
+
+            family("mongo_command_duration_seconds", "histogram", "Mongo command latency by command name")
+            for command, histogram in sorted(self.commands.items()):
+                lines.extend(histogram.samples("mongo_command_duration_seconds", f'command="{label(command)}"'))
+
+            family("mongo_command_failures_total", "counter", "Failed Mongo commands by command name")
+            for command, count in sorted(self.command_failures.items()):
+                lines.append(f'mongo_command_failures_total{{command="{label(command)}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self, registry: Metrics):
+        self.registry = registry
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.registry.observe_command(event.command_name, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.registry.observe_command(event.command_name, event.duration_micros / 1e6, failed=True)
+
+
+mongo_listener = MongoCommandListener(metrics)
+
+
+def route_label(scope: dict) -> str:
+    """Route template, so /api/animals/{animal_id} is one series rather than one per id"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get(ROUTE_TEMPLATE_KEY) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware: BaseHTTPMiddleware would cost more than everything it measures"""
+
+    def __init__(self, app, registry: Metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        registry = self.registry
+        stats = RequestMongoStats()
+        token = current_request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            current_request_stats.reset(token)
+            registry.observe_request(scope["method"], route_label(scope), status, time.perf_counter() - start, stats)
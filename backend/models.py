@@ -0,0 +1,305 @@
+"""Request bodies and response models shared by the routers."""
+from pydantic import BaseModel, create_model
+from typing import Dict, Optional, List
+
+from dates import DateStr, OptionalDateStr
+
+# Pydantic models
+class Animal(BaseModel):
+    id: Optional[str] = None
+    type: str  # "poulet" or "porc"
+    race: str
+    sexe: Optional[str] = None  # Only for porcs, None for poulets (vagues)
+    date_naissance: DateStr
+    poids: float
+    nom: Optional[str] = None
+    notes: Optional[str] = None
+    statut: Optional[str] = "actif"  # "actif", "vendu", "mort", "abattu"
+    date_vente: OptionalDateStr = None
+    prix_vente: Optional[float] = None
+    # New fields for poulets (vagues)
+    nombre_animaux: Optional[int] = 1  # For poulets: number in the wave, for porcs: always 1
+    numero_vague: Optional[str] = None  # Wave number for poulets
+    photo_url: Optional[str] = None  # Photo URL
+    photo_miniature_url: Optional[str] = None  # Thumbnail of an uploaded photo
+    date_derniere_pesee: OptionalDateStr = None  # Date of the weigh-in poids comes from
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class AnimalUpdate(BaseModel):
+    race: Optional[str] = None
+    sexe: Optional[str] = None
+    date_naissance: OptionalDateStr = None
+    poids: Optional[float] = None
+    nom: Optional[str] = None
+    notes: Optional[str] = None
+    statut: Optional[str] = None
+    date_vente: OptionalDateStr = None
+    prix_vente: Optional[float] = None
+    nombre_animaux: Optional[int] = None
+    numero_vague: Optional[str] = None
+    photo_url: Optional[str] = None
+
+class AnimalBulkDelete(BaseModel):
+    ids: List[str]
+    archiver: bool = False  # Copy animals and their records to *_archive collections before deleting
+
+class MedicalRecord(BaseModel):
+    id: Optional[str] = None
+    animal_id: str
+    date_intervention: DateStr
+    type_intervention: str  # vaccination, traitement, visite_veterinaire, autre
+    medicament: Optional[str] = None
+    veterinaire: Optional[str] = None
+    cout: Optional[float] = None
+    notes: Optional[str] = None
+    date_rappel: OptionalDateStr = None  # For vaccination reminders
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class MedicalRecordUpdate(BaseModel):
+    date_intervention: OptionalDateStr = None
+    type_intervention: Optional[str] = None
+    medicament: Optional[str] = None
+    veterinaire: Optional[str] = None
+    cout: Optional[float] = None
+    notes: Optional[str] = None
+    date_rappel: OptionalDateStr = None
+
+class ReproductionEvent(BaseModel):
+    id: Optional[str] = None
+    animal_id: str  # Female animal
+    type_event: str  # "saillie", "insemination", "mise_bas", "sevrage"
+    date_event: DateStr
+    male_id: Optional[str] = None  # Male animal ID for breeding
+    male_info: Optional[str] = None  # External male info if not in system
+    date_prevue_mise_bas: OptionalDateStr = None
+    nombre_petits_nes: Optional[int] = None
+    nombre_petits_vivants: Optional[int] = None
+    nombre_petits_morts: Optional[int] = None
+    poids_moyen_petits: Optional[float] = None
+    notes: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class ReproductionEventUpdate(BaseModel):
+    type_event: Optional[str] = None
+    date_event: OptionalDateStr = None
+    male_id: Optional[str] = None
+    male_info: Optional[str] = None
+    date_prevue_mise_bas: OptionalDateStr = None
+    nombre_petits_nes: Optional[int] = None
+    nombre_petits_vivants: Optional[int] = None
+    nombre_petits_morts: Optional[int] = None
+    poids_moyen_petits: Optional[float] = None
+    notes: Optional[str] = None
+
+class FinancialRecord(BaseModel):
+    id: Optional[str] = None
+    type_transaction: str  # "depense" or "recette"
+    categorie: str  # "alimentation", "soins", "equipement", "vente", "autre"
+    date_transaction: DateStr
+    montant: float
+    animal_id: Optional[str] = None  # If transaction is linked to specific animal
+    description: str
+    fournisseur_acheteur: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class FinancialRecordUpdate(BaseModel):
+    type_transaction: Optional[str] = None
+    categorie: Optional[str] = None
+    date_transaction: OptionalDateStr = None
+    montant: Optional[float] = None
+    animal_id: Optional[str] = None
+    description: Optional[str] = None
+    fournisseur_acheteur: Optional[str] = None
+    notes: Optional[str] = None
+
+# Response models. Documents may be projected with fields=, so every field is optional and
+# endpoints use response_model_exclude_unset to emit only what was read from Mongo.
+def partial_model(model, name: str, **extra_fields):
+    fields = {field: (Optional[info.annotation], None) for field, info in model.model_fields.items()}
+    fields.update({field: (Optional[annotation], None) for field, annotation in extra_fields.items()})
+    return create_model(name, **fields)
+
+class AnimalInfo(BaseModel):
+    nom: Optional[str] = None
+    type: Optional[str] = None
+    race: Optional[str] = None
+
+AnimalOut = partial_model(Animal, "AnimalOut")
+MedicalRecordOut = partial_model(MedicalRecord, "MedicalRecordOut", animal_info=AnimalInfo)
+ReproductionEventOut = partial_model(
+    ReproductionEvent, "ReproductionEventOut", animal_info=AnimalInfo, male_animal_info=AnimalInfo
+)
+FinancialRecordOut = partial_model(FinancialRecord, "FinancialRecordOut", animal_info=AnimalInfo)
+
+class AnimalsPage(BaseModel):
+    animals: List[AnimalOut]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class MedicalRecordsPage(BaseModel):
+    medical_records: List[MedicalRecordOut]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class RemindersList(BaseModel):
+    reminders: List[MedicalRecordOut]
+    total: int
+
+class ReproductionEventsPage(BaseModel):
+    reproduction_events: List[ReproductionEventOut]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class UpcomingBirthsList(BaseModel):
+    upcoming_births: List[ReproductionEventOut]
+    total: int
+
+class FinancialRecordsPage(BaseModel):
+    financial_records: List[FinancialRecordOut]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class AgendaEntryOut(BaseModel):
+    id: str
+    type: str  # "rappel", "mise_bas_prevue", "sevrage_prevu"
+    date: str
+    animal_id: str
+    source: str  # Collection of the record the event comes from
+    source_id: str
+    libelle: Optional[str] = None
+    animal_info: Optional[AnimalInfo] = None
+
+class AgendaPage(BaseModel):
+    agenda: List[AgendaEntryOut]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class WeighIn(BaseModel):
+    animal_id: str
+    date: DateStr
+    poids: float
+
+class WeighInOut(BaseModel):
+    id: str
+    date: str
+    poids: float
+
+class WeighInHistory(BaseModel):
+    animal_id: str
+    pesees: List[WeighInOut]
+    total: int
+    gmq: Optional[float] = None  # Average daily gain, kg/day
+
+class GrowthPoint(BaseModel):
+    semaine: int
+    age_jours: int
+    poids_moyen: float
+    pesees: int
+
+class GrowthSummaryOut(BaseModel):
+    cle: str  # numero_vague or race
+    type: Optional[str] = None
+    nombre_lots: int
+    nombre_animaux: int
+    nombre_pesees: int
+    gmq: Optional[float] = None  # Average daily gain, kg/day
+    poids_moyen_dernier: Optional[float] = None
+    courbe: List[GrowthPoint]
+    updated_at: Optional[str] = None
+
+class GrowthSummaryList(BaseModel):
+    summaries: List[GrowthSummaryOut]
+    total: int
+
+class AnimalProfitOut(BaseModel):
+    animal_id: str
+    nom: Optional[str] = None
+    type: Optional[str] = None
+    race: Optional[str] = None
+    statut: Optional[str] = None
+    numero_vague: Optional[str] = None
+    nombre_animaux: int
+    couts: Dict[str, float]  # Per categorie, "medical" for the medical records' cout
+    cout_total: float
+    recettes: float
+    prix_vente: Optional[float] = None
+    revenu: float
+    marge: float
+    marge_par_tete: float
+    updated_at: Optional[str] = None
+
+class WaveProfitOut(BaseModel):
+    numero_vague: str
+    type: Optional[str] = None
+    races: List[str]
+    nombre_lots: int
+    lots_actifs: int
+    nombre_animaux: int
+    couts: Dict[str, float]
+    cout_total: float
+    recettes: float
+    revenu: float
+    marge: float
+    marge_par_tete: float
+    updated_at: Optional[str] = None
+
+class AnimalProfitPage(BaseModel):
+    animals: List[AnimalProfitOut]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class WaveProfitPage(BaseModel):
+    waves: List[WaveProfitOut]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class ForecastStatistics(BaseModel):
+    portees_historiques: int
+    taille_portee_moyenne: float
+    taux_mise_bas: float
+    intervalle_mise_bas_jours: float
+    taux_sevrage: float
+
+class ForecastWeek(BaseModel):
+    semaine: int
+    debut: str
+    mises_bas: float
+    naissances: float
+    naissances_min: float  # 10th percentile of the simulations
+    naissances_max: float  # 90th percentile
+    sevrages: float
+    effectif: float
+    effectif_min: float
+    effectif_max: float
+
+class HerdForecastOut(BaseModel):
+    type: str
+    date_debut: str
+    horizon_semaines: int
+    simulations: int
+    truies: int
+    effectif_actuel: int
+    statistiques: ForecastStatistics
+    total_naissances: float
+    total_sevrages: float
+    semaines: List[ForecastWeek]
+
+class SearchHitOut(BaseModel):
+    id: str
+    source: str  # Collection of the record: animals, medical_records, reproduction_events, financial_records
+    source_id: str
+    animal_id: Optional[str] = None
+    libelle: Optional[str] = None
+    extrait: Optional[str] = None
+    score: float
+    animal_info: Optional[AnimalInfo] = None
+
+class SearchPage(BaseModel):
+    results: List[SearchHitOut]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
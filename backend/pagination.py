@@ -0,0 +1,73 @@
+from fastapi import HTTPException
+from typing import Optional, List
+import base64
+import json
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(document: dict, sort: list) -> str:
+    values = [document.get(field) for field, _ in sort]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: list) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    return values
+
+
+def keyset_filter(sort: list, values: list) -> dict:
+    """Documents strictly after `values` in `sort` order.
+
+    For [(a, -1), (id, -1)] this is {"$or": [{a: {"$lt": va}}, {a: va, id: {"$lt": vid}}]}.
+    """
+    branches = []
+    for position, (field, direction) in enumerate(sort):
+        branch = {prefix_field: values[i] for i, (prefix_field, _) in enumerate(sort[:position])}
+        branch[field] = {"$lt" if direction < 0 else "$gt": values[position]}
+        branches.append(branch)
+    return {"$or": branches}
+
+
+def parse_fields(fields: Optional[str], required: List[str]) -> Optional[dict]:
+    """Turn `fields=nom,race` into a projection that always keeps the keys pagination needs"""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    projection = {"_id": 0}
+    for field in requested + required:
+        projection[field] = 1
+    return projection
+
+
+async def paginate(repo, query: dict, sort: list, limit: Optional[int] = None, cursor: Optional[str] = None,
+                   projection: Optional[dict] = None, with_total: bool = False) -> dict:
+    """Keyset pagination over `sort` (whose last key must be unique, e.g. id).
+
+    Without `limit` the whole result is returned, as the endpoints always did.
+    `total` is counted with a separate count_documents only when asked for on a paged request.
+    """
+    page_query = query
+    if cursor:
+        page_query = {"$and": [query, keyset_filter(sort, decode_cursor(cursor, sort))]} if query \
+            else keyset_filter(sort, decode_cursor(cursor, sort))
+
+    if not limit:
+        items = await repo.find(page_query, projection, sort=sort)
+        return {"items": items, "next_cursor": None, "total": len(items) if not cursor else None}
+
+    limit = min(limit, MAX_PAGE_SIZE)
+    items = await repo.find(page_query, projection, sort=sort, limit=limit + 1)
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1], sort)
+
+    total = await repo.count(query) if with_total else None
+    return {"items": items, "next_cursor": next_cursor, "total": total}
@@ -0,0 +1,215 @@
+"""Content-addressed photo store under PHOTOS_DIR/<sha256[:2]>/<sha256>, with background thumbnails."""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from pathlib import Path
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import uuid
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+PHOTOS_DIR = Path(os.environ.get('PHOTOS_DIR', str(Path(__file__).parent / 'photos')))
+PHOTO_MAX_SIZE = int(os.environ.get('PHOTO_MAX_SIZE', str(10 * 1024 * 1024)))
+THUMBNAIL_SIZE = int(os.environ.get('THUMBNAIL_SIZE', '320'))
+PHOTO_WORKERS = int(os.environ.get('PHOTO_WORKERS', '2'))
+PHOTOS_COLLECTION = "photos"
+HASH_PATTERN = "^[0-9a-f]{64}$"
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Leading bytes of the accepted formats; the client's content type is not trusted
+SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def photo_path(photo_hash: str) -> Path:
+    return PHOTOS_DIR / photo_hash[:2] / photo_hash
+
+
+def thumbnail_path(photo_hash: str) -> Path:
+    return PHOTOS_DIR / photo_hash[:2] / f"{photo_hash}.miniature.jpg"
+
+
+def photo_urls(photo_hash: str) -> dict:
+    return {"photo_url": f"/api/photos/{photo_hash}", "photo_miniature_url": f"/api/photos/{photo_hash}/miniature"}
+
+
+def thumbnail_url(url: str) -> Optional[str]:
+    """Thumbnail of a stored photo's URL; external URLs have none"""
+    match = re.fullmatch(r"/api/photos/([0-9a-f]{64})", url)
+    return photo_urls(match.group(1))["photo_miniature_url"] if match else None
+
+
+def write_atomically(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # One temporary file per writer: concurrent uploads of the same content never share it
+    temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        temporary.write_bytes(data)
+        os.replace(temporary, path)  # Readers see the whole file or none
+    finally:
+        temporary.unlink(missing_ok=True)
+
+
+def store_original(data: bytes) -> Tuple[str, bool]:
+    """Hash and store an upload; returns (hash, whether it was new)"""
+    photo_hash = hashlib.sha256(data).hexdigest()
+    path = photo_path(photo_hash)
+    if path.exists():
+        return photo_hash, False
+    # A concurrent upload of the same content may publish it first: same bytes, same file
+    write_atomically(path, data)
+    return photo_hash, True
+
+
+def make_thumbnail(source: str, destination: str, size: int):
+    """Runs in a worker process: fit the image in size x size, as JPEG"""
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        temporary = f"{destination}.{uuid.uuid4().hex}.tmp"
+        try:
+            image.convert("RGB").save(temporary, "JPEG", quality=80, optimize=True)
+            os.replace(temporary, destination)
+        finally:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PHOTO_WORKERS)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def generate_thumbnail(db, photo_hash: str):
+    """Background task: make the thumbnail of a stored original and flag it"""
+    if Image is None:
+        return
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            get_pool(), make_thumbnail, str(photo_path(photo_hash)), str(thumbnail_path(photo_hash)), THUMBNAIL_SIZE
+        )
+        await db[PHOTOS_COLLECTION].update_one({"hash": photo_hash}, {"$set": {"miniature": True}})
+    except Exception as e:
+        logger.warning("Thumbnail of photo %s failed: %s", photo_hash, e)
+
+
+async def add_photo(db, data: bytes, content_type: str) -> dict:
+    """Store an upload once per content; returns its photos document and whether it already existed"""
+    photo_hash, created = await run_in_threadpool(store_original, data)
+    await db[PHOTOS_COLLECTION].update_one(
+        {"hash": photo_hash},
+        {"$setOnInsert": {"hash": photo_hash, "content_type": content_type, "taille": len(data),
+                          "miniature": False, "created_at": datetime.now()}},
+        upsert=True
+    )
+    photo = await db[PHOTOS_COLLECTION].find_one({"hash": photo_hash}, {"_id": 0})
+    return {**photo, "doublon": not created}
+
+
+async def resume_thumbnails(db):
+    """Thumbnails interrupted by a restart"""
+    try:
+        async for photo in db[PHOTOS_COLLECTION].find({"miniature": False}, {"_id": 0, "hash": 1}):
+            if photo_path(photo["hash"]).exists():
+                await generate_thumbnail(db, photo["hash"])
+    except Exception as e:
+        logger.warning("Resuming photo thumbnails failed: %s", e)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single "bytes=" range, None to send the whole file.
+
+    Raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return None  # Other units and multipart ranges are answered with the full body
+    start, _, end = ranges.strip().partition("-")
+    try:
+        if start:
+            first, last = int(start), min(int(end), size - 1) if end else size - 1
+        else:
+            suffix = int(end)  # bytes=-N: the last N bytes
+            first, last = max(size - suffix, 0), size - 1 if suffix > 0 else -1
+    except ValueError:
+        return None  # Malformed ranges are ignored
+    if first >= size or first > last:
+        raise ValueError(header)
+    return first, last
+
+
+async def iter_file(path: Path, start: int, end: int):
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await run_in_threadpool(file.read, min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(request: Request, path: Path, content_type: str, etag: str, cache_control: str) -> Response:
+    """Stream a stored file, honouring If-None-Match, Range and If-Range"""
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    size = path.stat().st_size
+    byte_range = None
+    if request.headers.get("range") and request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_range(request.headers["range"], size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    if byte_range is None:
+        return StreamingResponse(iter_file(path, 0, size - 1), media_type=content_type,
+                                 headers={**headers, "Content-Length": str(size)})
+    start, end = byte_range
+    headers.update({"Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)})
+    return StreamingResponse(iter_file(path, start, end), status_code=206, media_type=content_type, headers=headers)
+
+
+async def read_head(path: Path) -> bytes:
+    def read():
+        with open(path, "rb") as file:
+            return file.read(16)
+    return await run_in_threadpool(read)
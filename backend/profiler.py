@@ -0,0 +1,283 @@
+"""Per-request Mongo command profiler (PROFILING=1)."""
+from collections import deque
+from contextvars import ContextVar
+from pymongo import monitoring
+import asyncio
+import copy
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+from indexes import _plan_stages
+from metrics import route_label
+
+PROFILING = os.environ.get('PROFILING', '').lower() in ('1', 'true', 'yes')
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '200'))
+# Share of fast requests whose reads are re-run through explain; explain re-executes the query
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0.05'))
+SLOW_REQUESTS_KEPT = 50
+
+EXPLAINABLE_COMMANDS = ("find", "aggregate", "count", "distinct")
+# Session, transaction and cluster fields a command carries but explain rejects
+COMMAND_ENVELOPE = ("lsid", "txnNumber", "autocommit", "startTransaction", "$db", "$clusterTime",
+                    "$readPreference", "readConcern", "writeConcern", "cursor")
+
+logger = logging.getLogger("profiler")
+
+
+def query_shape(value):
+    """Filter with every literal replaced by "?", so queries differing only by values group together"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [query_shape(item) for item in value] if any(isinstance(item, dict) for item in value) else "?"
+    return "?"
+
+
+def command_shape(name: str, command: dict) -> str:
+    if name == "aggregate":
+        pipeline = command.get("pipeline", [])
+        match = next((stage["$match"] for stage in pipeline if "$match" in stage), {})
+        shape = {"stages": [next(iter(stage)) for stage in pipeline], "match": query_shape(match)}
+    elif name == "find":
+        shape = {"filter": query_shape(command.get("filter", {})), "sort": list(command.get("sort", {}))}
+    elif name in ("count", "distinct"):
+        shape = {"query": query_shape(command.get("query", {})), "key": command.get("key")}
+    elif name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or [{}]
+        shape = {"q": query_shape(statements[0].get("q", {})), "n": len(statements)}
+    else:
+        shape = {}
+    return json.dumps(shape, sort_keys=True, default=str)
+
+
+def returned_count(name: str, reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if cursor:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if name == "distinct":
+        return len(reply.get("values", []))
+    return reply.get("n", 0)
+
+
+def explain_summary(explanation: dict) -> dict:
+    """Documents/keys examined and plan stages, wherever the server nests executionStats"""
+    pending = [explanation]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            stats = node.get("executionStats")
+            if stats:
+                planner = node.get("queryPlanner") or explanation.get("queryPlanner", {})
+                plan = planner.get("winningPlan", {})
+                return {
+                    "docs_examines": stats.get("totalDocsExamined", 0),
+                    "cles_examinees": stats.get("totalKeysExamined", 0),
+                    "retournes": stats.get("nReturned", 0),
+                    "plan": _plan_stages(plan.get("queryPlan", plan)),
+                }
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return {}
+
+
+class CommandRecord:
+    __slots__ = ("name", "database", "collection", "shape", "command", "duration_ms", "returned", "failed", "explain")
+
+    def __init__(self, name, database, collection, shape, command):
+        self.name = name
+        self.database = database
+        self.collection = collection
+        self.shape = shape
+        self.command = command  # Read commands only, dropped once explained
+        self.duration_ms = 0.0
+        self.returned = 0
+        self.failed = False
+        self.explain = None
+
+    def to_dict(self) -> dict:
+        entry = {
+            "commande": self.name,
+            "collection": self.collection,
+            "forme": self.shape,
+            "duree_ms": round(self.duration_ms, 3),
+            "retournes": self.returned,
+        }
+        if self.failed:
+            entry["echec"] = True
+        if self.explain:
+            entry.update(self.explain)
+        return entry
+
+
+class RequestProfile:
+    def __init__(self, sampled: bool):
+        self.sampled = sampled
+        self.commands = []
+        self.pending = {}  # request_id -> CommandRecord, between started and succeeded/failed
+        self.lock = threading.Lock()
+
+
+current_profile: ContextVar = ContextVar("current_profile", default=None)
+
+
+class ProfilerListener(monitoring.CommandListener):
+    def started(self, event):
+        profile = current_profile.get()
+        if profile is None:
+            return
+        name = event.command_name
+        command = event.command
+        collection = command.get("collection" if name == "getMore" else name)
+        collection = collection if isinstance(collection, str) else None
+        keep = None
+        if name in EXPLAINABLE_COMMANDS:
+            # Explain every read of a request that may turn out slow; pipelines that write are never re-run
+            pipeline = command.get("pipeline", [])
+            if not any("$out" in stage or "$merge" in stage for stage in pipeline):
+                keep = {key: copy.deepcopy(value) for key, value in command.items() if key not in COMMAND_ENVELOPE}
+        record = CommandRecord(name, event.database_name, collection, command_shape(name, command), keep)
+        with profile.lock:
+            profile.pending[event.request_id] = record
+
+    def _finish(self, event, failed: bool):
+        profile = current_profile.get()
+        if profile is None:
+            return
+        with profile.lock:
+            record = profile.pending.pop(event.request_id, None)
+            if record is None:
+                return
+            record.duration_ms = event.duration_micros / 1000
+            record.failed = failed
+            if not failed:
+                record.returned = returned_count(record.name, event.reply)
+            profile.commands.append(record)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+
+profile_listener = ProfilerListener()
+
+
+class Profiler:
+    """Top offenders by (route, command, collection, query shape) and the last slow requests"""
+
+    def __init__(self):
+        self.groups = {}
+        self.slow_requests = deque(maxlen=SLOW_REQUESTS_KEPT)
+
+    def record(self, route: str, commands: list):
+        for command in commands:
+            key = (route, command.name, command.collection, command.shape)
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = {
+                    "route": route, "commande": command.name, "collection": command.collection,
+                    "forme": command.shape, "appels": 0, "total_ms": 0.0, "max_ms": 0.0, "retournes": 0,
+                    "echantillons": 0, "docs_examines": 0, "retournes_echantillons": 0, "plan": None,
+                }
+            group["appels"] += 1
+            group["total_ms"] += command.duration_ms
+            group["max_ms"] = max(group["max_ms"], command.duration_ms)
+            group["retournes"] += command.returned
+            if command.explain:
+                group["echantillons"] += 1
+                group["docs_examines"] += command.explain.get("docs_examines", 0)
+                group["retournes_echantillons"] += command.explain.get("retournes", 0)
+                group["plan"] = command.explain.get("plan")
+
+    def top(self, limit: int = 20) -> list:
+        groups = sorted(self.groups.values(), key=lambda group: group["total_ms"], reverse=True)[:limit]
+        return [{
+            **group,
+            "total_ms": round(group["total_ms"], 3),
+            "max_ms": round(group["max_ms"], 3),
+            "moyenne_ms": round(group["total_ms"] / group["appels"], 3),
+            # Documents examined per document returned, over the explained samples
+            "ratio_examines_retournes": round(group["docs_examines"] / max(group["retournes_echantillons"], 1), 2)
+            if group["echantillons"] else None,
+        } for group in groups]
+
+    def reset(self):
+        self.groups.clear()
+        self.slow_requests.clear()
+
+
+profiler = Profiler()
+
+
+async def explain_commands(client, commands: list):
+    # Runs in its own task: the explains must not be attributed to the profiled request
+    current_profile.set(None)
+    for command in commands:
+        if command.command is None or command.failed:
+            continue
+        try:
+            explanation = await client[command.database].command(
+                {"explain": command.command, "verbosity": "executionStats"}
+            )
+            command.explain = explain_summary(explanation)
+        except Exception as e:
+            command.explain = {"explain_erreur": str(e)}
+        command.command = None
+
+
+class ProfilerMiddleware:
+    def __init__(self, app, client, registry: Profiler = profiler):
+        self.app = app
+        self.client = client
+        self.registry = registry
+        self._tasks = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(sampled=random.random() < PROFILE_SAMPLE_RATE)
+        token = current_profile.set(profile)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_profile.reset(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+            entry = {
+                "methode": scope["method"],
+                "route": route_label(scope),
+                "chemin": scope["path"],
+                "statut": status,
+                "duree_ms": round(duration_ms, 3),
+                "mongo_ms": round(sum(command.duration_ms for command in profile.commands), 3),
+            }
+            slow = duration_ms >= SLOW_REQUEST_MS
+            if slow or profile.sampled:
+                task = asyncio.create_task(self._finish(entry, profile.commands, slow))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                self.registry.record(entry["route"], profile.commands)
+
+    async def _finish(self, entry: dict, commands: list, slow: bool):
+        await explain_commands(self.client, commands)
+        self.registry.record(entry["route"], commands)
+        if slow:
+            entry["commandes"] = [command.to_dict() for command in commands]
+            self.registry.slow_requests.append(entry)
+            logger.warning(json.dumps({"evenement": "requete_lente", **entry}, ensure_ascii=False, default=str))
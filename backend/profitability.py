@@ -0,0 +1,208 @@
+"""Per-animal and per-wave profitability ledger."""
+from datetime import datetime
+from pymongo import ReplaceOne
+from typing import Iterable, List
+import asyncio
+
+from indexes import rebuild_collection
+
+LEDGER_COLLECTION = "profitability_ledger"
+ANIMAL = "animal"
+WAVE = "vague"
+REBUILD_BATCH_SIZE = 500
+
+ANIMAL_FIELDS = ("id", "nom", "type", "race", "statut", "numero_vague", "nombre_animaux", "prix_vente")
+
+
+def totals_pipeline(animal_ids: List[str]) -> list:
+    """Cost and revenue totals per (animal, type, categorie), followed by the animals themselves"""
+    match = {"$match": {"animal_id": {"$in": animal_ids}}}
+    return [
+        match,
+        {"$project": {"_id": 0, "animal_id": 1, "type": "$type_transaction", "categorie": 1, "montant": 1}},
+        {"$unionWith": {"coll": "medical_records", "pipeline": [
+            match,
+            {"$project": {
+                "_id": 0, "animal_id": 1, "type": {"$literal": "depense"}, "categorie": {"$literal": "medical"},
+                "montant": {"$ifNull": ["$cout", 0]}
+            }}
+        ]}},
+        {"$group": {
+            "_id": {"animal_id": "$animal_id", "type": "$type", "categorie": "$categorie"},
+            "montant": {"$sum": "$montant"},
+            "nombre": {"$sum": 1}
+        }},
+        {"$unionWith": {"coll": "animals", "pipeline": [
+            {"$match": {"id": {"$in": animal_ids}}},
+            {"$project": {"_id": 0, **{field: 1 for field in ANIMAL_FIELDS}}}
+        ]}},
+    ]
+
+
+def animal_row(animal: dict, totals: List[dict]) -> dict:
+    """Ledger row of one animal from its grouped totals ({"_id": {type, categorie}, "montant"})"""
+    couts = {}
+    recettes = 0.0
+    vente_liee = False
+    for total in totals:
+        categorie = total["_id"]["categorie"] or "autre"
+        if total["_id"]["type"] == "depense":
+            couts[categorie] = couts.get(categorie, 0) + total["montant"]
+        elif total["_id"]["type"] == "recette":
+            recettes += total["montant"]
+            vente_liee = vente_liee or categorie == "vente"
+    prix_vente = animal.get("prix_vente") or 0
+    revenu = recettes + (0 if vente_liee else prix_vente)
+    cout_total = sum(couts.values())
+    nombre_animaux = animal.get("nombre_animaux") or 1
+    return {
+        "niveau": ANIMAL,
+        "cle": animal["id"],
+        "animal_id": animal["id"],
+        "nom": animal.get("nom"),
+        "type": animal.get("type"),
+        "race": animal.get("race"),
+        "statut": animal.get("statut"),
+        "numero_vague": animal.get("numero_vague"),
+        "nombre_animaux": nombre_animaux,
+        "couts": {categorie: round(montant, 2) for categorie, montant in couts.items()},
+        "cout_total": round(cout_total, 2),
+        "recettes": round(recettes, 2),
+        "prix_vente": animal.get("prix_vente"),
+        "revenu": round(revenu, 2),
+        "marge": round(revenu - cout_total, 2),
+        "marge_par_tete": round((revenu - cout_total) / nombre_animaux, 2),
+        "updated_at": datetime.now(),
+    }
+
+
+def wave_row(numero_vague: str, rows: List[dict]) -> dict:
+    """Ledger row of one wave, summed from the rows of its animals"""
+    couts = {}
+    for row in rows:
+        for categorie, montant in row["couts"].items():
+            couts[categorie] = couts.get(categorie, 0) + montant
+    cout_total = sum(row["cout_total"] for row in rows)
+    revenu = sum(row["revenu"] for row in rows)
+    nombre_animaux = sum(row["nombre_animaux"] for row in rows)
+    return {
+        "niveau": WAVE,
+        "cle": numero_vague,
+        "numero_vague": numero_vague,
+        "type": rows[0]["type"],
+        "races": sorted({row["race"] for row in rows if row.get("race")}),
+        "nombre_lots": len(rows),
+        "lots_actifs": sum(1 for row in rows if row.get("statut") == "actif"),
+        "nombre_animaux": nombre_animaux,
+        "couts": {categorie: round(montant, 2) for categorie, montant in couts.items()},
+        "cout_total": round(cout_total, 2),
+        "recettes": round(sum(row["recettes"] for row in rows), 2),
+        "revenu": round(revenu, 2),
+        "marge": round(revenu - cout_total, 2),
+        "marge_par_tete": round((revenu - cout_total) / max(nombre_animaux, 1), 2),
+        "updated_at": datetime.now(),
+    }
+
+
+async def compute_animal_rows(db, animal_ids: List[str], session=None) -> List[dict]:
+    """Ledger rows of existing animals among `animal_ids`, from one aggregation"""
+    totals = {}
+    animals = []
+    async for document in db.financial_records.aggregate(totals_pipeline(animal_ids), session=session):
+        if "_id" in document:
+            totals.setdefault(document["_id"]["animal_id"], []).append(document)
+        else:
+            animals.append(document)
+    return [animal_row(animal, totals.get(animal["id"], [])) for animal in animals]
+
+
+async def sync_waves(db, waves: Iterable[str], session=None):
+    """Re-sum wave rows from their animal rows; waves left without animals are dropped"""
+    waves = [wave for wave in set(waves) if wave]
+    if not waves:
+        return
+    ledger = db[LEDGER_COLLECTION]
+    rows = {}
+    async for row in ledger.find({"niveau": ANIMAL, "numero_vague": {"$in": waves}}, {"_id": 0}, session=session):
+        rows.setdefault(row["numero_vague"], []).append(row)
+    operations = [
+        ReplaceOne({"niveau": WAVE, "cle": wave}, wave_row(wave, rows[wave]), upsert=True)
+        for wave in waves if wave in rows
+    ]
+    if operations:
+        await ledger.bulk_write(operations, ordered=False, session=session)
+    empty = [wave for wave in waves if wave not in rows]
+    if empty:
+        await ledger.delete_many({"niveau": WAVE, "cle": {"$in": empty}}, session=session)
+
+
+async def sync_animals(db, animal_ids: Iterable[str], session=None):
+    """Recompute the rows of these animals (dropping deleted ones) and of their old and new waves"""
+    animal_ids = [animal_id for animal_id in set(animal_ids) if animal_id]
+    if not animal_ids:
+        return
+    ledger = db[LEDGER_COLLECTION]
+    waves = set(await ledger.distinct(
+        "numero_vague", {"niveau": ANIMAL, "cle": {"$in": animal_ids}}, session=session
+    ))
+    rows = await compute_animal_rows(db, animal_ids, session=session)
+    if rows:
+        await ledger.bulk_write(
+            [ReplaceOne({"niveau": ANIMAL, "cle": row["cle"]}, row, upsert=True) for row in rows],
+            ordered=False, session=session
+        )
+    deleted = set(animal_ids) - {row["cle"] for row in rows}
+    if deleted:
+        await ledger.delete_many({"niveau": ANIMAL, "cle": {"$in": list(deleted)}}, session=session)
+    await sync_waves(db, waves | {row["numero_vague"] for row in rows}, session=session)
+
+
+async def remove_animals(db, animal_ids: List[str], session=None):
+    """Drop the rows of cascade-deleted animals and re-sum their waves, without aggregating"""
+    ledger = db[LEDGER_COLLECTION]
+    query = {"niveau": ANIMAL, "cle": {"$in": animal_ids}}
+    waves = await ledger.distinct("numero_vague", query, session=session)
+    await ledger.delete_many(query, session=session)
+    await sync_waves(db, waves, session=session)
+
+
+async def ledger_rows(db):
+    waves = {}
+    batch = []
+
+    async def compute():
+        rows = await compute_animal_rows(db, batch)
+        for row in rows:
+            if row["numero_vague"]:
+                waves.setdefault(row["numero_vague"], []).append(row)
+        batch.clear()
+        return rows
+
+    async for animal in db.animals.find({}, {"_id": 0, "id": 1}):
+        batch.append(animal["id"])
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            for row in await compute():
+                yield row
+    if batch:
+        for row in await compute():
+            yield row
+    for wave, rows in waves.items():
+        yield wave_row(wave, rows)
+
+
+async def rebuild(db):
+    """Recompute every row (backfill or repair: python profitability.py)"""
+    await rebuild_collection(db, LEDGER_COLLECTION, ledger_rows(db))
+
+
+async def ensure_ledger(db):
+    """Backfill the ledger on first start against an existing herd"""
+    if not await db[LEDGER_COLLECTION].find_one({}) and await db.animals.find_one({}):
+        await rebuild(db)
+
+
+if __name__ == "__main__":
+    from database import db
+
+    asyncio.run(rebuild(db))
+    print("Registre de rentabilité reconstruit")
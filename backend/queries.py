@@ -0,0 +1,54 @@
+"""Sort orders and filter builders shared by the list, export and stats endpoints."""
+from fastapi import HTTPException
+from typing import Optional
+from datetime import datetime
+
+from dates import parse_date
+
+# Keyset pagination orders: the existing sort key plus the unique id as tie-breaker
+ANIMALS_SORT = [("created_at", 1), ("id", 1)]
+MEDICAL_RECORDS_SORT = [("date_intervention", -1), ("id", -1)]  # Newest first
+REPRODUCTION_EVENTS_SORT = [("date_event", -1), ("id", -1)]  # Newest first
+FINANCIAL_RECORDS_SORT = [("date_transaction", -1), ("id", -1)]  # Newest first
+AGENDA_SORT = [("date", 1), ("id", 1)]  # Soonest first
+PROFITABILITY_SORT = [("marge", -1), ("cle", 1)]  # Most profitable first
+SEARCH_SORT = [("score", -1), ("id", 1)]  # Best match first
+
+def query_date(value: str) -> datetime:
+    """Date query parameter as a BSON date bound"""
+    try:
+        return parse_date(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Date invalide: {value}")
+
+def animals_query(type: Optional[str], statut: Optional[str]) -> dict:
+    query = {}
+    if type:
+        query["type"] = type
+    if statut:
+        query["statut"] = statut
+    return query
+
+def financial_records_query(start_date: Optional[str], end_date: Optional[str],
+                            type_transaction: Optional[str], categorie: Optional[str]) -> dict:
+    query = {}
+    
+    # Filter by date range
+    if start_date and end_date:
+        query["date_transaction"] = {
+            "$gte": query_date(start_date),
+            "$lte": query_date(end_date)
+        }
+    elif start_date:
+        query["date_transaction"] = {"$gte": query_date(start_date)}
+    elif end_date:
+        query["date_transaction"] = {"$lte": query_date(end_date)}
+        
+    # Filter by transaction type
+    if type_transaction:
+        query["type_transaction"] = type_transaction
+        
+    # Filter by category
+    if categorie:
+        query["categorie"] = categorie
+    return query
@@ -0,0 +1,155 @@
+"""ETag response cache for the dashboard endpoints, invalidated by per-collection versions."""
+from collections import OrderedDict
+from datetime import date
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+from pymongo import ReturnDocument
+import hashlib
+import os
+
+from counters import COUNTERS_COLLECTION
+from database import db
+from metrics import ROUTE_TEMPLATE_KEY
+
+RESPONSE_CACHE_MAX_SIZE = int(os.environ.get('RESPONSE_CACHE_MAX_SIZE', '256'))
+VERSIONS_ID = "collection_versions"
+
+ALL_COLLECTIONS = ["animals", "medical_records", "reproduction_events", "financial_records"]
+CHILD_COLLECTIONS = ["medical_records", "reproduction_events", "financial_records"]
+
+# Cached GET endpoints and the collections their response depends on
+CACHED_ENDPOINTS = {
+    "/api/stats": ["animals"],
+    "/api/financial-stats": ["financial_records"],
+    "/api/medical-records/reminders/upcoming": ["medical_records", "animals"],
+    "/api/reproduction-events/upcoming-births": ["reproduction_events", "animals"],
+    "/api/agenda": ["medical_records", "reproduction_events", "animals"],
+    "/api/forecast/herd": ["reproduction_events", "animals"],
+}
+
+
+def written_collections(method: str, path: str) -> list:
+    """Collections a write request may have changed"""
+    if method not in ("POST", "PUT", "PATCH", "DELETE"):
+        return []
+    if path.startswith("/api/animals"):
+        # New animals only touch animals; updates show up in enriched lists and deletes cascade
+        if method == "POST" and not path.endswith("/bulk-delete"):
+            return ["animals"]
+        return ALL_COLLECTIONS
+    if path.startswith("/api/medical-records"):
+        return ["medical_records"]
+    if path.startswith("/api/reproduction-events"):
+        return ["reproduction_events"]
+    if path.startswith("/api/financial-records"):
+        return ["financial_records"]
+    if path.startswith("/api/weigh-ins"):
+        return ["animals"]  # The newest weigh-in becomes Animal.poids
+    if path.startswith("/api/admin/orphans"):
+        return CHILD_COLLECTIONS
+    return []
+
+
+class ResponseCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # path+query -> (etag, body, media_type)
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: str, etag: str):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != etag:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, etag: str, body: bytes, media_type: str):
+        self._entries[key] = (etag, body, media_type)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "taille": len(self._entries),
+            "taille_max": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified
+        }
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_SIZE)
+
+
+async def get_versions(db) -> dict:
+    return await db[COUNTERS_COLLECTION].find_one({"_id": VERSIONS_ID}) or {}
+
+
+async def bump_versions(db, collections: list) -> dict:
+    return await db[COUNTERS_COLLECTION].find_one_and_update(
+        {"_id": VERSIONS_ID},
+        {"$inc": {name: 1 for name in collections}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+class VersionedRoute(APIRoute):
+    """Route class of the writing routers: bumps the written collections' versions before the response is sent, even on errors"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def versioned_handler(request: Request) -> Response:
+            written = written_collections(request.method, request.url.path)
+            try:
+                return await handler(request)
+            finally:
+                # Whatever the outcome: a failed write may have committed part of its changes
+                if written:
+                    await bump_versions(db, written)
+
+        return versioned_handler
+
+
+def make_etag(key: str, collections: list, versions: dict) -> str:
+    # Today's date too: the reminder and upcoming-birth windows move daily
+    parts = [key, date.today().isoformat()] + [f"{name}:{versions.get(name, 0)}" for name in collections]
+    return '"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+
+
+def response_cache_middleware(db):
+    async def middleware(request: Request, call_next):
+        path = request.url.path
+        collections = CACHED_ENDPOINTS.get(path) if request.method == "GET" else None
+        if not collections:
+            return await call_next(request)
+
+        request.scope[ROUTE_TEMPLATE_KEY] = path  # Cached endpoints have no path parameters
+        key = f"{path}?{request.url.query}"
+        etag = make_etag(key, collections, await get_versions(db))
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            response_cache.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        cached = response_cache.get(key, etag)
+        if cached:
+            return Response(content=cached[1], media_type=cached[2], headers=headers)
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        media_type = response.headers.get("content-type", "application/json")
+        response_cache.put(key, etag, body, media_type)
+        return Response(content=body, status_code=200, media_type=media_type, headers=headers)
+
+    return middleware
@@ -0,0 +1,45 @@
+"""API routers, one module per resource.
+
+Starlette tries routes in declaration order and stops at the first full match, so
+within each router the static paths (bulk, bulk-delete, breeding-males,
+reminders/upcoming, upcoming-births...) are declared before the parametric ones
+sharing their prefix. tests/test_routes.py checks that every route stays reachable.
+"""
+from routers import (
+    admin,
+    agenda,
+    animals,
+    export,
+    financial_records,
+    forecast,
+    growth,
+    medical_records,
+    photos,
+    profitability,
+    reproduction_events,
+    search,
+)
+
+ROUTERS = [
+    admin.router,
+    animals.router,
+    medical_records.router,
+    reproduction_events.router,
+    agenda.router,
+    forecast.router,
+    financial_records.router,
+    profitability.router,
+    growth.router,
+    photos.router,
+    search.router,
+    export.router,
+]
+
+
+def dispatch_table(app) -> list:
+    """Routes in the order requests are matched against them, included routers expanded"""
+    table = []
+    for route in app.router.routes:
+        included = getattr(route, "original_router", None)  # Newer FastAPI keeps included routers nested
+        table.extend(included.routes if included is not None else [route])
+    return table
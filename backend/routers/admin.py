@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from database import db
+import cascade
+from animal_cache import animal_cache
+from indexes import index_coverage_report
+from profiler import PROFILE_SAMPLE_RATE, PROFILING, SLOW_REQUEST_MS, profiler
+from response_cache import VersionedRoute, response_cache
+
+router = APIRouter(tags=["admin"], route_class=VersionedRoute)
+
+@router.get("/api/admin/indexes")
+async def get_index_report():
+    try:
+        report = await index_coverage_report(db)
+        return {
+            "queries": report,
+            "total": len(report),
+            "uncovered": [entry["endpoint"] for entry in report if not entry["covered"]]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/admin/cache")
+async def get_cache_stats():
+    return {"animaux": animal_cache.stats(), "reponses": response_cache.stats()}
+
+@router.get("/api/admin/profile")
+async def get_profile(limit: int = Query(20, ge=1, le=500)):
+    return {
+        "actif": PROFILING,
+        "seuil_ms": SLOW_REQUEST_MS,
+        "taux_echantillonnage": PROFILE_SAMPLE_RATE,
+        "top": profiler.top(limit),
+        "requetes_lentes": list(profiler.slow_requests)[::-1]
+    }
+
+@router.delete("/api/admin/profile")
+async def reset_profile():
+    profiler.reset()
+    return {"message": "Profil réinitialisé"}
+
+@router.get("/api/admin/orphans")
+async def get_orphans():
+    try:
+        orphans = await cascade.find_orphans(db)
+        return {
+            "orphelins": {name: sum(animal_ids.values()) for name, animal_ids in orphans.items()},
+            "animal_ids": {name: list(animal_ids) for name, animal_ids in orphans.items()}
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.post("/api/admin/orphans/clean")
+async def clean_orphans():
+    try:
+        return {"message": "Enregistrements orphelins supprimés", "supprimes": await cascade.clean_orphans(db)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from datetime import date, datetime, time, timedelta
+
+from database import agenda_repo
+import agenda
+from enrichment import enrich_with_animal_info
+from models import AgendaPage
+from pagination import MAX_PAGE_SIZE, paginate
+from queries import AGENDA_SORT, query_date
+
+router = APIRouter(tags=["agenda"])
+
+@router.get("/api/agenda", response_model=AgendaPage, response_model_exclude_unset=True)
+async def get_agenda(
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+    type: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False
+):
+    """Reminders, expected farrowings and planned weanings between `from` and `to`, soonest first.
+    
+    The window defaults to 30 days from `from` (today if omitted); `type` is a comma-separated list.
+    """
+    try:
+        start_date = query_date(start) if start else datetime.combine(date.today(), time())
+        end_date = query_date(end) if end else start_date + timedelta(days=30)
+        query = {"date": {"$gte": start_date, "$lte": end_date}}
+        
+        if type:
+            types = [value.strip() for value in type.split(",") if value.strip()]
+            unknown = [value for value in types if value not in agenda.AGENDA_TYPES]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Type d'événement inconnu: {', '.join(unknown)}")
+            query["type"] = {"$in": types}
+        
+        page = await paginate(agenda_repo, query, AGENDA_SORT, limit, cursor, None, with_total)
+        
+        # Enrich with animal information
+        await enrich_with_animal_info(page["items"])
+        
+        return {"agenda": page["items"], "total": page["total"], "next_cursor": page["next_cursor"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
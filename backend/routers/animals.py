@@ -0,0 +1,313 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+from datetime import date, datetime
+import uuid
+
+from database import db, animals_repo
+import cascade
+import growth
+import photos
+import profitability
+import search
+from animal_cache import animal_cache, get_animal_summary
+from bulk_import import import_summary, insert_rows, read_rows, row_error, validate_rows
+from counters import allocate_wave_numbers, next_wave_number, observe_wave_number, parse_wave_number
+from dates import DateStr
+from models import Animal, AnimalBulkDelete, AnimalsPage, AnimalUpdate
+from pagination import MAX_PAGE_SIZE, paginate, parse_fields
+from queries import ANIMALS_SORT, animals_query
+from response_cache import VersionedRoute
+
+router = APIRouter(tags=["animals"], route_class=VersionedRoute)
+
+# Fields whose change alters the growth summaries of the animal's wave and race
+GROWTH_FIELDS = {"poids", "numero_vague", "race", "date_naissance", "nombre_animaux"}
+
+def weigh_in(animal_dict: dict) -> dict:
+    """Today's weigh-in at the animal's current poids"""
+    return {"id": str(uuid.uuid4()), "animal_id": animal_dict["id"], "date": date.today().isoformat(),
+            "poids": animal_dict["poids"]}
+
+def apply_animal_defaults(animal_dict: dict):
+    """Status and per-type defaults shared by create_animal and the bulk import"""
+    animal_dict["statut"] = "actif"  # Set default status
+    
+    # Set defaults based on type
+    if animal_dict["type"] == "poulet":
+        # For poulets (waves), sexe should be None and nombre_animaux defaults to 1 if not set
+        animal_dict["sexe"] = None
+        if not animal_dict.get("nombre_animaux"):
+            animal_dict["nombre_animaux"] = 1
+    else:
+        # For porcs, nombre_animaux is always 1 and sexe is required
+        animal_dict["nombre_animaux"] = 1
+        if not animal_dict.get("sexe"):
+            raise HTTPException(status_code=400, detail="Le sexe est obligatoire pour les porcs")
+
+# CRUD endpoints for animals
+@router.post("/api/animals")
+async def create_animal(animal: Animal):
+    try:
+        animal_dict = animal.dict()
+        animal_dict["id"] = str(uuid.uuid4())
+        apply_animal_defaults(animal_dict)
+        
+        if animal_dict["type"] == "poulet":
+            if not animal_dict.get("numero_vague"):
+                # Auto-generate wave number if not provided
+                animal_dict["numero_vague"] = await next_wave_number(db)
+            else:
+                await observe_wave_number(db, animal_dict["numero_vague"])
+        
+        animal_dict["created_at"] = datetime.now().isoformat()
+        animal_dict["updated_at"] = datetime.now().isoformat()
+        animal_dict["date_derniere_pesee"] = date.today().isoformat()
+        
+        result = await animals_repo.insert_one(animal_dict)
+        await profitability.sync_animals(db, [animal_dict["id"]])
+        await search.index_documents(db, "animals", [animal_dict])
+        # The registration weight opens the weigh-in history
+        await growth.add_weigh_ins(db, [weigh_in(animal_dict)])
+        await growth.invalidate(db, [animal_dict.get("numero_vague")], [animal_dict.get("race")])
+        
+        if result.inserted_id:
+            return {"message": "Animal créé avec succès", "id": animal_dict["id"]}
+        else:
+            raise HTTPException(status_code=500, detail="Erreur lors de la création")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.post("/api/animals/bulk")
+async def bulk_create_animals(request: Request):
+    """Import many animals from a JSON array, NDJSON or CSV (body or `file` upload)"""
+    try:
+        rows = await read_rows(request)
+        valid, errors = validate_rows(rows, Animal)
+        
+        documents = []
+        for line, animal_dict in valid:
+            try:
+                apply_animal_defaults(animal_dict)
+            except HTTPException as e:
+                errors.append(row_error(line, e.detail))
+                continue
+            documents.append((line, animal_dict))
+        
+        # Wave numbers: one counter round-trip for the whole batch
+        waves = [animal_dict for _, animal_dict in documents if animal_dict["type"] == "poulet"]
+        missing = [animal_dict for animal_dict in waves if not animal_dict.get("numero_vague")]
+        explicit = [parse_wave_number(animal_dict.get("numero_vague")) for animal_dict in waves]
+        explicit = [number for number in explicit if number is not None]
+        if explicit:
+            await observe_wave_number(db, f"Vague {max(explicit)}")
+        for animal_dict, numero_vague in zip(missing, await allocate_wave_numbers(db, len(missing))):
+            animal_dict["numero_vague"] = numero_vague
+        
+        now = datetime.now().isoformat()
+        for _, animal_dict in documents:
+            animal_dict["id"] = str(uuid.uuid4())
+            animal_dict["created_at"] = now
+            animal_dict["updated_at"] = now
+            animal_dict["date_derniere_pesee"] = date.today().isoformat()
+        
+        inserted, write_errors = await insert_rows(animals_repo, documents)
+        await profitability.sync_animals(db, [animal_dict["id"] for animal_dict in inserted])
+        await search.index_documents(db, "animals", inserted)
+        await growth.add_weigh_ins(db, [weigh_in(animal_dict) for animal_dict in inserted])
+        await growth.invalidate(db, [animal_dict.get("numero_vague") for animal_dict in inserted],
+                                [animal_dict.get("race") for animal_dict in inserted])
+        return import_summary("Import des animaux terminé", len(rows), inserted, errors + write_errors)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.post("/api/animals/bulk-delete")
+async def bulk_delete_animals(request: AnimalBulkDelete):
+    try:
+        if not request.ids:
+            raise HTTPException(status_code=400, detail="Aucun animal sélectionné")
+        
+        deleted = await cascade.delete_animals(db, list(set(request.ids)), archive=request.archiver)
+        animal_cache.invalidate(*request.ids)
+        message = "Animaux archivés avec succès" if request.archiver else "Animaux supprimés avec succès"
+        return {"message": message, "supprimes": deleted}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/animals", response_model=AnimalsPage, response_model_exclude_unset=True)
+async def get_animals(
+    type: Optional[str] = None,
+    statut: Optional[str] = "actif",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    with_total: bool = False
+):
+    try:
+        query = animals_query(type, statut)
+        
+        page = await paginate(
+            animals_repo, query, ANIMALS_SORT, limit, cursor,
+            parse_fields(fields, [key for key, _ in ANIMALS_SORT]), with_total
+        )
+        return {"animals": page["items"], "total": page["total"], "next_cursor": page["next_cursor"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/animals/breeding-males/{animal_type}")
+async def get_breeding_males(animal_type: str):
+    try:
+        # Get all male animals of the specified type for breeding selection (only active)
+        males = await animals_repo.find({
+            "type": animal_type,
+            "sexe": "M",
+            "statut": "actif"
+        }, sort=[("nom", 1)])
+        
+        return {"breeding_males": males, "total": len(males)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/stats")
+async def get_stats():
+    try:
+        # One round-trip: per (type, statut) count of lots, heads (nombre_animaux of vagues) and porc sexes
+        groups = await animals_repo.aggregate([
+            {"$match": {"type": {"$in": ["poulet", "porc"]}, "statut": {"$in": ["actif", "vendu"]}}},
+            {"$group": {
+                "_id": {"type": "$type", "statut": "$statut"},
+                "lots": {"$sum": 1},
+                "animaux": {"$sum": {"$ifNull": ["$nombre_animaux", 1]}},
+                "males": {"$sum": {"$cond": [{"$eq": ["$sexe", "M"]}, 1, 0]}},
+                "females": {"$sum": {"$cond": [{"$eq": ["$sexe", "F"]}, 1, 0]}}
+            }}
+        ])
+        empty = {"lots": 0, "animaux": 0, "males": 0, "females": 0}
+        by_key = {(group["_id"]["type"], group["_id"]["statut"]): group for group in groups}
+        poulets_actifs = by_key.get(("poulet", "actif"), empty)
+        porcs_actifs = by_key.get(("porc", "actif"), empty)
+        
+        # Total poulets is the sum of nombre_animaux in all active waves, porcs count one each
+        total_poulets = poulets_actifs["animaux"]
+        total_porcs = porcs_actifs["lots"]
+        total_animals = total_poulets + total_porcs
+        
+        # Stats par sexe (only for porcs)
+        males = porcs_actifs["males"]
+        females = porcs_actifs["females"]
+        
+        # Count sold animals
+        total_vendus = by_key.get(("poulet", "vendu"), empty)["animaux"] + by_key.get(("porc", "vendu"), empty)["lots"]
+        
+        # Count waves/lots
+        total_vagues = poulets_actifs["lots"]  # Number of active waves
+        total_lots_porcs = porcs_actifs["lots"]  # Number of individual porcs
+        
+        return {
+            "total_animals": total_animals,
+            "total_poulets": total_poulets,
+            "total_porcs": total_porcs,
+            "males": males,
+            "females": females,
+            "total_vendus": total_vendus,
+            "total_vagues": total_vagues,
+            "total_lots_porcs": total_lots_porcs
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/animals/{animal_id}")
+async def get_animal(animal_id: str):
+    try:
+        animal = await animals_repo.get(animal_id)
+        if not animal:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+        return animal
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.put("/api/animals/{animal_id}")
+async def update_animal(animal_id: str, update_data: AnimalUpdate):
+    try:
+        animal = await get_animal_summary(animal_id)
+        if not animal:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+        
+        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
+        update_dict["updated_at"] = datetime.now().isoformat()
+        if "numero_vague" in update_dict:
+            await observe_wave_number(db, update_dict["numero_vague"])
+        if "photo_url" in update_dict:
+            update_dict["photo_miniature_url"] = photos.thumbnail_url(update_dict["photo_url"])
+        regrouped = bool(GROWTH_FIELDS & update_dict.keys())
+        if regrouped:
+            # Groups the animal leaves, before the update
+            await growth.invalidate_animals(db, [animal_id])
+        if "poids" in update_dict:
+            # A new weight is a weigh-in dated today rather than an overwrite
+            await growth.add_weigh_ins(db, [weigh_in({"id": animal_id, "poids": update_dict.pop("poids")})])
+        
+        result = await animals_repo.update_one(
+            {"id": animal_id},
+            {"$set": update_dict}
+        )
+        animal_cache.invalidate(animal_id)
+        await profitability.sync_animals(db, [animal_id])
+        if search.SEARCH_FIELDS["animals"].keys() & update_dict.keys():
+            await search.sync(db, "animals", [animal_id])
+        if regrouped:
+            await growth.invalidate_animals(db, [animal_id])
+        
+        if result.modified_count > 0:
+            return {"message": "Animal mis à jour avec succès"}
+        else:
+            return {"message": "Aucune modification effectuée"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.delete("/api/animals/{animal_id}")
+async def delete_animal(animal_id: str):
+    try:
+        # Also deletes associated records, in one transaction when the server supports it
+        deleted = await cascade.delete_animals(db, [animal_id])
+        animal_cache.invalidate(animal_id)
+        if deleted["animals"] > 0:
+            return {"message": "Animal supprimé avec succès"}
+        else:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.put("/api/animals/{animal_id}/sell")
+async def sell_animal(animal_id: str, prix_vente: float, date_vente: DateStr):
+    try:
+        animal = await get_animal_summary(animal_id)
+        if not animal:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+        
+        # Update animal status to sold
+        result = await animals_repo.update_one(
+            {"id": animal_id},
+            {"$set": {
+                "statut": "vendu",
+                "date_vente": date_vente,
+                "prix_vente": prix_vente,
+                "updated_at": datetime.now().isoformat()
+            }}
+        )
+        animal_cache.invalidate(animal_id)
+        await profitability.sync_animals(db, [animal_id])
+        
+        if result.modified_count > 0:
+            return {"message": "Animal marqué comme vendu avec succès"}
+        else:
+            raise HTTPException(status_code=500, detail="Erreur lors de la mise à jour")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from database import animals_repo, medical_records_repo, reproduction_events_repo, financial_records_repo
+from export import EXPORT_BATCH_SIZE, EXPORT_MEDIA_TYPES, gzip_stream, stream_rows
+from models import Animal, FinancialRecord, MedicalRecord, ReproductionEvent
+from queries import (
+    ANIMALS_SORT,
+    FINANCIAL_RECORDS_SORT,
+    MEDICAL_RECORDS_SORT,
+    REPRODUCTION_EVENTS_SORT,
+    animals_query,
+    financial_records_query,
+)
+
+router = APIRouter(tags=["export"])
+
+# Streaming export
+EXPORTS = {
+    "animals": (animals_repo, Animal, ANIMALS_SORT),
+    "medical_records": (medical_records_repo, MedicalRecord, MEDICAL_RECORDS_SORT),
+    "reproduction_events": (reproduction_events_repo, ReproductionEvent, REPRODUCTION_EVENTS_SORT),
+    "financial_records": (financial_records_repo, FinancialRecord, FINANCIAL_RECORDS_SORT),
+}
+
+@router.get("/api/export/{collection}")
+async def export_collection(
+    collection: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    animal_id: Optional[str] = None,
+    type: Optional[str] = None,
+    statut: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    type_transaction: Optional[str] = None,
+    categorie: Optional[str] = None
+):
+    """Stream a whole collection from a Mongo cursor with constant memory.
+    
+    Filters are those of get_animals (type, statut; no default statut here),
+    get_financial_records (dates, type_transaction, categorie) and animal_id for the other records.
+    """
+    if collection not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Collection inconnue")
+    repo, model, sort = EXPORTS[collection]
+    
+    if collection == "animals":
+        query = animals_query(type, statut)
+    elif collection == "financial_records":
+        query = financial_records_query(start_date, end_date, type_transaction, categorie)
+        if animal_id:
+            query["animal_id"] = animal_id
+    else:
+        query = {"animal_id": animal_id} if animal_id else {}
+    
+    body = stream_rows(repo.stream(query, sort=sort, batch_size=EXPORT_BATCH_SIZE), format, list(model.model_fields))
+    filename = f"{collection}.{format}"
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        body = gzip_stream(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
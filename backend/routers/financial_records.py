@@ -0,0 +1,226 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+from datetime import datetime
+import uuid
+
+from database import db, financial_records_repo
+from animal_cache import get_animal_summaries, get_animal_summary
+from bulk_import import import_summary, insert_rows, read_rows, row_error, validate_rows
+from enrichment import enrich_with_animal_info
+import financial_rollups
+import profitability
+import search
+from models import FinancialRecord, FinancialRecordsPage, FinancialRecordUpdate
+from pagination import MAX_PAGE_SIZE, paginate, parse_fields
+from queries import FINANCIAL_RECORDS_SORT, financial_records_query, query_date
+from response_cache import VersionedRoute
+
+router = APIRouter(tags=["financial-records"], route_class=VersionedRoute)
+
+# CRUD endpoints for financial records
+@router.post("/api/financial-records")
+async def create_financial_record(record: FinancialRecord):
+    try:
+        # Verify animal exists if animal_id is provided
+        if record.animal_id:
+            animal = await get_animal_summary(record.animal_id)
+            if not animal:
+                raise HTTPException(status_code=404, detail="Animal non trouvé")
+        
+        record_dict = record.dict()
+        record_dict["id"] = str(uuid.uuid4())
+        record_dict["created_at"] = datetime.now().isoformat()
+        record_dict["updated_at"] = datetime.now().isoformat()
+        
+        result = await financial_records_repo.insert_one(record_dict)
+        
+        if result.inserted_id:
+            await financial_rollups.apply_record(db, record_dict)
+            await profitability.sync_animals(db, [record_dict["animal_id"]])
+            await search.index_documents(db, "financial_records", [record_dict])
+            return {"message": "Transaction financière créée avec succès", "id": record_dict["id"]}
+        else:
+            raise HTTPException(status_code=500, detail="Erreur lors de la création")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.post("/api/financial-records/bulk")
+async def bulk_create_financial_records(request: Request):
+    """Import many financial records from a JSON array, NDJSON or CSV (body or `file` upload)"""
+    try:
+        rows = await read_rows(request)
+        valid, errors = validate_rows(rows, FinancialRecord)
+        
+        # Verify linked animals exist with one query
+        animal_ids = list({record_dict["animal_id"] for _, record_dict in valid if record_dict.get("animal_id")})
+        existing = await get_animal_summaries(animal_ids)
+        
+        now = datetime.now().isoformat()
+        documents = []
+        for line, record_dict in valid:
+            if record_dict.get("animal_id") and record_dict["animal_id"] not in existing:
+                errors.append(row_error(line, "Animal non trouvé"))
+                continue
+            record_dict["id"] = str(uuid.uuid4())
+            record_dict["created_at"] = now
+            record_dict["updated_at"] = now
+            documents.append((line, record_dict))
+        
+        inserted, write_errors = await insert_rows(financial_records_repo, documents)
+        await financial_rollups.add_records(db, inserted)
+        await profitability.sync_animals(db, [record_dict["animal_id"] for record_dict in inserted])
+        await search.index_documents(db, "financial_records", inserted)
+        return import_summary("Import des transactions financières terminé", len(rows), inserted, errors + write_errors)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/financial-records", response_model=FinancialRecordsPage, response_model_exclude_unset=True)
+async def get_financial_records(
+    start_date: Optional[str] = None, 
+    end_date: Optional[str] = None,
+    type_transaction: Optional[str] = None,
+    categorie: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    with_total: bool = False
+):
+    try:
+        query = financial_records_query(start_date, end_date, type_transaction, categorie)
+        
+        page = await paginate(
+            financial_records_repo, query, FINANCIAL_RECORDS_SORT, limit, cursor,
+            parse_fields(fields, [key for key, _ in FINANCIAL_RECORDS_SORT]), with_total
+        )
+        records = page["items"]
+        
+        # Enrich with animal information if linked
+        await enrich_with_animal_info(records)
+        
+        return {"financial_records": records, "total": page["total"], "next_cursor": page["next_cursor"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/financial-records/{record_id}")
+async def get_financial_record(record_id: str):
+    try:
+        record = await financial_records_repo.get(record_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Transaction financière non trouvée")
+        return record
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.put("/api/financial-records/{record_id}")
+async def update_financial_record(record_id: str, update_data: FinancialRecordUpdate):
+    try:
+        record = await financial_records_repo.get(record_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Transaction financière non trouvée")
+        
+        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
+        update_dict["updated_at"] = datetime.now().isoformat()
+        
+        result = await financial_records_repo.update_one(
+            {"id": record_id},
+            {"$set": update_dict}
+        )
+        
+        if result.modified_count > 0:
+            # Move the amount from the old rollup key to the new one
+            await financial_rollups.apply_record(db, record, -1)
+            await financial_rollups.apply_record(db, {**record, **update_dict})
+            # The record may have moved to another animal
+            await profitability.sync_animals(db, [record.get("animal_id"), update_dict.get("animal_id")])
+            await search.sync(db, "financial_records", [record_id])
+            return {"message": "Transaction financière mise à jour avec succès"}
+        else:
+            return {"message": "Aucune modification effectuée"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.delete("/api/financial-records/{record_id}")
+async def delete_financial_record(record_id: str):
+    try:
+        record = await financial_records_repo.find_one_and_delete({"id": record_id})
+        if record:
+            await financial_rollups.apply_record(db, record, -1)
+            await profitability.sync_animals(db, [record.get("animal_id")])
+            await search.remove(db, "financial_records", [record_id])
+            return {"message": "Transaction financière supprimée avec succès"}
+        else:
+            raise HTTPException(status_code=404, detail="Transaction financière non trouvée")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/financial-stats")
+async def get_financial_stats(
+    start_date: Optional[str] = None, 
+    end_date: Optional[str] = None,
+    granularite: Optional[str] = Query(None, pattern="^(jour|semaine|mois)$")
+):
+    try:
+        # Default to current month if no dates provided
+        if not start_date and not end_date:
+            today = datetime.now()
+            start_of_month = today.replace(day=1)
+            start_date = start_of_month.strftime("%Y-%m-%d")
+            end_date = today.strftime("%Y-%m-%d")
+        for bound in (start_date, end_date):
+            if bound:
+                query_date(bound)
+        
+        # Whole-day ranges are answered from the daily rollups instead of scanning the records
+        result = await financial_rollups.aggregate_financial_totals(
+            db, start_date, end_date, granularite,
+            use_rollups=financial_rollups.is_day_aligned(start_date, end_date)
+        )
+        
+        # Group by category
+        depenses_par_categorie = {}
+        recettes_par_categorie = {}
+        nombre_transactions = 0
+        for group in result["par_categorie"]:
+            par_categorie = depenses_par_categorie if group["_id"]["type"] == "depense" else recettes_par_categorie
+            par_categorie[group["_id"]["categorie"]] = group["montant"]
+            nombre_transactions += group["nombre"]
+        
+        total_depenses = sum(depenses_par_categorie.values())
+        total_recettes = sum(recettes_par_categorie.values())
+        benefice = total_recettes - total_depenses
+        
+        stats = {
+            "periode": {
+                "debut": start_date,
+                "fin": end_date
+            },
+            "resume": {
+                "total_depenses": total_depenses,
+                "total_recettes": total_recettes,
+                "benefice": benefice,
+                "nombre_transactions": nombre_transactions
+            },
+            "depenses_par_categorie": depenses_par_categorie,
+            "recettes_par_categorie": recettes_par_categorie
+        }
+        
+        if granularite:
+            buckets = {}
+            for group in result["serie"]:
+                bucket = buckets.setdefault(group["_id"]["periode"], {"depenses": 0, "recettes": 0})
+                bucket["depenses" if group["_id"]["type"] == "depense" else "recettes"] += group["montant"]
+            stats["granularite"] = granularite
+            stats["serie"] = [
+                {"periode": periode, **totaux, "benefice": totaux["recettes"] - totaux["depenses"]}
+                for periode, totaux in sorted(buckets.items(), key=lambda item: item[0] or "")
+            ]
+        
+        return stats
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from database import db
+import forecast
+from models import HerdForecastOut
+
+router = APIRouter(tags=["forecast"])
+
+MAX_HORIZON_WEEKS = 104
+
+@router.get("/api/forecast/herd", response_model=HerdForecastOut)
+async def get_herd_forecast(
+    type: str = Query("porc", pattern="^(porc|poulet)$"),
+    horizon: int = Query(26, ge=1, le=MAX_HORIZON_WEEKS)
+):
+    """Weekly projection of farrowings, births, weanings and herd size over `horizon` weeks"""
+    try:
+        return await forecast.herd_forecast(db, type, horizon)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
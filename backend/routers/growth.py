@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+import uuid
+
+from database import db, animals_repo
+import growth
+from animal_cache import get_animal_summary
+from bulk_import import import_summary, read_rows, row_error, validate_rows
+from models import GrowthSummaryList, WeighIn, WeighInHistory
+from queries import query_date
+from response_cache import VersionedRoute
+
+router = APIRouter(tags=["growth"], route_class=VersionedRoute)
+
+def split_keys(value: Optional[str]) -> list:
+    return [key.strip() for key in value.split(",") if key.strip()] if value else []
+
+@router.post("/api/weigh-ins/bulk")
+async def bulk_create_weigh_ins(request: Request):
+    """Import weigh-ins (animal_id, date, poids) from a JSON array, NDJSON or CSV (body or `file` upload)"""
+    try:
+        rows = await read_rows(request)
+        valid, errors = validate_rows(rows, WeighIn)
+
+        # Verify all referenced animals exist with one query, reading the groups to invalidate
+        animal_ids = list({weigh_in["animal_id"] for _, weigh_in in valid})
+        animals = {
+            animal["id"]: animal
+            for animal in await animals_repo.find({"id": {"$in": animal_ids}}, {"_id": 0, "id": 1, "numero_vague": 1, "race": 1})
+        }
+
+        weigh_ins = []
+        for line, weigh_in in valid:
+            if weigh_in["animal_id"] not in animals:
+                errors.append(row_error(line, "Animal non trouvé"))
+                continue
+            if weigh_in["poids"] <= 0:
+                errors.append(row_error(line, "Le poids doit être positif"))
+                continue
+            weigh_in["id"] = str(uuid.uuid4())
+            weigh_ins.append(weigh_in)
+
+        await growth.add_weigh_ins(db, weigh_ins)
+        weighed = [animals[weigh_in["animal_id"]] for weigh_in in weigh_ins]
+        await growth.invalidate(db, [animal.get("numero_vague") for animal in weighed],
+                                [animal.get("race") for animal in weighed])
+        return import_summary("Import des pesées terminé", len(rows), weigh_ins, errors)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/weigh-ins/{animal_id}", response_model=WeighInHistory)
+async def get_weigh_ins(
+    animal_id: str,
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to")
+):
+    """Weigh-in history of one animal, oldest first, with its average daily gain over the window"""
+    try:
+        animal = await get_animal_summary(animal_id)
+        if not animal:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+
+        mesures = await growth.animal_history(
+            db, animal_id, query_date(start) if start else None, query_date(end) if end else None
+        )
+        gmq = growth.animal_gain(mesures)
+        return {"animal_id": animal_id, "pesees": growth.history_to_api(mesures), "total": len(mesures), "gmq": gmq}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/growth/waves", response_model=GrowthSummaryList)
+async def get_wave_growth(numero_vague: Optional[str] = None, type: Optional[str] = None):
+    """Growth summaries (average daily gain, weekly curve) of the listed waves, or of every wave"""
+    try:
+        waves = split_keys(numero_vague)
+        if not waves:
+            query = {"numero_vague": {"$ne": None}}
+            if type:
+                query["type"] = type
+            waves = sorted(await animals_repo.distinct("numero_vague", query))
+        summaries = await growth.get_summaries(db, growth.WAVE, waves)
+        return {"summaries": summaries, "total": len(summaries)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/growth/races", response_model=GrowthSummaryList)
+async def get_race_growth(race: Optional[str] = None, type: Optional[str] = None):
+    """Growth summaries of the listed races, or of every race"""
+    try:
+        races = split_keys(race)
+        if not races:
+            races = sorted(await animals_repo.distinct("race", {"type": type} if type else {}))
+        summaries = await growth.get_summaries(db, growth.RACE, races)
+        return {"summaries": summaries, "total": len(summaries)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
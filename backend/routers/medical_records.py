@@ -0,0 +1,172 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+from datetime import date, datetime, time, timedelta
+import uuid
+
+from database import db, medical_records_repo
+import agenda
+import profitability
+import search
+from animal_cache import get_animal_summaries, get_animal_summary
+from bulk_import import import_summary, insert_rows, read_rows, row_error, validate_rows
+from enrichment import enrich_with_animal_info
+from models import MedicalRecord, MedicalRecordsPage, MedicalRecordUpdate, RemindersList
+from pagination import MAX_PAGE_SIZE, paginate, parse_fields
+from queries import MEDICAL_RECORDS_SORT
+from response_cache import VersionedRoute
+
+router = APIRouter(tags=["medical-records"], route_class=VersionedRoute)
+
+# CRUD endpoints for medical records
+@router.post("/api/medical-records")
+async def create_medical_record(record: MedicalRecord):
+    try:
+        # Verify animal exists
+        animal = await get_animal_summary(record.animal_id)
+        if not animal:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+        
+        record_dict = record.dict()
+        record_dict["id"] = str(uuid.uuid4())
+        record_dict["created_at"] = datetime.now().isoformat()
+        record_dict["updated_at"] = datetime.now().isoformat()
+        
+        result = await medical_records_repo.insert_one(record_dict)
+        await agenda.sync_medical_record(db, record_dict)
+        await profitability.sync_animals(db, [record_dict["animal_id"]])
+        await search.index_documents(db, "medical_records", [record_dict])
+        
+        if result.inserted_id:
+            return {"message": "Dossier médical créé avec succès", "id": record_dict["id"]}
+        else:
+            raise HTTPException(status_code=500, detail="Erreur lors de la création")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.post("/api/medical-records/bulk")
+async def bulk_create_medical_records(request: Request):
+    """Import many medical records from a JSON array, NDJSON or CSV (body or `file` upload)"""
+    try:
+        rows = await read_rows(request)
+        valid, errors = validate_rows(rows, MedicalRecord)
+        
+        # Verify all referenced animals exist with one query
+        animal_ids = list({record_dict["animal_id"] for _, record_dict in valid})
+        existing = await get_animal_summaries(animal_ids)
+        
+        now = datetime.now().isoformat()
+        documents = []
+        for line, record_dict in valid:
+            if record_dict["animal_id"] not in existing:
+                errors.append(row_error(line, "Animal non trouvé"))
+                continue
+            record_dict["id"] = str(uuid.uuid4())
+            record_dict["created_at"] = now
+            record_dict["updated_at"] = now
+            documents.append((line, record_dict))
+        
+        inserted, write_errors = await insert_rows(medical_records_repo, documents)
+        await agenda.add_medical_records(db, inserted)
+        await profitability.sync_animals(db, [record_dict["animal_id"] for record_dict in inserted])
+        await search.index_documents(db, "medical_records", inserted)
+        return import_summary("Import des dossiers médicaux terminé", len(rows), inserted, errors + write_errors)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/medical-records/reminders/upcoming", response_model=RemindersList, response_model_exclude_unset=True)
+async def get_upcoming_reminders():
+    try:
+        # Get reminders for the next 30 days
+        today = datetime.combine(date.today(), time())
+        thirty_days_later = today + timedelta(days=30)
+        
+        records = await medical_records_repo.find({
+            "date_rappel": {
+                "$gte": today,
+                "$lte": thirty_days_later
+            }
+        }, sort=[("date_rappel", 1)])
+        
+        # Enrich with animal information
+        await enrich_with_animal_info(records)
+        
+        return {"reminders": records, "total": len(records)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/medical-records/record/{record_id}")
+async def get_medical_record(record_id: str):
+    try:
+        record = await medical_records_repo.get(record_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Dossier médical non trouvé")
+        return record
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/medical-records/{animal_id}", response_model=MedicalRecordsPage, response_model_exclude_unset=True)
+async def get_medical_records(
+    animal_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    with_total: bool = False
+):
+    try:
+        # Verify animal exists
+        animal = await get_animal_summary(animal_id)
+        if not animal:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+        
+        page = await paginate(
+            medical_records_repo, {"animal_id": animal_id}, MEDICAL_RECORDS_SORT, limit, cursor,
+            parse_fields(fields, [key for key, _ in MEDICAL_RECORDS_SORT]), with_total
+        )
+        return {"medical_records": page["items"], "total": page["total"], "next_cursor": page["next_cursor"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.put("/api/medical-records/{record_id}")
+async def update_medical_record(record_id: str, update_data: MedicalRecordUpdate):
+    try:
+        record = await medical_records_repo.get(record_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Dossier médical non trouvé")
+        
+        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
+        update_dict["updated_at"] = datetime.now().isoformat()
+        
+        result = await medical_records_repo.update_one(
+            {"id": record_id},
+            {"$set": update_dict}
+        )
+        await agenda.sync_medical_record(db, {**record, **update_dict})
+        if "cout" in update_dict:
+            await profitability.sync_animals(db, [record["animal_id"]])
+        if search.SEARCH_FIELDS["medical_records"].keys() & update_dict.keys():
+            await search.sync(db, "medical_records", [record_id])
+        
+        if result.modified_count > 0:
+            return {"message": "Dossier médical mis à jour avec succès"}
+        else:
+            return {"message": "Aucune modification effectuée"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.delete("/api/medical-records/{record_id}")
+async def delete_medical_record(record_id: str):
+    try:
+        record = await medical_records_repo.find_one_and_delete({"id": record_id}, {"_id": 0, "animal_id": 1})
+        if record:
+            await agenda.remove_sources(db, [record_id])
+            await profitability.sync_animals(db, [record["animal_id"]])
+            await search.remove(db, "medical_records", [record_id])
+            return {"message": "Dossier médical supprimé avec succès"}
+        else:
+            raise HTTPException(status_code=404, detail="Dossier médical non trouvé")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
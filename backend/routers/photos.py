@@ -0,0 +1,62 @@
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Path, Request, UploadFile
+from datetime import datetime
+
+from database import db, animals_repo
+import photos
+from animal_cache import get_animal_summary
+from response_cache import VersionedRoute
+
+router = APIRouter(tags=["photos"], route_class=VersionedRoute)
+
+@router.post("/api/animals/{animal_id}/photo")
+async def upload_animal_photo(animal_id: str, file: UploadFile, background_tasks: BackgroundTasks):
+    """Store a photo (multipart `file` field) and make it the animal's photo_url"""
+    try:
+        animal = await get_animal_summary(animal_id)
+        if not animal:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+
+        data = await file.read(photos.PHOTO_MAX_SIZE + 1)
+        if len(data) > photos.PHOTO_MAX_SIZE:
+            raise HTTPException(status_code=413, detail="Photo trop volumineuse")
+        content_type = photos.sniff_content_type(data[:16])
+        if not content_type:
+            raise HTTPException(status_code=400, detail="Format d'image non supporté (JPEG, PNG, GIF ou WebP)")
+
+        photo = await photos.add_photo(db, data, content_type)
+        urls = photos.photo_urls(photo["hash"])
+        await animals_repo.update_one(
+            {"id": animal_id},
+            {"$set": {**urls, "updated_at": datetime.now().isoformat()}}
+        )
+        if not photo["miniature"]:
+            # Made in a worker process once the response is sent
+            background_tasks.add_task(photos.generate_thumbnail, db, photo["hash"])
+
+        return {"message": "Photo enregistrée avec succès", "hash": photo["hash"], "doublon": photo["doublon"], **urls}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/photos/{photo_hash}")
+async def get_photo(request: Request, photo_hash: str = Path(..., pattern=photos.HASH_PATTERN)):
+    """Original photo, served straight from the store without a database read"""
+    path = photos.photo_path(photo_hash)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Photo non trouvée")
+    content_type = photos.sniff_content_type(await photos.read_head(path))
+    return photos.file_response(request, path, content_type, f'"{photo_hash}"', photos.IMMUTABLE)
+
+@router.get("/api/photos/{photo_hash}/miniature")
+async def get_photo_thumbnail(request: Request, photo_hash: str = Path(..., pattern=photos.HASH_PATTERN)):
+    """Thumbnail of a photo, or the original while the thumbnail is being made"""
+    thumbnail = photos.thumbnail_path(photo_hash)
+    if thumbnail.exists():
+        return photos.file_response(request, thumbnail, "image/jpeg", f'"{photo_hash}-miniature"', photos.IMMUTABLE)
+    path = photos.photo_path(photo_hash)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Photo non trouvée")
+    # Not immutable: the thumbnail replaces it once ready
+    content_type = photos.sniff_content_type(await photos.read_head(path))
+    return photos.file_response(request, path, content_type, f'"{photo_hash}"', "no-cache")
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from database import ledger_repo
+from models import AnimalProfitOut, AnimalProfitPage, WaveProfitPage
+from pagination import MAX_PAGE_SIZE, paginate
+from profitability import ANIMAL, WAVE
+from queries import PROFITABILITY_SORT
+
+router = APIRouter(tags=["profitability"])
+
+def profitability_sort(ordre: str) -> list:
+    # Least profitable first walks the same index backwards
+    return PROFITABILITY_SORT if ordre == "desc" else [(field, -direction) for field, direction in PROFITABILITY_SORT]
+
+@router.get("/api/profitability/animals", response_model=AnimalProfitPage, response_model_exclude_unset=True)
+async def get_profitability_animals(
+    type: Optional[str] = None,
+    statut: Optional[str] = None,
+    numero_vague: Optional[str] = None,
+    ordre: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False
+):
+    """Animals ranked by margin (costs, revenue and margin per head) from the profitability ledger"""
+    try:
+        query = {"niveau": ANIMAL}
+        if type:
+            query["type"] = type
+        if statut:
+            query["statut"] = statut
+        if numero_vague:
+            query["numero_vague"] = numero_vague
+
+        page = await paginate(ledger_repo, query, profitability_sort(ordre), limit, cursor, None, with_total)
+        return {"animals": page["items"], "total": page["total"], "next_cursor": page["next_cursor"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/profitability/waves", response_model=WaveProfitPage, response_model_exclude_unset=True)
+async def get_profitability_waves(
+    type: Optional[str] = None,
+    ordre: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False
+):
+    """Waves (numero_vague) ranked by margin, summed over their lots"""
+    try:
+        query = {"niveau": WAVE}
+        if type:
+            query["type"] = type
+
+        page = await paginate(ledger_repo, query, profitability_sort(ordre), limit, cursor, None, with_total)
+        return {"waves": page["items"], "total": page["total"], "next_cursor": page["next_cursor"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/profitability/animals/{animal_id}", response_model=AnimalProfitOut)
+async def get_animal_profitability(animal_id: str):
+    try:
+        row = await ledger_repo.find_one({"niveau": ANIMAL, "cle": animal_id})
+        if not row:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+        return row
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
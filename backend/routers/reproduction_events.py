@@ -0,0 +1,147 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from datetime import date, datetime, time, timedelta
+import uuid
+
+from database import db, reproduction_events_repo
+import agenda
+import search
+from animal_cache import get_animal_summary
+from enrichment import enrich_with_animal_info
+from models import ReproductionEvent, ReproductionEventsPage, ReproductionEventUpdate, UpcomingBirthsList
+from pagination import MAX_PAGE_SIZE, paginate, parse_fields
+from queries import REPRODUCTION_EVENTS_SORT
+from response_cache import VersionedRoute
+
+router = APIRouter(tags=["reproduction-events"], route_class=VersionedRoute)
+
+def calculate_birth_date(mating_date: str, animal_type: str) -> str:
+    """Calculate expected birth date based on gestation period"""
+    mating = date.fromisoformat(mating_date)
+    
+    gestation_days = agenda.GESTATION_DAYS.get(animal_type, agenda.GESTATION_DAYS["porc"])
+    birth_date = mating + timedelta(days=gestation_days)
+    
+    return birth_date.isoformat()
+
+# CRUD endpoints for reproduction events
+@router.post("/api/reproduction-events")
+async def create_reproduction_event(event: ReproductionEvent):
+    try:
+        # Verify animal exists
+        animal = await get_animal_summary(event.animal_id)
+        if not animal:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+        
+        # Verify animal is female for breeding events
+        if event.type_event in ["saillie", "insemination"] and animal["sexe"] != "F":
+            raise HTTPException(status_code=400, detail="Seules les femelles peuvent être saillies/inséminées")
+        
+        event_dict = event.dict()
+        event_dict["id"] = str(uuid.uuid4())
+        event_dict["created_at"] = datetime.now().isoformat()
+        event_dict["updated_at"] = datetime.now().isoformat()
+        
+        # Auto-calculate birth date for breeding events
+        if event.type_event in ["saillie", "insemination"] and not event.date_prevue_mise_bas:
+            event_dict["date_prevue_mise_bas"] = calculate_birth_date(event.date_event, animal["type"])
+        
+        result = await reproduction_events_repo.insert_one(event_dict)
+        await agenda.sync_animal_reproduction(db, event_dict["animal_id"])
+        await search.index_documents(db, "reproduction_events", [event_dict])
+        
+        if result.inserted_id:
+            return {"message": "Événement reproductif créé avec succès", "id": event_dict["id"]}
+        else:
+            raise HTTPException(status_code=500, detail="Erreur lors de la création")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/reproduction-events/upcoming-births", response_model=UpcomingBirthsList, response_model_exclude_unset=True)
+async def get_upcoming_births():
+    try:
+        # Get births expected in the next 30 days
+        today = datetime.combine(date.today(), time())
+        thirty_days_later = today + timedelta(days=30)
+        
+        events = await reproduction_events_repo.find({
+            "type_event": {"$in": ["saillie", "insemination"]},
+            "date_prevue_mise_bas": {
+                "$gte": today,
+                "$lte": thirty_days_later
+            }
+        }, sort=[("date_prevue_mise_bas", 1)])
+        
+        # Enrich with animal information
+        await enrich_with_animal_info(events)
+        
+        return {"upcoming_births": events, "total": len(events)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/api/reproduction-events/{animal_id}", response_model=ReproductionEventsPage, response_model_exclude_unset=True)
+async def get_reproduction_events(
+    animal_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    with_total: bool = False
+):
+    try:
+        # Verify animal exists
+        animal = await get_animal_summary(animal_id)
+        if not animal:
+            raise HTTPException(status_code=404, detail="Animal non trouvé")
+        
+        page = await paginate(
+            reproduction_events_repo, {"animal_id": animal_id}, REPRODUCTION_EVENTS_SORT, limit, cursor,
+            parse_fields(fields, [key for key, _ in REPRODUCTION_EVENTS_SORT]), with_total
+        )
+        events = page["items"]
+        
+        # Enrich with male animal information if available
+        await enrich_with_animal_info(events, "male_id", "male_animal_info", fields=("nom", "race"))
+        
+        return {"reproduction_events": events, "total": page["total"], "next_cursor": page["next_cursor"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.put("/api/reproduction-events/{event_id}")
+async def update_reproduction_event(event_id: str, update_data: ReproductionEventUpdate):
+    try:
+        event = await reproduction_events_repo.get(event_id, {"_id": 0, "animal_id": 1})
+        if not event:
+            raise HTTPException(status_code=404, detail="Événement reproductif non trouvé")
+        
+        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
+        update_dict["updated_at"] = datetime.now().isoformat()
+        
+        result = await reproduction_events_repo.update_one(
+            {"id": event_id},
+            {"$set": update_dict}
+        )
+        await agenda.sync_animal_reproduction(db, event["animal_id"])
+        if search.SEARCH_FIELDS["reproduction_events"].keys() & update_dict.keys():
+            await search.sync(db, "reproduction_events", [event_id])
+        
+        if result.modified_count > 0:
+            return {"message": "Événement reproductif mis à jour avec succès"}
+        else:
+            return {"message": "Aucune modification effectuée"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.delete("/api/reproduction-events/{event_id}")
+async def delete_reproduction_event(event_id: str):
+    try:
+        event = await reproduction_events_repo.find_one_and_delete({"id": event_id}, {"_id": 0, "animal_id": 1})
+        if event:
+            await agenda.sync_animal_reproduction(db, event["animal_id"])
+            await search.remove(db, "reproduction_events", [event_id])
+            return {"message": "Événement reproductif supprimé avec succès"}
+        else:
+            raise HTTPException(status_code=404, detail="Événement reproductif non trouvé")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
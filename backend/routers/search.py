@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from database import search_repo
+import search
+from enrichment import enrich_with_animal_info
+from models import SearchPage
+from pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, keyset_filter
+from queries import SEARCH_SORT
+
+router = APIRouter(tags=["search"])
+
+@router.get("/api/search", response_model=SearchPage, response_model_exclude_unset=True)
+async def search_records(
+    q: str = Query(..., min_length=search.MIN_PREFIX),
+    type: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False
+):
+    """Ranked typeahead search over animals and records; `type` restricts it to some collections (comma-separated)"""
+    try:
+        sources = [source.strip() for source in type.split(",") if source.strip()] if type else None
+        unknown = set(sources or []) - set(search.SOURCES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Type de recherche inconnu: {', '.join(sorted(unknown))}")
+        words = search.query_words(q)
+        if not words:
+            return {"results": [], "total": 0 if with_total else None, "next_cursor": None}
+
+        pipeline = search.search_pipeline(words, sources)
+        if cursor:
+            pipeline.append({"$match": keyset_filter(SEARCH_SORT, decode_cursor(cursor, SEARCH_SORT))})
+        pipeline += [
+            {"$sort": dict(SEARCH_SORT)},
+            {"$limit": limit + 1},
+            {"$project": {"_id": 0, "termes": 0, "prefixes": 0}},
+        ]
+        hits = await search_repo.aggregate(pipeline)
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = encode_cursor(hits[-1], SEARCH_SORT)
+
+        total = None
+        if with_total:
+            # Only the bounded candidates can be paged
+            bound = search.candidate_limit(words)
+            total = await search_repo.count(pipeline[0]["$match"], **({"limit": bound} if bound else {}))
+        await enrich_with_animal_info(hits)
+        return {"results": hits, "total": total, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
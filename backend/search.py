@@ -0,0 +1,152 @@
+"""Typeahead search index over animals, medical, reproduction and financial records."""
+from pymongo import ReplaceOne
+from typing import Iterable, List, Optional
+import asyncio
+import re
+import unicodedata
+
+from indexes import rebuild_collection
+
+SEARCH_COLLECTION = "search_index"
+MIN_PREFIX = 2
+MAX_PREFIX = 20  # Longer query words are matched on their first MAX_PREFIX characters
+MAX_TOKENS = 50  # Per record, so long notes do not bloat the index
+# Queries whose words are all shorter than EXACT_RANKING_LENGTH match most of the index:
+# only their first MAX_CANDIDATES matches in id order are ranked
+EXACT_RANKING_LENGTH = 4
+MAX_CANDIDATES = 2000
+
+# Indexed fields and their weight in the ranking, per collection
+SEARCH_FIELDS = {
+    "animals": {"nom": 5, "numero_vague": 4, "race": 3, "type": 2, "notes": 1},
+    "medical_records": {"medicament": 4, "type_intervention": 3, "veterinaire": 3, "notes": 1},
+    "reproduction_events": {"type_event": 3, "male_info": 2, "notes": 1},
+    "financial_records": {"fournisseur_acheteur": 4, "description": 3, "categorie": 2, "notes": 1},
+}
+SOURCES = list(SEARCH_FIELDS)
+# Shown as the hit's title, first non-empty field wins
+TITLE_FIELDS = {
+    "animals": ("nom", "numero_vague", "race"),
+    "medical_records": ("medicament", "type_intervention"),
+    "reproduction_events": ("type_event",),
+    "financial_records": ("description", "fournisseur_acheteur"),
+}
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"\w+", normalize(text))
+
+
+def search_entry(source: str, record: dict) -> dict:
+    weights = {}
+    for field, weight in SEARCH_FIELDS[source].items():
+        if record.get(field):
+            for token in tokenize(record[field]):
+                weights[token] = max(weights.get(token, 0), weight)
+    termes = sorted(weights.items(), key=lambda item: -item[1])[:MAX_TOKENS]
+    prefixes = {token[:length] for token, _ in termes for length in range(MIN_PREFIX, min(len(token), MAX_PREFIX) + 1)}
+    title = next((record[field] for field in TITLE_FIELDS[source] if record.get(field)), None)
+    details = [str(record[field]) for field in SEARCH_FIELDS[source] if record.get(field) and record[field] != title]
+    return {
+        "id": f"{source}:{record['id']}",
+        "source": source,
+        "source_id": record["id"],
+        "animal_id": record["id"] if source == "animals" else record.get("animal_id"),
+        "libelle": str(title) if title is not None else None,
+        "extrait": " - ".join(details)[:200] or None,
+        "termes": [{"t": token, "p": weight} for token, weight in termes],
+        "prefixes": sorted(prefixes),
+    }
+
+
+def query_words(q: str) -> List[str]:
+    return [word for word in dict.fromkeys(tokenize(q)) if len(word) >= MIN_PREFIX]
+
+
+def candidate_limit(words: List[str]) -> Optional[int]:
+    """Bound on the ranked matches of a query, None to rank them all"""
+    return None if max(map(len, words)) >= EXACT_RANKING_LENGTH else MAX_CANDIDATES
+
+
+def search_pipeline(words: List[str], sources: Optional[List[str]] = None) -> list:
+    """Match every word as a token prefix and score the candidates: stages up to the ranking sort.
+
+    Bounded candidates are taken in id order, read from the (prefixes, id) index, so the
+    same query always ranks and pages the same hits.
+    """
+    match = {"prefixes": {"$all": [word[:MAX_PREFIX] for word in words]}}
+    if sources:
+        match["source"] = {"$in": sources}
+    word_scores = [
+        {"$max": {"$map": {"input": "$termes", "as": "terme", "in": {"$cond": [
+            {"$eq": [{"$substrCP": ["$$terme.t", 0, len(word)]}, word]},
+            {"$multiply": ["$$terme.p", {"$cond": [{"$eq": ["$$terme.t", word]}, 2, 1]}]},
+            0
+        ]}}}}
+        for word in words
+    ]
+    stages = [{"$match": match}]
+    limit = candidate_limit(words)
+    if limit:
+        stages += [{"$sort": {"id": 1}}, {"$limit": limit}]
+    return stages + [{"$addFields": {"score": {"$add": word_scores}}}]
+
+
+async def index_documents(db, source: str, records: Iterable[dict]):
+    entries = [search_entry(source, record) for record in records]
+    if entries:
+        await db[SEARCH_COLLECTION].bulk_write(
+            [ReplaceOne({"id": entry["id"]}, entry, upsert=True) for entry in entries], ordered=False
+        )
+
+
+async def sync(db, source: str, ids: List[str]):
+    """Re-index records after an update, dropping the ones that no longer exist"""
+    records = await db[source].find({"id": {"$in": ids}}, {"_id": 0}).to_list(length=None)
+    await index_documents(db, source, records)
+    missing = set(ids) - {record["id"] for record in records}
+    if missing:
+        await remove(db, source, list(missing))
+
+
+async def remove(db, source: str, ids: List[str]):
+    await db[SEARCH_COLLECTION].delete_many({"id": {"$in": [f"{source}:{source_id}" for source_id in ids]}})
+
+
+async def remove_animals(db, animal_ids: List[str], session=None):
+    """Drop the animals and their records, cascade-deleted"""
+    await db[SEARCH_COLLECTION].delete_many({"animal_id": {"$in": animal_ids}}, session=session)
+
+
+async def search_entries(db):
+    for source, fields in SEARCH_FIELDS.items():
+        projection = {"_id": 0, "id": 1, "animal_id": 1, **{field: 1 for field in fields}}
+        async for record in db[source].find({}, projection):
+            yield search_entry(source, record)
+
+
+async def rebuild(db):
+    """Re-index every record (backfill or repair: python search.py)"""
+    await rebuild_collection(db, SEARCH_COLLECTION, search_entries(db))
+
+
+async def ensure_search(db):
+    """Backfill the index on first start against an existing history"""
+    if await db[SEARCH_COLLECTION].find_one({}):
+        return
+    for source in SOURCES:
+        if await db[source].find_one({}):
+            await rebuild(db)
+            return
+
+
+if __name__ == "__main__":
+    from database import db
+
+    asyncio.run(rebuild(db))
+    print("Index de recherche reconstruit")
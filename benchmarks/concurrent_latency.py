@@ -0,0 +1,97 @@
+"""Concurrent-request latency benchmark for the livestock API.
+
+Fires the same set of read endpoints from many threads at once and reports
+per-endpoint latency percentiles. Run it against a build using the blocking
+pymongo driver and against the Motor build to compare:
+
+    python benchmarks/concurrent_latency.py --base-url http://localhost:8001
+    python benchmarks/concurrent_latency.py --base-url http://old:8001 --compare http://new:8001
+"""
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ENDPOINTS = [
+    "api/animals",
+    "api/stats",
+    "api/financial-records",
+    "api/financial-stats",
+    "api/medical-records/reminders/upcoming",
+    "api/reproduction-events/upcoming-births",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed_get(session, url):
+    start = time.perf_counter()
+    response = session.get(url)
+    return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def run(base_url, concurrency, requests_per_endpoint):
+    """Return {endpoint: {"p50": ms, "p95": ms, "p99": ms, "errors": n, "rps": r}}"""
+    results = {}
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    for endpoint in ENDPOINTS:
+        url = f"{base_url.rstrip('/')}/{endpoint}"
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(lambda _: timed_get(session, url), range(requests_per_endpoint)))
+        elapsed = time.perf_counter() - started
+
+        latencies = [ms for ms, _ in samples]
+        results[endpoint] = {
+            "p50": statistics.median(latencies),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "errors": sum(1 for _, status in samples if status >= 400),
+            "rps": requests_per_endpoint / elapsed if elapsed else 0.0,
+        }
+    return results
+
+
+def print_results(label, results):
+    print(f"\n📊 {label}")
+    print(f"{'endpoint':45} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'errors':>7}")
+    for endpoint, r in results.items():
+        print(f"{endpoint:45} {r['p50']:8.1f}ms {r['p95']:8.1f}ms {r['p99']:8.1f}ms {r['rps']:9.1f} {r['errors']:7d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--compare", help="Second deployment to benchmark with the same load")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    args = parser.parse_args()
+
+    before = run(args.base_url, args.concurrency, args.requests)
+    print_results(f"{args.base_url} (concurrency={args.concurrency})", before)
+
+    if args.compare:
+        after = run(args.compare, args.concurrency, args.requests)
+        print_results(f"{args.compare} (concurrency={args.concurrency})", after)
+        print("\n📈 p95 speed-up")
+        for endpoint in ENDPOINTS:
+            ratio = before[endpoint]["p95"] / after[endpoint]["p95"] if after[endpoint]["p95"] else 0.0
+            print(f"{endpoint:45} x{ratio:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Count Mongo round-trips per list endpoint.
+
+Seeds a scratch database with animals and linked records, calls each enriched
+list endpoint in-process and counts the commands the driver sends. With the
+per-row find_one enrichment the count grows with the number of rows; with the
+batched $in lookup it stays constant.
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/enrichment_round_trips.py --rows 5000
+"""
+import argparse
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pymongo import MongoClient, monitoring
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def seed(db, rows, animals):
+    today = datetime.now()
+    animal_ids = [str(uuid.uuid4()) for _ in range(animals)]
+    db.animals.insert_many([
+        {"id": animal_id, "type": "porc", "race": "Large White", "sexe": "F" if i % 2 else "M",
+         "nom": f"Porc {i}", "statut": "actif", "date_naissance": "2023-01-01", "poids": 90.0}
+        for i, animal_id in enumerate(animal_ids)
+    ])
+    db.financial_records.insert_many([
+        {"id": str(uuid.uuid4()), "type_transaction": "depense", "categorie": "alimentation",
+         "date_transaction": (today - timedelta(days=i % 365)).strftime("%Y-%m-%d"), "montant": 10.0,
+         "animal_id": animal_ids[i % animals], "description": "Aliment"}
+        for i in range(rows)
+    ])
+    db.medical_records.insert_many([
+        {"id": str(uuid.uuid4()), "animal_id": animal_ids[i % animals], "date_intervention": "2024-01-01",
+         "type_intervention": "vaccination", "date_rappel": (today + timedelta(days=i % 30)).strftime("%Y-%m-%d")}
+        for i in range(rows)
+    ])
+    db.reproduction_events.insert_many([
+        {"id": str(uuid.uuid4()), "animal_id": animal_ids[0], "type_event": "saillie",
+         "date_event": today.strftime("%Y-%m-%d"), "male_id": animal_ids[i % animals],
+         "date_prevue_mise_bas": (today + timedelta(days=i % 30)).strftime("%Y-%m-%d")}
+        for i in range(rows)
+    ])
+    return animal_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Records per collection")
+    parser.add_argument("--animals", type=int, default=200)
+    args = parser.parse_args()
+
+    db_name = f"livestock_bench_{uuid.uuid4().hex[:8]}"
+    os.environ["MONGO_DB_NAME"] = db_name
+    counter = CommandCounter()
+    monitoring.register(counter)
+
+    sync_client = MongoClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017/"))
+    try:
+        animal_ids = seed(sync_client[db_name], args.rows, args.animals)
+
+        import server
+        from fastapi.testclient import TestClient
+
+        endpoints = [
+            "api/financial-records",
+            "api/medical-records/reminders/upcoming",
+            "api/reproduction-events/upcoming-births",
+            f"api/reproduction-events/{animal_ids[0]}",
+        ]
+        print(f"📊 Round-trips with {args.rows} rows per collection, {args.animals} animals")
+        print(f"{'endpoint':60} {'rows':>6} {'commands':>9}")
+        with TestClient(server.app) as client:
+            for endpoint in endpoints:
+                counter.commands.clear()
+                body = client.get(f"/{endpoint}").json()
+                print(f"{endpoint:60} {body.get('total', 0):6d} {len(counter.commands):9d}")
+    finally:
+        sync_client.drop_database(db_name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
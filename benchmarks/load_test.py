@@ -0,0 +1,324 @@
+"""Reproducible load test of every endpoint against a seeded local database.
+
+Seeds a scratch database with synthetic farms (pig herds, poultry waves and their
+medical, reproduction and financial history), then drives the app in-process
+through its ASGI interface, or a running server with --base-url, with a fixed
+number of concurrent clients per endpoint. Reports p50/p95/p99 latency and
+throughput and writes them as JSON so runs can be compared:
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/load_test.py --output results.json
+    python benchmarks/load_test.py --output new.json --compare results.json
+    python benchmarks/load_test.py --mongomock --farms 1 --records 5000   # no server needed
+
+Counts are per farm. The scratch database is dropped at the end unless --keep is set.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parents[1] / "backend"
+sys.path.insert(0, str(BACKEND))
+
+SEED_BATCH_SIZE = 10000
+RACES = {"porc": ["Large White", "Landrace", "Piétrain", "Duroc"], "poulet": ["Cobb 500", "Ross 308", "Label Rouge"]}
+INTERVENTIONS = ["vaccination", "traitement", "visite_veterinaire", "autre"]
+CATEGORIES = {"depense": ["alimentation", "soins", "equipement", "autre"], "recette": ["vente", "autre"]}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def farm_documents(farm: int, args, rng: random.Random):
+    """Animals, then records linked to them; dates spread over the last two years and the next month"""
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    now = datetime.now()
+
+    def day(offset_min, offset_max):
+        return today + timedelta(days=rng.randint(offset_min, offset_max))
+
+    pigs = [{
+        "id": str(uuid.uuid4()), "type": "porc", "race": rng.choice(RACES["porc"]), "sexe": rng.choice("MF"),
+        "date_naissance": day(-900, -30), "poids": round(rng.uniform(5, 250), 1), "nom": f"F{farm}-P{i}",
+        "statut": rng.choices(["actif", "vendu", "mort"], [8, 3, 1])[0], "nombre_animaux": 1,
+        "numero_vague": None, "created_at": now, "updated_at": now,
+    } for i in range(args.pigs)]
+    waves = [{
+        "id": str(uuid.uuid4()), "type": "poulet", "race": rng.choice(RACES["poulet"]), "sexe": None,
+        "date_naissance": day(-700, -1), "poids": round(rng.uniform(0.04, 3), 2), "nom": f"F{farm}-V{i}",
+        "statut": rng.choices(["actif", "vendu", "abattu"], [5, 3, 2])[0],
+        "nombre_animaux": rng.randint(200, 5000), "numero_vague": f"Vague {farm * args.waves + i + 1}",
+        "created_at": now, "updated_at": now,
+    } for i in range(args.waves)]
+    animals = pigs + waves
+    sows = [pig["id"] for pig in pigs if pig["sexe"] == "F"] or [animals[0]["id"]]
+    boars = [pig["id"] for pig in pigs if pig["sexe"] == "M"] or [None]
+
+    medical_records = []
+    for _ in range(args.records):
+        intervention = day(-730, 0)
+        medical_records.append({
+            "id": str(uuid.uuid4()), "animal_id": rng.choice(animals)["id"], "date_intervention": intervention,
+            "type_intervention": rng.choice(INTERVENTIONS), "medicament": "Produit", "veterinaire": "Dr Martin",
+            "cout": round(rng.uniform(5, 150), 2), "notes": None,
+            "date_rappel": intervention + timedelta(days=rng.randint(20, 60)) if rng.random() < 0.5 else None,
+            "created_at": now, "updated_at": now,
+        })
+
+    reproduction_events = []
+    for _ in range(args.records):
+        event_type = rng.choice(["saillie", "insemination", "mise_bas", "sevrage"])
+        event_day = day(-730, 0)
+        reproduction_events.append({
+            "id": str(uuid.uuid4()), "animal_id": rng.choice(sows), "type_event": event_type, "date_event": event_day,
+            "male_id": rng.choice(boars) if event_type == "saillie" else None,
+            "date_prevue_mise_bas": event_day + timedelta(days=114) if event_type in ("saillie", "insemination")
+            else None,
+            "nombre_petits_nes": rng.randint(6, 16) if event_type == "mise_bas" else None,
+            "created_at": now, "updated_at": now,
+        })
+
+    financial_records = []
+    for _ in range(args.records):
+        transaction_type = rng.choice(["depense", "recette"])
+        financial_records.append({
+            "id": str(uuid.uuid4()), "type_transaction": transaction_type,
+            "categorie": rng.choice(CATEGORIES[transaction_type]), "date_transaction": day(-730, 0),
+            "montant": round(rng.uniform(10, 2000), 2),
+            "animal_id": rng.choice(animals)["id"] if rng.random() < 0.7 else None,
+            "description": "Transaction", "fournisseur_acheteur": None, "notes": None,
+            "created_at": now, "updated_at": now,
+        })
+
+    return {
+        "animals": animals,
+        "medical_records": medical_records,
+        "reproduction_events": reproduction_events,
+        "financial_records": financial_records,
+    }
+
+
+async def seed(db, args):
+    from dates import MIGRATION_MARKER_ID
+    import financial_rollups
+
+    rng = random.Random(args.seed)
+    sample = {"pigs": [], "waves": []}
+    counts = {}
+    for farm in range(args.farms):
+        for collection, documents in farm_documents(farm, args, rng).items():
+            for start in range(0, len(documents), SEED_BATCH_SIZE):
+                batch = documents[start:start + SEED_BATCH_SIZE]
+                await db[collection].insert_many(batch, ordered=False)
+                if collection == "financial_records" and args.mongomock:
+                    # mongomock's bulk_write rejects pymongo 4 UpdateOne operations
+                    for record in batch:
+                        await financial_rollups.apply_record(db, record)
+                elif collection == "financial_records":
+                    await financial_rollups.add_records(db, batch)
+            counts[collection] = counts.get(collection, 0) + len(documents)
+            if collection == "animals":
+                sample["pigs"] += [animal["id"] for animal in documents if animal["type"] == "porc"][:50]
+                sample["waves"] += [animal["id"] for animal in documents if animal["type"] == "poulet"][:50]
+    # Seeded dates are already native: skip the startup string-date migration
+    await db.counters.update_one({"_id": MIGRATION_MARKER_ID}, {"$set": {"date": datetime.now()}}, upsert=True)
+    return counts, sample
+
+
+def endpoints(sample, rng: random.Random, writes: bool):
+    """(name, method, path factory, body factory); factories pick random seeded ids per call"""
+    today = datetime.now().date()
+    month_start = today.replace(day=1).isoformat()
+    year_ago = (today - timedelta(days=365)).isoformat()
+    animal = lambda: rng.choice(sample["pigs"] + sample["waves"])  # noqa: E731
+    cases = [
+        ("health", "GET", lambda: "/api/health", None),
+        ("animals", "GET", lambda: "/api/animals", None),
+        ("animals_page", "GET", lambda: "/api/animals?limit=100", None),
+        ("animals_by_type", "GET", lambda: "/api/animals?type=porc&statut=actif&limit=100", None),
+        ("animal", "GET", lambda: f"/api/animals/{animal()}", None),
+        ("breeding_males", "GET", lambda: "/api/animals/breeding-males/porc", None),
+        ("stats", "GET", lambda: "/api/stats", None),
+        ("medical_records_animal", "GET", lambda: f"/api/medical-records/{animal()}", None),
+        ("reminders", "GET", lambda: "/api/medical-records/reminders/upcoming", None),
+        ("reproduction_events_animal", "GET", lambda: f"/api/reproduction-events/{rng.choice(sample['pigs'])}", None),
+        ("upcoming_births", "GET", lambda: "/api/reproduction-events/upcoming-births", None),
+        ("financial_records_page", "GET", lambda: "/api/financial-records?limit=100", None),
+        ("financial_records_range", "GET",
+         lambda: f"/api/financial-records?start_date={month_start}&end_date={today.isoformat()}&limit=100", None),
+        ("financial_stats", "GET", lambda: "/api/financial-stats", None),
+        ("financial_stats_series", "GET",
+         lambda: f"/api/financial-stats?start_date={year_ago}&end_date={today.isoformat()}&granularite=mois", None),
+        ("profitability_waves", "GET", lambda: "/api/profitability/waves?limit=100", None),
+        ("profitability_animals", "GET", lambda: "/api/profitability/animals?type=porc&limit=100", None),
+        ("export_financial_csv", "GET", lambda: f"/api/export/financial_records?format=csv&start_date={month_start}",
+         None),
+    ]
+    if writes:
+        cases += [
+            ("create_medical_record", "POST", lambda: "/api/medical-records", lambda: {
+                "animal_id": animal(), "date_intervention": today.isoformat(), "type_intervention": "vaccination",
+                "date_rappel": (today + timedelta(days=21)).isoformat(),
+            }),
+            ("create_financial_record", "POST", lambda: "/api/financial-records", lambda: {
+                "type_transaction": "depense", "categorie": "alimentation", "date_transaction": today.isoformat(),
+                "montant": 120.5, "animal_id": animal(), "description": "Aliment",
+            }),
+            ("update_animal", "PUT", lambda: f"/api/animals/{rng.choice(sample['pigs'])}",
+             lambda: {"poids": round(rng.uniform(20, 200), 1)}),
+        ]
+    return cases
+
+
+async def run_endpoint(client, method, path, body, requests, concurrency):
+    latencies, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            url, payload = path(), body() if body else None
+            start = time.perf_counter()
+            response = await client.request(method, url, json=payload)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requetes": len(latencies),
+        "erreurs": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "moyenne_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "max_ms": round(max(latencies), 3) if latencies else 0.0,
+        "debit_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=BACKEND).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, previous_path):
+    previous = json.loads(Path(previous_path).read_text())["endpoints"]
+    print(f"\n{'endpoint':<30} {'p95 avant':>10} {'p95 après':>10} {'écart':>8}")
+    for name, stats in results.items():
+        if name in previous:
+            before, after = previous[name]["p95_ms"], stats["p95_ms"]
+            delta = (after - before) / before * 100 if before else 0.0
+            print(f"{name:<30} {before:>10.2f} {after:>10.2f} {delta:>+7.1f}%")
+
+
+async def main_async(args):
+    db_name = args.db or f"livestock_load_{uuid.uuid4().hex[:8]}"
+    os.environ["MONGO_DB_NAME"] = db_name
+    import database
+
+    if args.mongomock:
+        from mongomock_motor import AsyncMongoMockClient
+
+        database.client = AsyncMongoMockClient()
+        database.db = database.client[db_name]
+        for name in ("animals", "medical_records", "reproduction_events", "financial_records", "agenda"):
+            setattr(database, f"{name}_repo", database.Repository(database.db[name]))
+        database.ledger_repo = database.Repository(database.db.profitability_ledger)
+    db = database.db
+
+    try:
+        started = time.perf_counter()
+        counts, sample = await seed(db, args)
+        print(f"Base {db_name} : {counts} en {time.perf_counter() - started:.1f} s")
+
+        if args.base_url:
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+        else:
+            import server
+
+            await server.create_indexes()  # Startup hook: indexes, rollups, counters
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bench",
+                                       timeout=60)
+
+        rng = random.Random(args.seed)
+        results = {}
+        async with client:
+            for name, method, path, body in endpoints(sample, rng, not args.read_only):
+                if args.only and name not in args.only:
+                    continue
+                await run_endpoint(client, method, path, body, min(args.warmup, args.requests), args.concurrency)
+                results[name] = await run_endpoint(client, method, path, body, args.requests, args.concurrency)
+                stats = results[name]
+                print(f"{name:<30} p50 {stats['p50_ms']:8.2f}  p95 {stats['p95_ms']:8.2f}  "
+                      f"p99 {stats['p99_ms']:8.2f} ms  {stats['debit_rps']:8.1f} req/s  erreurs {stats['erreurs']}")
+        return db_name, counts, results
+    finally:
+        if not args.keep:
+            await database.client.drop_database(db_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--farms", type=int, default=2)
+    parser.add_argument("--pigs", type=int, default=2500, help="Pigs per farm")
+    parser.add_argument("--waves", type=int, default=1500, help="Poultry waves per farm")
+    parser.add_argument("--records", type=int, default=100000,
+                        help="Medical, reproduction and financial records per farm, each")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Endpoint names to run")
+    parser.add_argument("--read-only", action="store_true", help="Skip the write endpoints")
+    parser.add_argument("--base-url", help="Load a running server instead of the in-process app")
+    parser.add_argument("--db", help="Database name (default: a fresh livestock_load_* database)")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded database")
+    parser.add_argument("--mongomock", action="store_true", help="In-memory mongomock stand-in instead of MongoDB")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Previous JSON results to compare p95 against")
+    args = parser.parse_args()
+
+    db_name, counts, results = asyncio.run(main_async(args))
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "backend": "mongomock" if args.mongomock else os.environ.get("MONGO_URL", "mongodb://localhost:27017/"),
+            "base_url": args.base_url,
+            "base": db_name,
+            "documents": counts,
+            "parametres": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "endpoints": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Overhead of the metrics middleware and Mongo command listener.
+
+Drives a minimal FastAPI app through its ASGI interface (no network, no test client)
+with and without the metrics middleware and reports the added cost per request,
+then times the command listener callback on its own.
+
+    python benchmarks/metrics_overhead.py --requests 20000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from metrics import Metrics, MongoCommandListener, MetricsMiddleware  # noqa: E402
+
+
+def make_app(registry=None):
+    app = FastAPI()
+    if registry is not None:
+        app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/api/animals/{animal_id}")
+    async def get_animal(animal_id: str):
+        return {"id": animal_id}
+
+    return app
+
+
+async def drive(app, requests):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/api/animals/{i}", "raw_path": f"/api/animals/{i}".encode(),
+            "root_path": "", "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("t", 80),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bare, measured = make_app(), make_app(Metrics())
+    asyncio.run(drive(bare, 1000))
+    asyncio.run(drive(measured, 1000))
+    bare_times = [asyncio.run(drive(bare, args.requests)) for _ in range(args.repeat)]
+    measured_times = [asyncio.run(drive(measured, args.requests)) for _ in range(args.repeat)]
+    bare_us = statistics.median(bare_times) * 1e6
+    measured_us = statistics.median(measured_times) * 1e6
+    print(f"sans métriques   {bare_us:8.1f} µs/requête")
+    print(f"avec métriques   {measured_us:8.1f} µs/requête  (+{measured_us - bare_us:.1f} µs)")
+
+    listener = MongoCommandListener(Metrics())
+    event = SimpleNamespace(command_name="find", duration_micros=850)
+    started = time.perf_counter()
+    for _ in range(args.requests * 10):
+        listener.succeeded(event)
+    per_event = (time.perf_counter() - started) / (args.requests * 10) * 1e6
+    print(f"listener Mongo   {per_event:8.2f} µs/commande")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Dispatch micro-benchmark for the router table.
+
+Resolves a concrete path for every declared route the way Starlette does (first full
+match in declaration order) and reports, per route, its position in the table, the
+number of route patterns tried before it matches and the time to resolve it.
+
+    python benchmarks/route_dispatch.py --iterations 20000
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+import server  # noqa: E402
+from routers import dispatch_table  # noqa: E402
+
+
+def resolve(table, scope):
+    for tried, route in enumerate(table, 1):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route, tried
+    return None, len(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    table = dispatch_table(server.app)
+    rows = []
+    for route in table:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in sorted(route.methods):
+            path = re.sub(r"{[^}]+}", "3f2a9c", route.path)
+            scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+            resolved, tried = resolve(table, scope)
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                resolve(table, scope)
+            per_dispatch = (time.perf_counter() - started) / args.iterations * 1e6
+            rows.append((method, route.path, tried, per_dispatch, resolved is route))
+
+    print(f"{len(table)} routes dans la table\n")
+    print(f"{'méthode':7} {'route':55} {'essais':>6} {'µs':>7}")
+    for method, path, tried, per_dispatch, reachable in rows:
+        flag = "" if reachable else "  MASQUÉE"
+        print(f"{method:7} {path:55} {tried:6d} {per_dispatch:7.2f}{flag}")
+    mean = sum(row[3] for row in rows) / len(rows)
+    worst = max(rows, key=lambda row: row[3])
+    print(f"\nmoyenne {mean:.2f} µs/dispatch, pire {worst[3]:.2f} µs ({worst[0]} {worst[1]})")
+
+
+if __name__ == "__main__":
+    main()
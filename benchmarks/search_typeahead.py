@@ -0,0 +1,96 @@
+"""Typeahead latency of /api/search.
+
+Seeds a scratch database with animals and records (100k documents by default across
+the four collections), builds the search index with search.rebuild, then calls
+/api/search in-process with growing prefixes of common and rare words and reports
+the latency percentiles and hit counts per query. The target is p95 under 20 ms.
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/search_typeahead.py --documents 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+NAMES = ["Marguerite", "Bella", "Rosalie", "Caramel", "Noisette", "Praline", "Duchesse", "Cannelle"]
+RACES = ["Large White", "Landrace", "Piétrain", "Duroc", "Cobb 500", "Ross 308"]
+MEDICINES = ["Marbofloxacine", "Amoxicilline", "Ivermectine", "Oxytétracycline", "Fer dextran"]
+SUPPLIERS = ["Provenderie Martin", "Coopérative du Sud", "Agro Services", "Boucherie Lemaire"]
+QUERIES = ["ma", "mar", "marg", "marguerite", "la", "large white", "iver", "coop", "provenderie mar", "zzz"]
+
+
+def seed(db, documents):
+    rng = random.Random(0)
+    per_collection = documents // 4
+    animal_ids = [str(uuid.uuid4()) for _ in range(per_collection)]
+    db.animals.insert_many([
+        {"id": animal_id, "type": "porc", "race": rng.choice(RACES), "sexe": "F",
+         "nom": f"{rng.choice(NAMES)} {i}", "statut": "actif", "numero_vague": f"Vague {i % 300}",
+         "notes": rng.choice(["", "Fille de " + rng.choice(NAMES)])}
+        for i, animal_id in enumerate(animal_ids)
+    ])
+    db.medical_records.insert_many([
+        {"id": str(uuid.uuid4()), "animal_id": rng.choice(animal_ids), "type_intervention": "traitement",
+         "medicament": rng.choice(MEDICINES), "veterinaire": f"Dr {rng.choice(NAMES)}"}
+        for _ in range(per_collection)
+    ])
+    db.reproduction_events.insert_many([
+        {"id": str(uuid.uuid4()), "animal_id": rng.choice(animal_ids), "type_event": rng.choice(["saillie", "mise_bas"]),
+         "male_info": f"Verrat {rng.choice(RACES)}"}
+        for _ in range(per_collection)
+    ])
+    db.financial_records.insert_many([
+        {"id": str(uuid.uuid4()), "animal_id": rng.choice(animal_ids + [None] * 100), "type_transaction": "depense",
+         "categorie": "alimentation", "description": f"Aliment lot {i}", "fournisseur_acheteur": rng.choice(SUPPLIERS)}
+        for i in range(per_collection)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100000, help="Records across the four collections")
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per query")
+    args = parser.parse_args()
+
+    db_name = f"livestock_bench_{uuid.uuid4().hex[:8]}"
+    os.environ["MONGO_DB_NAME"] = db_name
+    sync_client = MongoClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017/"))
+    try:
+        seed(sync_client[db_name], args.documents)
+
+        import server
+        import search
+        from database import db
+        from fastapi.testclient import TestClient
+        from indexes import ensure_indexes
+
+        with TestClient(server.app) as client:
+            started = time.perf_counter()
+            client.portal.call(ensure_indexes, db)
+            client.portal.call(search.rebuild, db)
+            print(f"🔎 Index built over {args.documents} records in {time.perf_counter() - started:.1f}s")
+            print(f"{'q':20} {'hits':>7} {'p50 ms':>8} {'p95 ms':>8}")
+            for q in QUERIES:
+                timings = []
+                for _ in range(args.iterations):
+                    started = time.perf_counter()
+                    client.get("/api/search", params={"q": q})
+                    timings.append((time.perf_counter() - started) * 1000)
+                hits = client.get("/api/search", params={"q": q, "with_total": "true"}).json()["total"]
+                p95 = statistics.quantiles(timings, n=20)[-1]
+                print(f"{q:20} {hits:7d} {statistics.median(timings):8.2f} {p95:8.2f}")
+    finally:
+        sync_client.drop_database(db_name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Serialisation micro-benchmark for the large list responses.
+
+Builds representative 10k-row payloads for each list endpoint and times the three
+paths a response can take:
+
+  dict + jsonable_encoder + JSONResponse   (no response model, the old path)
+  response model + JSONResponse            (default)
+  response model + ORJSONResponse          (FAST_JSON=1)
+
+    python benchmarks/serialization.py --rows 10000
+"""
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+import models  # noqa: E402
+
+
+def animal(i):
+    return {
+        "id": str(uuid.uuid4()), "type": "porc", "race": "Large White", "sexe": "F" if i % 2 else "M",
+        "date_naissance": "2023-05-01", "poids": 95.5, "nom": f"Porc {i}", "notes": None, "statut": "actif",
+        "date_vente": None, "prix_vente": None, "nombre_animaux": 1, "numero_vague": None, "photo_url": None,
+        "created_at": "2024-01-01T10:00:00", "updated_at": "2024-01-01T10:00:00",
+    }
+
+
+def financial_record(i):
+    return {
+        "id": str(uuid.uuid4()), "type_transaction": "depense", "categorie": "alimentation",
+        "date_transaction": "2024-03-01", "montant": 125.4, "animal_id": str(uuid.uuid4()),
+        "description": "Aliment croissance", "fournisseur_acheteur": "Coopérative", "notes": None,
+        "created_at": "2024-03-01T10:00:00", "updated_at": "2024-03-01T10:00:00",
+        "animal_info": {"nom": f"Porc {i}", "type": "porc", "race": "Large White"},
+    }
+
+
+def medical_record(i):
+    return {
+        "id": str(uuid.uuid4()), "animal_id": str(uuid.uuid4()), "date_intervention": "2024-02-01",
+        "type_intervention": "vaccination", "medicament": "Vaccin", "veterinaire": "Dr Martin", "cout": 25.5,
+        "notes": None, "date_rappel": "2024-08-01", "created_at": "2024-02-01T10:00:00",
+        "updated_at": "2024-02-01T10:00:00",
+    }
+
+
+def reproduction_event(i):
+    return {
+        "id": str(uuid.uuid4()), "animal_id": str(uuid.uuid4()), "type_event": "saillie",
+        "date_event": "2024-02-01", "male_id": str(uuid.uuid4()), "male_info": None,
+        "date_prevue_mise_bas": "2024-05-25", "nombre_petits_nes": None, "nombre_petits_vivants": None,
+        "nombre_petits_morts": None, "poids_moyen_petits": None, "notes": None,
+        "created_at": "2024-02-01T10:00:00", "updated_at": "2024-02-01T10:00:00",
+        "male_animal_info": {"nom": f"Verrat {i}", "race": "Piétrain"},
+    }
+
+
+ENDPOINTS = [
+    ("GET /api/animals", "animals", animal, models.AnimalsPage),
+    ("GET /api/financial-records", "financial_records", financial_record, models.FinancialRecordsPage),
+    ("GET /api/medical-records/{id}", "medical_records", medical_record, models.MedicalRecordsPage),
+    ("GET /api/reproduction-events/{id}", "reproduction_events", reproduction_event, models.ReproductionEventsPage),
+]
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"📊 Serialisation time for {args.rows} rows (best of {args.repeat})")
+    print(f"{'endpoint':38} {'encoder':>10} {'model':>10} {'model+orjson':>13} {'size':>9}")
+    for name, key, make_row, model in ENDPOINTS:
+        payload = {key: [make_row(i) for i in range(args.rows)], "total": args.rows, "next_cursor": None}
+
+        def model_content():
+            return model.model_validate(payload).model_dump(mode="json", exclude_unset=True)
+
+        baseline = best_of(args.repeat, lambda: JSONResponse(jsonable_encoder(payload)).body)
+        typed = best_of(args.repeat, lambda: JSONResponse(model_content()).body)
+        fast = best_of(args.repeat, lambda: ORJSONResponse(model_content()).body)
+        size = len(ORJSONResponse(model_content()).body) / 1024
+        print(f"{name:38} {baseline:8.1f}ms {typed:8.1f}ms {fast:11.1f}ms {size:7.0f}KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import asyncio
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+from pymongo.errors import PyMongoError  # noqa: E402
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+
+
+@pytest.fixture(scope="session")
+def mongo_available():
+    try:
+        MongoClient(MONGO_URL, serverSelectionTimeoutMS=500).admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"MongoDB not reachable at {MONGO_URL}")
+
+
+@pytest.fixture
+def run_with_db(mongo_available):
+    """Run an async test body against a throwaway database that is dropped afterwards."""
+    db_name = f"livestock_test_{uuid.uuid4().hex[:8]}"
+
+    def run(test_body):
+        async def main():
+            client = AsyncIOMotorClient(MONGO_URL)
+            try:
+                return await test_body(client[db_name])
+            finally:
+                await client.drop_database(db_name)
+                client.close()
+
+        return asyncio.run(main())
+
+    return run
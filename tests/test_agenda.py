@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from agenda import medical_entry, reproduction_entries
+
+
+def event(event_id, type_event, date_event, **fields):
+    return {"id": event_id, "animal_id": "truie", "type_event": type_event, "date_event": date_event, **fields}
+
+
+def test_reminder_entry_follows_date_rappel():
+    record = {"id": "m1", "animal_id": "truie", "type_intervention": "vaccination", "medicament": "Parvo",
+              "date_rappel": "2024-05-10"}
+    entry = medical_entry(record)
+    assert (entry["id"], entry["type"], entry["date"]) == ("m1:rappel", "rappel", datetime(2024, 5, 10))
+    assert entry["libelle"] == "vaccination - Parvo"
+    assert medical_entry({**record, "date_rappel": None}) is None
+
+
+def test_expected_farrowing_and_planned_weaning():
+    events = [
+        event("s1", "saillie", datetime(2024, 1, 1), date_prevue_mise_bas=datetime(2024, 4, 24)),
+        event("mb1", "mise_bas", datetime(2024, 4, 25), nombre_petits_vivants=11),
+    ]
+    entries = {entry["type"]: entry for entry in reproduction_entries(events, "porc")}
+    assert entries["mise_bas_prevue"]["date"] == datetime(2024, 4, 24)
+    assert entries["sevrage_prevu"]["date"] == datetime(2024, 5, 23)
+    assert entries["sevrage_prevu"]["libelle"] == "11 petits"
+
+    # A recorded weaning after the farrowing clears the planned one; poultry has none
+    weaned = events + [event("sv1", "sevrage", datetime(2024, 5, 20))]
+    assert [entry["type"] for entry in reproduction_entries(weaned, "porc")] == ["mise_bas_prevue"]
+    assert [entry["type"] for entry in reproduction_entries(events, "poulet")] == ["mise_bas_prevue"]
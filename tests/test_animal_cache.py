@@ -0,0 +1,28 @@
+import time
+
+from animal_cache import AnimalSummaryCache
+
+
+def test_lru_eviction_and_counters():
+    cache = AnimalSummaryCache(max_size=2, ttl=60)
+    for animal_id in ("a", "b"):
+        cache.put({"id": animal_id}, cache.version)
+    assert cache.get("a") == {"id": "a"}
+    cache.put({"id": "c"}, cache.version)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_ttl_expiry():
+    cache = AnimalSummaryCache(max_size=10, ttl=0.01)
+    cache.put({"id": "a"}, cache.version)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_invalidation_discards_reads_started_before_it():
+    cache = AnimalSummaryCache(max_size=10, ttl=60)
+    version = cache.version
+    cache.invalidate("a")
+    cache.put({"id": "a", "sexe": "F"}, version)  # read raced with an update
+    assert cache.get("a") is None
@@ -0,0 +1,54 @@
+import agenda
+import cascade
+import financial_rollups
+import growth
+import profitability
+
+
+async def seed(db, animal_ids):
+    await db.animals.insert_many([{"id": animal_id, "type": "porc", "sexe": "F"} for animal_id in animal_ids])
+    for animal_id in animal_ids:
+        medical_record = {"id": f"m-{animal_id}", "animal_id": animal_id, "date_rappel": "2024-02-01"}
+        await db.medical_records.insert_one(dict(medical_record))
+        await agenda.sync_medical_record(db, medical_record)
+        await db.reproduction_events.insert_one({"id": f"r-{animal_id}", "animal_id": animal_id})
+        record = {"id": f"f-{animal_id}", "animal_id": animal_id, "type_transaction": "depense",
+                  "categorie": "soins", "date_transaction": "2024-01-01", "montant": 10.0}
+        await db.financial_records.insert_one(dict(record))
+        await financial_rollups.apply_record(db, record)
+        await growth.add_weigh_ins(db, [{"id": f"w-{animal_id}", "animal_id": animal_id, "date": "2024-01-05", "poids": 80.0}])
+    await profitability.sync_animals(db, animal_ids)
+
+
+def test_bulk_cascade_delete_and_archive(run_with_db):
+    async def body(db):
+        await seed(db, ["a", "b", "c"])
+        deleted = await cascade.delete_animals(db, ["a", "b"], archive=True)
+        assert deleted == {"medical_records": 2, "reproduction_events": 2, "financial_records": 2, "weigh_ins": 2,
+                           "animals": 2}
+        assert await db.animals.distinct("id") == ["c"]
+        assert sorted(await db.medical_records_archive.distinct("animal_id")) == ["a", "b"]
+        assert await db.financial_rollups.distinct("animal_id") == ["c"]
+        assert await db.agenda.distinct("animal_id") == ["c"]
+        assert await db.profitability_ledger.distinct("cle") == ["c"]
+        assert await cascade.find_orphans(db) == {name: {} for name in cascade.CHILD_COLLECTIONS}
+
+    run_with_db(body)
+
+
+def test_orphan_scan_and_clean(run_with_db):
+    async def body(db):
+        await seed(db, ["a", "b"])
+        await db.growth_summaries.insert_one({"niveau": growth.WAVE, "cle": "Vague 1", "nombre_pesees": 2})
+        await db.animals.delete_one({"id": "a"})
+        orphans = await cascade.find_orphans(db)
+        assert orphans == {name: {"a": 1} for name in cascade.CHILD_COLLECTIONS}
+
+        assert await cascade.clean_orphans(db) == {name: 1 for name in cascade.CHILD_COLLECTIONS}
+        assert await cascade.find_orphans(db) == {name: {} for name in cascade.CHILD_COLLECTIONS}
+        assert await db.financial_rollups.distinct("animal_id") == ["b"]
+        assert await db.agenda.distinct("animal_id") == ["b"]
+        assert await db.profitability_ledger.distinct("cle") == ["b"]
+        assert await db.growth_summaries.count_documents({}) == 0
+
+    run_with_db(body)
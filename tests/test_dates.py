@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from dates import DateStr, OptionalDateStr, convert_filter, convert_update, to_api, to_storage
+
+
+class Record(BaseModel):
+    date_transaction: DateStr
+    date_rappel: OptionalDateStr = None
+
+
+def test_model_validates_and_normalises_dates():
+    record = Record(date_transaction="2024-03-05T10:30:00", date_rappel="")
+    assert record.date_transaction == "2024-03-05"
+    assert record.date_rappel is None
+    with pytest.raises(ValidationError):
+        Record(date_transaction="05/03/2024")
+    with pytest.raises(ValidationError):
+        Record(date_transaction="2024-02-30")
+
+
+def test_documents_round_trip_through_storage():
+    document = {
+        "id": "a",
+        "date_transaction": "2024-03-05",
+        "created_at": "2024-03-05T10:30:00.123000",
+        "categorie": "vente",
+    }
+    stored = to_storage("financial_records", document)
+    assert stored["date_transaction"] == datetime(2024, 3, 5)
+    assert stored["created_at"] == datetime(2024, 3, 5, 10, 30, 0, 123000)
+    assert document["date_transaction"] == "2024-03-05"  # The caller's dict is left alone
+    assert to_api("financial_records", stored) == document
+
+
+def test_filters_and_updates_use_native_dates():
+    query = {"$and": [
+        {"categorie": "vente"},
+        {"$or": [
+            {"date_transaction": {"$lt": "2024-03-05"}},
+            {"date_transaction": "2024-03-05", "id": {"$lt": "b"}},
+        ]},
+    ]}
+    converted = convert_filter("financial_records", query)
+    assert converted["$and"][0] == {"categorie": "vente"}
+    assert converted["$and"][1]["$or"][0]["date_transaction"] == {"$lt": datetime(2024, 3, 5)}
+    assert converted["$and"][1]["$or"][1] == {"date_transaction": datetime(2024, 3, 5), "id": {"$lt": "b"}}
+
+    update = convert_update("medical_records", {"$set": {"date_rappel": "2024-04-01"}, "$inc": {"n": 1}})
+    assert update == {"$set": {"date_rappel": datetime(2024, 4, 1)}, "$inc": {"n": 1}}
@@ -0,0 +1,83 @@
+import random
+import uuid
+
+import financial_rollups
+from database import Repository
+from indexes import ensure_indexes
+
+
+def normalise(result):
+    return {
+        "par_categorie": sorted(
+            (group["_id"]["type"], group["_id"]["categorie"], round(group["montant"], 6), group["nombre"])
+            for group in result["par_categorie"]
+        ),
+        "serie": sorted(
+            (group["_id"]["periode"], group["_id"]["type"], round(group["montant"], 6))
+            for group in result.get("serie", [])
+        ),
+    }
+
+
+async def seed_with_incremental_rollups(db, count=500):
+    rng = random.Random(7)
+    animal_ids = [str(uuid.uuid4()) for _ in range(5)] + [None]
+    repo = Repository(db.financial_records)  # Stores date_transaction as a BSON date
+    records = []
+    for _ in range(count):
+        record = {
+            "id": str(uuid.uuid4()),
+            "type_transaction": rng.choice(["depense", "recette"]),
+            "categorie": rng.choice(["alimentation", "soins", "equipement", "vente"]),
+            "date_transaction": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "montant": round(rng.uniform(1, 500), 2),
+            "animal_id": rng.choice(animal_ids),
+        }
+        await repo.insert_one(record)
+        await financial_rollups.apply_record(db, record)
+        records.append(record)
+
+    # Same bookkeeping as update_financial_record / delete_financial_record
+    for record in records[:50]:
+        updated = {**record, "montant": 42.0, "date_transaction": "2024-06-15"}
+        await repo.update_one({"id": record["id"]}, {"$set": updated})
+        await financial_rollups.apply_record(db, record, -1)
+        await financial_rollups.apply_record(db, updated)
+    for record in records[50:80]:
+        await repo.delete_one({"id": record["id"]})
+        await financial_rollups.apply_record(db, record, -1)
+    return animal_ids
+
+
+def test_rollups_match_raw_scans(run_with_db):
+    async def body(db):
+        await ensure_indexes(db)
+        await seed_with_incremental_rollups(db)
+        for start, end in [("2024-01-01", "2024-12-31"), ("2024-03-10", "2024-03-20"), (None, None)]:
+            for granularite in [None, "jour", "semaine", "mois"]:
+                from_rollups = await financial_rollups.aggregate_financial_totals(db, start, end, granularite, True)
+                from_records = await financial_rollups.aggregate_financial_totals(db, start, end, granularite, False)
+                assert normalise(from_rollups) == normalise(from_records)
+
+    run_with_db(body)
+
+
+def test_rebuild_matches_incremental_rollups(run_with_db):
+    async def body(db):
+        await ensure_indexes(db)
+        animal_ids = await seed_with_incremental_rollups(db)
+        await db.financial_records.delete_many({"animal_id": animal_ids[0]})
+        await financial_rollups.remove_animals(db, [animal_ids[0]])
+        incremental = normalise(await financial_rollups.aggregate_financial_totals(db, None, None, "jour", True))
+
+        await financial_rollups.rebuild(db)
+        rebuilt = normalise(await financial_rollups.aggregate_financial_totals(db, None, None, "jour", True))
+        assert rebuilt == incremental
+
+    run_with_db(body)
+
+
+def test_day_alignment():
+    assert financial_rollups.is_day_aligned("2024-01-01", "2024-01-31")
+    assert financial_rollups.is_day_aligned(None, None)
+    assert not financial_rollups.is_day_aligned("2024-01-01", "2024-01-31T12:00")
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import numpy as np
+
+from forecast import breeding_schedule, herd_statistics, simulate, summarize
+
+TODAY = datetime(2024, 6, 3)
+
+
+def event(type_event, date_event, **fields):
+    return {"type_event": type_event, "date_event": datetime.fromisoformat(date_event), **fields}
+
+
+SOWS = [
+    # Two litters 180 days apart, the last one still nursing
+    [
+        event("saillie", "2023-08-01", date_prevue_mise_bas=datetime(2023, 11, 23)),
+        event("mise_bas", "2023-11-23", nombre_petits_nes=13, nombre_petits_vivants=12),
+        event("sevrage", "2023-12-21", nombre_petits_vivants=9),
+        event("saillie", "2024-01-25", date_prevue_mise_bas=datetime(2024, 5, 18)),
+        event("mise_bas", "2024-05-21", nombre_petits_vivants=10),
+    ],
+    # A failed, then a pending insemination
+    [
+        event("insemination", "2024-01-10", date_prevue_mise_bas=datetime(2024, 5, 3)),
+        event("insemination", "2024-04-01", date_prevue_mise_bas=datetime(2024, 7, 24)),
+    ],
+]
+
+
+def test_herd_statistics_from_history():
+    statistics = herd_statistics(SOWS, "porc", TODAY)
+    assert statistics["tailles_portees"] == [12, 10]
+    assert statistics["intervalle_mise_bas_jours"] == 180.0
+    # Matings due less than three weeks ago are not settled yet
+    assert statistics["taux_mise_bas"] == 0.5
+    assert statistics["taux_sevrage"] == 0.75
+
+
+def test_breeding_schedule_pending_open_and_nursing():
+    schedule = breeding_schedule(SOWS, "porc", TODAY, 150.0)
+    # Sow 1 farrowed 13 days ago: next in 137 days; sow 2 is due 2024-07-24
+    assert schedule["prochaine_mise_bas"].tolist() == [137.0, 51.0]
+    assert schedule["sevrages_jours"].tolist() == [15]
+    assert schedule["sevrages_portees"].tolist() == [10]
+
+
+def test_simulation_is_exact_when_certain():
+    runs = simulate(np.array([3.0, 10.0]), 150.0, np.array([11]), 1.0, 1.0, 28, 8,
+                    np.array([2]), np.array([9]), simulations=20)
+    assert runs["naissances"].shape == (20, 8)
+    assert runs["naissances"][0].tolist() == [11, 11, 0, 0, 0, 0, 0, 0]
+    assert runs["sevrages"][0].tolist() == [9, 0, 0, 0, 11, 11, 0, 0]
+    assert not runs["pertes"].any()
+
+    weeks = summarize(runs, 40, TODAY)
+    assert [week["effectif"] for week in weeks] == [51, 62, 62, 62, 62, 62, 62, 62]
+    assert weeks[1]["debut"] == "2024-06-10"
+    assert (weeks[0]["naissances_min"], weeks[0]["naissances_max"]) == (11, 11)
+
+
+def test_simulation_follows_rates():
+    runs = simulate(np.zeros(100), 150.0, np.array([10, 12]), 0.8, 0.9, 28, 6,
+                    np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+    assert abs(runs["mises_bas"][:, 0].mean() - 80) < 1
+    assert abs(runs["naissances"][:, 0].mean() - 880) < 10
+    assert abs(runs["sevrages"][:, 4].mean() - 792) < 10
+    np.testing.assert_array_equal(runs["naissances"][:, 0] - runs["pertes"][:, 4], runs["sevrages"][:, 4])
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import numpy as np
+
+import growth
+from growth import bucket_updates, growth_summary, latest_weights
+from indexes import ensure_indexes
+
+
+def test_weigh_ins_grouped_into_monthly_buckets():
+    weigh_ins = [
+        {"id": "1", "animal_id": "a", "date": "2024-05-02", "poids": 10.0},
+        {"id": "2", "animal_id": "a", "date": "2024-05-20", "poids": 12.5},
+        {"id": "3", "animal_id": "a", "date": "2024-06-01", "poids": 14.0},
+    ]
+    updates = {tuple(update._filter.values()): update._doc for update in bucket_updates(weigh_ins)}
+    assert set(updates) == {("a", "2024-05"), ("a", "2024-06")}
+    may = updates[("a", "2024-05")]
+    assert may["$inc"] == {"nombre": 2}
+    assert (may["$min"]["premiere_date"], may["$max"]["derniere_date"]) == (datetime(2024, 5, 2), datetime(2024, 5, 20))
+    assert latest_weights(weigh_ins) == {"a": (datetime(2024, 6, 1), 14.0)}
+
+
+def test_growth_summary_slopes_and_weekly_curve():
+    # Lot 0 (100 birds) gains 0.05 kg/day, lot 1 (300 birds) 0.07; lot 2 weighed once has no slope
+    animal_index = np.array([0, 0, 0, 1, 1, 2])
+    age_days = np.array([0, 7, 14, 0, 14, 7])
+    weights = np.array([0.05, 0.40, 0.75, 0.05, 1.03, 0.5])
+    heads = np.array([100.0, 300.0, 50.0])
+    summary = growth_summary(animal_index, age_days, weights, heads)
+
+    assert summary["nombre_pesees"] == 6
+    assert summary["gmq"] == round((0.05 * 100 + 0.07 * 300) / 400, 4)
+    assert summary["poids_moyen_dernier"] == round((0.75 * 100 + 1.03 * 300 + 0.5 * 50) / 450, 3)
+    assert [point["semaine"] for point in summary["courbe"]] == [0, 1, 2]
+    assert summary["courbe"][1] == {"semaine": 1, "age_jours": 7, "poids_moyen": round((0.40 * 100 + 0.5 * 50) / 150, 3),
+                                    "pesees": 2}
+
+
+def test_growth_summary_without_weigh_ins():
+    empty = np.array([], dtype=np.int64)
+    summary = growth_summary(empty, empty, np.array([]), np.array([1.0]))
+    assert summary == {"nombre_pesees": 0, "gmq": None, "poids_moyen_dernier": None, "courbe": []}
+
+
+def test_summaries_are_cached_and_invalidated(run_with_db):
+    async def body(db):
+        await ensure_indexes(db)
+        await db.animals.insert_many([
+            {"id": "a", "type": "poulet", "race": "Cobb", "numero_vague": "Vague 1", "nombre_animaux": 100,
+             "date_naissance": datetime(2024, 5, 1)},
+            {"id": "b", "type": "poulet", "race": "Cobb", "numero_vague": "Vague 2", "nombre_animaux": 100,
+             "date_naissance": datetime(2024, 5, 1)},
+        ])
+        await growth.add_weigh_ins(db, [
+            {"id": "1", "animal_id": "a", "date": "2024-05-01", "poids": 0.04},
+            {"id": "2", "animal_id": "a", "date": "2024-05-29", "poids": 1.44},
+        ])
+        [summary] = await growth.get_summaries(db, growth.WAVE, ["Vague 1"])
+        assert summary["gmq"] == 0.05
+        assert (await db.animals.find_one({"id": "a"}))["poids"] == 1.44
+        assert await db[growth.SUMMARIES_COLLECTION].count_documents({}) == 1
+
+        await growth.add_weigh_ins(db, [{"id": "3", "animal_id": "a", "date": "2024-05-15", "poids": 0.80}])
+        await growth.invalidate(db, ["Vague 1"], ["Cobb"])
+        [summary] = await growth.get_summaries(db, growth.WAVE, ["Vague 1"])
+        assert summary["nombre_pesees"] == 3
+        # A back-dated weigh-in does not replace the current weight
+        assert (await db.animals.find_one({"id": "a"}))["poids"] == 1.44
+
+    run_with_db(body)
@@ -0,0 +1,29 @@
+from indexes import INDEXES, QUERY_SHAPES, ensure_indexes, index_coverage_report
+
+
+def test_every_query_shape_targets_a_declared_collection():
+    assert {collection for _, collection, _, _ in QUERY_SHAPES} <= set(INDEXES)
+
+
+def test_ensure_indexes_is_idempotent(run_with_db):
+    async def body(db):
+        first = await ensure_indexes(db)
+        second = await ensure_indexes(db)
+        assert first == second
+        info = await db.animals.index_information()
+        assert info["id_1"]["unique"]
+
+    run_with_db(body)
+
+
+def test_endpoint_queries_do_not_scan_collections(run_with_db):
+    async def body(db):
+        await ensure_indexes(db)
+        # The planner needs the collections to exist to pick an index
+        for collection in INDEXES:
+            await db[collection].insert_one({"id": "seed"})
+        report = await index_coverage_report(db)
+        uncovered = [(entry["endpoint"], entry["stages"]) for entry in report if not entry["covered"]]
+        assert not uncovered
+
+    run_with_db(body)
@@ -0,0 +1,49 @@
+import asyncio
+import contextvars
+import functools
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import Metrics, MetricsMiddleware
+
+
+def make_app(registry):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        # Motor runs the driver in an executor thread with a copy of the caller's context
+        loop = asyncio.get_running_loop()
+        for _ in range(2):
+            context = contextvars.copy_context()
+            await loop.run_in_executor(None, functools.partial(context.run, registry.observe_command, "find", 0.002))
+        return {"id": item_id}
+
+    return app
+
+
+def test_requests_are_labelled_by_route_template_with_mongo_round_trips():
+    registry = Metrics()
+    client = TestClient(make_app(registry))
+    for item_id in ("a", "b"):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/missing").status_code == 404
+
+    text = registry.render()
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert 'http_request_mongo_commands_sum{method="GET",route="/items/{item_id}"} 4' in text
+    assert 'mongo_command_duration_seconds_count{command="find"} 4' in text
+    assert "http_requests_in_flight 0" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Metrics()
+    for command, seconds in (("find", 0.0001), ("find", 0.003), ("find", 30)):
+        registry.observe_command(command, seconds)
+    text = registry.render()
+    assert 'mongo_command_duration_seconds_bucket{command="find",le="0.0005"} 1' in text
+    assert 'mongo_command_duration_seconds_bucket{command="find",le="0.005"} 2' in text
+    assert 'mongo_command_duration_seconds_bucket{command="find",le="+Inf"} 3' in text
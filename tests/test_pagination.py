@@ -0,0 +1,32 @@
+import pytest
+from fastapi import HTTPException
+
+from pagination import decode_cursor, encode_cursor, keyset_filter, parse_fields
+
+SORT = [("date_transaction", -1), ("id", -1)]
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"date_transaction": "2024-03-01", "id": "abc", "montant": 3.0}, SORT)
+    assert decode_cursor(cursor, SORT) == ["2024-03-01", "abc"]
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor", SORT)
+    assert error.value.status_code == 400
+
+
+def test_keyset_filter_follows_sort_direction():
+    assert keyset_filter(SORT, ["2024-03-01", "abc"]) == {"$or": [
+        {"date_transaction": {"$lt": "2024-03-01"}},
+        {"date_transaction": "2024-03-01", "id": {"$lt": "abc"}},
+    ]}
+    assert keyset_filter([("created_at", 1), ("id", 1)], ["t", "x"])["$or"][1] == {"created_at": "t", "id": {"$gt": "x"}}
+
+
+def test_fields_projection_keeps_sort_keys():
+    assert parse_fields("montant, categorie", ["date_transaction", "id"]) == {
+        "_id": 0, "montant": 1, "categorie": 1, "date_transaction": 1, "id": 1,
+    }
+    assert parse_fields(None, ["id"]) is None
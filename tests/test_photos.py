@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import photos
+import server
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(photos, "PHOTOS_DIR", tmp_path)
+    return tmp_path
+
+
+def test_sniff_content_type():
+    assert photos.sniff_content_type(PNG[:16]) == "image/png"
+    assert photos.sniff_content_type(b"\xff\xd8\xff\xe0\x00\x10JFIF") == "image/jpeg"
+    assert photos.sniff_content_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert photos.sniff_content_type(b"<svg xmlns=") is None
+
+
+def test_parse_range():
+    assert photos.parse_range("bytes=0-99", 1000) == (0, 99)
+    assert photos.parse_range("bytes=900-", 1000) == (900, 999)
+    assert photos.parse_range("bytes=990-2000", 1000) == (990, 999)
+    assert photos.parse_range("bytes=-100", 1000) == (900, 999)
+    assert photos.parse_range("bytes=-5000", 1000) == (0, 999)
+    # Multipart, other units and malformed ranges get the whole body
+    assert photos.parse_range("bytes=0-1,5-6", 1000) is None
+    assert photos.parse_range("items=0-1", 1000) is None
+    assert photos.parse_range("bytes=a-b", 1000) is None
+    for unsatisfiable in ("bytes=1000-", "bytes=5-4", "bytes=-0"):
+        with pytest.raises(ValueError):
+            photos.parse_range(unsatisfiable, 1000)
+
+
+def test_store_original_deduplicates(store):
+    photo_hash, created = photos.store_original(PNG)
+    assert created and photos.photo_path(photo_hash).read_bytes() == PNG
+    assert photos.store_original(PNG) == (photo_hash, False)
+    assert [path.name for path in store.rglob("*") if path.is_file()] == [photo_hash]
+    assert photos.thumbnail_url(f"/api/photos/{photo_hash}") == f"/api/photos/{photo_hash}/miniature"
+    assert photos.thumbnail_url("https://example.com/cochon.jpg") is None
+
+
+def test_concurrent_uploads_of_the_same_content(store):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(photos.store_original, [PNG] * 32))
+    assert {photo_hash for photo_hash, _ in results} == {results[0][0]}
+    assert photos.photo_path(results[0][0]).read_bytes() == PNG
+    # No temporary file left behind
+    assert [path.name for path in store.rglob("*") if path.is_file()] == [results[0][0]]
+
+
+def test_photo_served_with_ranges_and_caching(store):
+    photo_hash, _ = photos.store_original(PNG)
+    client = TestClient(server.app)
+
+    response = client.get(f"/api/photos/{photo_hash}")
+    assert response.status_code == 200 and response.content == PNG
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["etag"] == f'"{photo_hash}"'
+    assert "immutable" in response.headers["cache-control"]
+
+    response = client.get(f"/api/photos/{photo_hash}", headers={"Range": "bytes=8-15"})
+    assert response.status_code == 206 and response.content == PNG[8:16]
+    assert response.headers["content-range"] == f"bytes 8-15/{len(PNG)}"
+    assert client.get(f"/api/photos/{photo_hash}", headers={"Range": "bytes=5000-"}).status_code == 416
+    assert client.get(f"/api/photos/{photo_hash}", headers={"If-None-Match": f'"{photo_hash}"'}).status_code == 304
+
+    # No thumbnail yet: the original, revalidated until the thumbnail exists
+    response = client.get(f"/api/photos/{photo_hash}/miniature")
+    assert response.content == PNG and response.headers["cache-control"] == "no-cache"
+    assert client.get(f"/api/photos/{'0' * 64}").status_code == 404
+    assert client.get("/api/photos/..%2F..%2Fserver.py").status_code in (404, 422)
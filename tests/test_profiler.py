@@ -0,0 +1,50 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from profiler import Profiler, ProfilerListener, RequestProfile, command_shape, current_profile, explain_summary
+
+
+def test_queries_differing_only_by_values_share_a_shape():
+    first = {"find": "financial_records", "filter": {"date_transaction": {"$gte": datetime(2024, 1, 1)},
+                                                      "categorie": "vente"}, "sort": {"date_transaction": -1}}
+    second = {"find": "financial_records", "filter": {"date_transaction": {"$gte": datetime(2023, 5, 1)},
+                                                       "categorie": "soins"}, "sort": {"date_transaction": -1}}
+    assert command_shape("find", first) == command_shape("find", second)
+    assert command_shape("find", first) != command_shape("find", {**first, "filter": {"categorie": "vente"}})
+
+
+def test_listener_records_commands_of_the_current_request_only():
+    listener = ProfilerListener()
+    command = {"find": "animals", "filter": {"type": "porc"}, "lsid": {"id": 1}, "$db": "test"}
+    started = SimpleNamespace(command_name="find", command=command, database_name="test", request_id=1)
+    succeeded = SimpleNamespace(command_name="find", request_id=1, duration_micros=2500,
+                                reply={"cursor": {"firstBatch": [{}, {}, {}]}})
+
+    listener.started(started)  # No request in progress: ignored
+    profile = RequestProfile(sampled=False)
+    token = current_profile.set(profile)
+    try:
+        listener.started(started)
+        listener.succeeded(succeeded)
+    finally:
+        current_profile.reset(token)
+
+    [record] = profile.commands
+    assert (record.collection, record.duration_ms, record.returned) == ("animals", 2.5, 3)
+    assert record.command == {"find": "animals", "filter": {"type": "porc"}}  # Ready for explain
+
+    registry = Profiler()
+    registry.record("/api/animals", profile.commands * 3)
+    [top] = registry.top()
+    assert (top["appels"], top["total_ms"], top["moyenne_ms"]) == (3, 7.5, 2.5)
+
+
+def test_explain_summary_finds_nested_execution_stats():
+    explanation = {
+        "queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}},
+        "stages": [{"$cursor": {"executionStats": {"totalDocsExamined": 5000, "totalKeysExamined": 0,
+                                                   "nReturned": 10}}}],
+    }
+    assert explain_summary(explanation) == {
+        "docs_examines": 5000, "cles_examinees": 0, "retournes": 10, "plan": ["SORT", "COLLSCAN"]
+    }
@@ -0,0 +1,66 @@
+import uuid
+
+import profitability
+from indexes import ensure_indexes
+from profitability import animal_row, wave_row
+
+
+def total(type_transaction, categorie, montant):
+    return {"_id": {"type": type_transaction, "categorie": categorie}, "montant": montant, "nombre": 1}
+
+
+def test_animal_row_costs_revenue_and_margin():
+    animal = {"id": "v1", "type": "poulet", "race": "Cobb", "statut": "vendu", "numero_vague": "Vague 1",
+              "nombre_animaux": 100, "prix_vente": 900.0}
+    totals = [total("depense", "alimentation", 400.0), total("depense", "medical", 50.0), total("recette", "autre", 20.0)]
+    row = animal_row(animal, totals)
+    assert row["couts"] == {"alimentation": 400.0, "medical": 50.0}
+    assert (row["cout_total"], row["revenu"], row["marge"], row["marge_par_tete"]) == (450.0, 920.0, 470.0, 4.7)
+
+    # A linked "vente" recette already carries the sale price
+    row = animal_row(animal, totals + [total("recette", "vente", 900.0)])
+    assert (row["revenu"], row["marge"]) == (920.0, 470.0)
+
+
+def test_wave_row_sums_its_lots():
+    lots = [
+        animal_row({"id": "a", "type": "poulet", "race": "Cobb", "statut": "actif", "nombre_animaux": 60},
+                   [total("depense", "alimentation", 300.0)]),
+        animal_row({"id": "b", "type": "poulet", "race": "Ross", "statut": "vendu", "nombre_animaux": 40,
+                    "prix_vente": 500.0}, [total("depense", "alimentation", 100.0)]),
+    ]
+    row = wave_row("Vague 3", lots)
+    assert (row["nombre_lots"], row["lots_actifs"], row["nombre_animaux"]) == (2, 1, 100)
+    assert row["races"] == ["Cobb", "Ross"]
+    assert (row["cout_total"], row["revenu"], row["marge"], row["marge_par_tete"]) == (400.0, 500.0, 100.0, 1.0)
+
+
+def test_incremental_ledger_matches_rebuild(run_with_db):
+    async def body(db):
+        await ensure_indexes(db)
+        ids = [str(uuid.uuid4()) for _ in range(4)]
+        for i, animal_id in enumerate(ids):
+            await db.animals.insert_one({"id": animal_id, "type": "poulet", "race": "Cobb", "statut": "actif",
+                                         "numero_vague": f"Vague {i % 2}", "nombre_animaux": 50})
+            await db.medical_records.insert_one({"id": str(uuid.uuid4()), "animal_id": animal_id, "cout": 10.0 * i})
+            await db.financial_records.insert_one({"id": str(uuid.uuid4()), "animal_id": animal_id, "montant": 100.0,
+                                                   "type_transaction": "depense", "categorie": "alimentation"})
+        await profitability.sync_animals(db, ids)
+
+        # Sale of one lot, another moved to a new wave, a third deleted
+        await db.animals.update_one({"id": ids[0]}, {"$set": {"statut": "vendu", "prix_vente": 600.0}})
+        await db.animals.update_one({"id": ids[1]}, {"$set": {"numero_vague": "Vague 9"}})
+        await db.animals.delete_one({"id": ids[2]})
+        await profitability.sync_animals(db, ids[:3])
+
+        def snapshot(rows):
+            return sorted((row["niveau"], row["cle"], row["marge"], row.get("nombre_lots")) for row in rows)
+
+        incremental = snapshot(await db[profitability.LEDGER_COLLECTION].find({}, {"_id": 0}).to_list(length=None))
+        await profitability.rebuild(db)
+        rebuilt = snapshot(await db[profitability.LEDGER_COLLECTION].find({}, {"_id": 0}).to_list(length=None))
+        assert incremental == rebuilt
+        assert ("vague", "Vague 0", 500.0, 1) in rebuilt  # Sold lot only: 600 sale - 100 feed
+        assert [row for row in rebuilt if row[1] == ids[2]] == []
+
+    run_with_db(body)
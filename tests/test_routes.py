@@ -0,0 +1,48 @@
+import re
+
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+
+import server
+from routers import dispatch_table
+
+
+def sample_path(path: str) -> str:
+    """Concrete path for a route template, with a value no static segment uses"""
+    return re.sub(r"{[^}]+}", "x", path)
+
+
+def resolve(method: str, path: str):
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    for route in dispatch_table(server.app):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+    return None
+
+
+def test_every_declared_route_is_reachable():
+    unreachable = []
+    routes = dispatch_table(server.app)
+    assert any(route.path == "/api/reproduction-events/upcoming-births" for route in routes)
+    for route in routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in route.methods:
+            resolved = resolve(method, sample_path(route.path))
+            if resolved is not route:
+                unreachable.append((method, route.path, resolved.path if resolved else None))
+    assert unreachable == []
+
+
+def test_static_paths_win_over_parametric_siblings():
+    assert resolve("GET", "/api/reproduction-events/upcoming-births").endpoint.__name__ == "get_upcoming_births"
+    assert resolve("GET", "/api/medical-records/reminders/upcoming").endpoint.__name__ == "get_upcoming_reminders"
+    assert resolve("GET", "/api/animals/breeding-males/porc").endpoint.__name__ == "get_breeding_males"
+    assert resolve("POST", "/api/animals/bulk-delete").endpoint.__name__ == "bulk_delete_animals"
+
+
+def test_parametric_routes_still_match_ids():
+    assert resolve("GET", "/api/reproduction-events/3f2a").endpoint.__name__ == "get_reproduction_events"
+    assert resolve("GET", "/api/animals/3f2a").endpoint.__name__ == "get_animal"
+    assert resolve("PUT", "/api/animals/3f2a/sell").endpoint.__name__ == "sell_animal"
@@ -0,0 +1,76 @@
+import search
+from indexes import ensure_indexes
+from pagination import decode_cursor, encode_cursor, keyset_filter
+from queries import SEARCH_SORT
+from search import query_words, search_entry, tokenize
+
+
+def test_tokens_are_lower_case_without_accents():
+    assert tokenize("Vétérinaire Dupré, Vague 12") == ["veterinaire", "dupre", "vague", "12"]
+    assert query_words("  Té a  té ") == ["te"]
+
+
+def test_search_entry_weights_and_prefixes():
+    entry = search_entry("animals", {"id": "a1", "nom": "Cobb Rose", "race": "Cobb", "type": "poulet",
+                                     "numero_vague": "Vague 3", "notes": None})
+    assert entry["id"] == "animals:a1" and entry["animal_id"] == "a1"
+    assert entry["libelle"] == "Cobb Rose"
+    # A token found in several fields keeps its best weight
+    assert {"t": "cobb", "p": 5} in entry["termes"]
+    assert {"co", "cob", "cobb", "ro", "ros", "rose", "va", "vag", "po"} <= set(entry["prefixes"])
+    assert "c" not in entry["prefixes"] and "3" not in entry["prefixes"]
+
+    record = search_entry("financial_records", {"id": "f1", "animal_id": None, "description": "Aliment croissance",
+                                                "fournisseur_acheteur": "Provenderie du Sud", "categorie": "alimentation"})
+    assert record["libelle"] == "Aliment croissance"
+    assert record["extrait"] == "Provenderie du Sud - alimentation"
+
+
+def test_short_queries_rank_bounded_candidates_in_id_order():
+    stages = search.search_pipeline(query_words("ma la"))
+    assert stages[1:3] == [{"$sort": {"id": 1}}, {"$limit": search.MAX_CANDIDATES}]
+    assert search.candidate_limit(query_words("ma marg")) is None
+    assert [next(iter(stage)) for stage in search.search_pipeline(query_words("marg"))] == ["$match", "$addFields"]
+
+
+def test_search_ranks_and_follows_writes(run_with_db):
+    async def body(db):
+        await ensure_indexes(db)
+        await search.index_documents(db, "animals", [
+            {"id": "a1", "nom": "Marguerite", "race": "Large White", "type": "porc"},
+            {"id": "a2", "nom": "Bella", "race": "Large White", "type": "porc", "notes": "Fille de Marguerite"},
+        ])
+        await search.index_documents(db, "medical_records", [
+            {"id": "m1", "animal_id": "a2", "medicament": "Marbofloxacine", "type_intervention": "traitement"},
+        ])
+
+        async def hits(q):
+            pipeline = search.search_pipeline(query_words(q)) + [{"$sort": {"score": -1, "id": 1}}]
+            return [(hit["id"], hit["score"]) for hit in await db[search.SEARCH_COLLECTION].aggregate(pipeline).to_list(None)]
+
+        # Name before notes, the prefix also finds the medicine
+        assert await hits("mar") == [("animals:a1", 5), ("medical_records:m1", 4), ("animals:a2", 1)]
+        # Pages of one hit walk the whole ranking, in the same order
+        paged, cursor = [], None
+        while True:
+            pipeline = search.search_pipeline(query_words("mar"))
+            if cursor:
+                pipeline.append({"$match": keyset_filter(SEARCH_SORT, decode_cursor(cursor, SEARCH_SORT))})
+            page = await db[search.SEARCH_COLLECTION].aggregate(
+                pipeline + [{"$sort": dict(SEARCH_SORT)}, {"$limit": 1}]
+            ).to_list(None)
+            if not page:
+                break
+            paged.append(page[0]["id"])
+            cursor = encode_cursor(page[0], SEARCH_SORT)
+        assert paged == ["animals:a1", "medical_records:m1", "animals:a2"]
+        # Every word must match; whole words count double
+        assert await hits("large bella") == [("animals:a2", 3 * 2 + 5 * 2)]
+
+        await db.animals.insert_one({"id": "a1", "nom": "Rosa", "race": "Piétrain", "type": "porc"})
+        await search.sync(db, "animals", ["a1", "gone"])
+        assert [hit for hit, _ in await hits("pietr")] == ["animals:a1"]
+        await search.remove_animals(db, ["a2"])
+        assert await hits("mar") == []
+
+    run_with_db(body)
@@ -0,0 +1,36 @@
+import asyncio
+
+from counters import next_wave_number, observe_wave_number, parse_wave_number, seed_wave_counter
+
+
+def test_parse_wave_number():
+    assert parse_wave_number("Vague 12") == 12
+    assert parse_wave_number("Lot A") is None
+    assert parse_wave_number(None) is None
+
+
+def test_counter_is_seeded_from_existing_waves(run_with_db):
+    async def body(db):
+        await db.animals.insert_many([
+            {"id": "a", "type": "poulet", "numero_vague": "Vague 3"},
+            {"id": "b", "type": "poulet", "numero_vague": "Vague 17"},
+            {"id": "c", "type": "poulet", "numero_vague": "Lot spécial"},
+        ])
+        await seed_wave_counter(db)
+        await seed_wave_counter(db)
+        assert await next_wave_number(db) == "Vague 18"
+
+        await observe_wave_number(db, "Vague 40")
+        assert await next_wave_number(db) == "Vague 41"
+
+    run_with_db(body)
+
+
+def test_concurrent_allocations_never_collide(run_with_db):
+    async def body(db):
+        await db.animals.insert_one({"id": "a", "type": "poulet", "numero_vague": "Vague 5"})
+        # No explicit seed: the first allocations must seed lazily without racing each other
+        waves = await asyncio.gather(*(next_wave_number(db) for _ in range(300)))
+        assert sorted(parse_wave_number(wave) for wave in waves) == list(range(6, 306))
+
+    run_with_db(body)